@@ -0,0 +1,146 @@
+# assets.py
+
+import threading
+import pygame
+from time import perf_counter
+
+
+class AssetCache:
+    """
+    Process-wide cache of decoded and processed surfaces.
+    Each entry is keyed by its source path plus the parameters used to slice
+    and scale it, so every distinct asset is decoded exactly once per process
+    and the resulting surfaces are shared between all objects that use it.
+    Shared surfaces must be treated as read-only by callers.
+    Lookups may come from several threads (level preloading, streaming
+    prefetch): the counters are updated under a lock and nested loads are
+    tracked per thread, while loaders themselves run unlocked.
+    """
+    def __init__(self):
+        self._entries = {}
+        self._masks = {}
+        self.hits = 0
+        self.misses = 0
+        self.load_time = 0.0  # seconds spent in loaders (decode, slicing, scaling)
+        self._lock = threading.Lock()
+        self._local = threading.local()  # per-thread nesting depth of loads
+        self._decoded = {}  # path -> image decoded by decode(), not converted yet
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, loader):
+        """
+        Returns the cached value for key, calling loader() to build it on a miss.
+        :param key: Hashable cache key (path plus slice/scale parameters)
+        :param loader: Zero-argument callable that builds the value
+        :return: The cached value
+        """
+        try:
+            value = self._entries[key]
+        except KeyError:
+            pass
+        else:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+        # Nested loads (e.g. a sheet loading its image) are timed once, by the outermost
+        local = self._local
+        depth = getattr(local, "depth", 0)
+        local.depth = depth + 1
+        start = perf_counter()
+        try:
+            value = loader()
+        finally:
+            local.depth = depth
+            if not depth:
+                elapsed = perf_counter() - start
+                local.load_time = getattr(local, "load_time", 0.0) + elapsed
+                with self._lock:
+                    self.load_time += elapsed
+        # If another thread built the same entry meanwhile, everyone shares the first one
+        with self._lock:
+            return self._entries.setdefault(key, value)
+
+    def thread_load_time(self):
+        """
+        Seconds the calling thread has spent in loaders; unlike load_time
+        this leaves out loads running on other threads at the same time.
+        """
+        return getattr(self._local, "load_time", 0.0)
+
+    def image(self, path, alpha=True):
+        """
+        Loads and converts an image file once.
+        :param path: Path of the image file
+        :param alpha: If True use convert_alpha(), otherwise convert()
+        :return: Shared converted surface
+        """
+        def load():
+            image = self._decoded.pop(path, None)
+            if image is None:
+                image = pygame.image.load(path)
+            return image.convert_alpha() if alpha else image.convert()
+        return self.get(("image", path, alpha), load)
+
+    def decode(self, path):
+        """
+        Decodes an image file without converting it. Needs no display, so
+        it can run on a worker thread; the next image() call for path then
+        only converts the decoded surface.
+        :param path: Path of the image file
+        """
+        if path in self._decoded or ("image", path, True) in self or ("image", path, False) in self:
+            return
+        self._decoded[path] = pygame.image.load(path)
+
+    def mask(self, surface):
+        """
+        Returns the collision mask of a surface, building it on first use.
+        Masks are registered when sprite sheets are sliced, so animation code
+        only ever looks them up and never calls from_surface per frame.
+        :param surface: A shared (cached) surface
+        :return: pygame.mask.Mask for the surface
+        """
+        mask = self._masks.get(surface)
+        if mask is None:
+            mask = self._masks.setdefault(surface, pygame.mask.from_surface(surface))
+        return mask
+
+    def set_mask(self, surface, mask):
+        """
+        Registers an already built mask for a surface (e.g. read from the disk cache).
+        """
+        self._masks[surface] = mask
+
+    def stats(self):
+        """
+        Returns hit/miss counters, loader time and the number of distinct cached assets.
+        """
+        return {"hits": self.hits, "misses": self.misses, "load_s": self.load_time,
+                "entries": len(self._entries), "masks": len(self._masks)}
+
+    def reset_stats(self):
+        """
+        Resets the hit/miss counters and loader time without dropping cached assets.
+        """
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.load_time = 0.0
+
+    def clear(self):
+        """
+        Drops every cached asset (e.g. after the display has been re-created).
+        """
+        self._entries.clear()
+        self._masks.clear()
+        self._decoded.clear()
+        self.reset_stats()
+
+
+# Shared instance used by utils and the game objects
+ASSETS = AssetCache()
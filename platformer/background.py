@@ -0,0 +1,73 @@
+# background.py
+
+import pygame
+from os.path import join
+from assets import ASSETS
+from config import WIDTH, HEIGHT
+
+class Background:
+    """
+    Tiled background composited once per resolution into a single opaque surface.
+    The composited buffer covers whole tiles, so it wraps around seamlessly and
+    parallax scrolling never needs more than four sub-rect blits per frame.
+    """
+    def __init__(self, name, width=WIDTH, height=HEIGHT, parallax=0.0):
+        """
+        :param name: Filename in assets/Background (e.g. 'Purple.png')
+        :param width: Screen width in pixels
+        :param height: Screen height in pixels
+        :param parallax: Scroll factor relative to the camera (0 = fixed, 1 = world speed)
+        """
+        self.width = width
+        self.height = height
+        self.parallax = parallax
+        self.image = ASSETS.get(("background", name, width, height),
+                                lambda: self._composite(name, width, height))
+
+    @staticmethod
+    def prefetch(name, width=WIDTH, height=HEIGHT):
+        """
+        Decodes the background image on a worker thread (no display access),
+        so building the Background later only converts and tiles it.
+        """
+        if ("background", name, width, height) not in ASSETS:
+            ASSETS.decode(join("assets", "Background", name))
+
+    @staticmethod
+    def _composite(name, width, height):
+        """
+        Tiles the background image into a converted buffer at least width x height.
+        """
+        tile = ASSETS.image(join("assets", "Background", name), alpha=False)
+        tile_width, tile_height = tile.get_size()
+        cols = -(-width // tile_width)
+        rows = -(-height // tile_height)
+        image = pygame.Surface((cols * tile_width, rows * tile_height)).convert()
+        for i in range(cols):
+            for j in range(rows):
+                image.blit(tile, (i * tile_width, j * tile_height))
+        return image
+
+    def draw(self, win, offset_x=0, offset_y=0):
+        """
+        Draws the background, scrolled by parallax * camera offset.
+        """
+        if not self.parallax:
+            win.blit(self.image, (0, 0))
+            return
+
+        buffer_width, buffer_height = self.image.get_size()
+        start_x = int(offset_x * self.parallax) % buffer_width
+        start_y = int(offset_y * self.parallax) % buffer_height
+        # Split the view at the wrap-around seams: at most 2 columns x 2 rows
+        first_width = min(buffer_width - start_x, self.width)
+        first_height = min(buffer_height - start_y, self.height)
+        columns = [(0, start_x, first_width)]
+        if first_width < self.width:
+            columns.append((first_width, 0, self.width - first_width))
+        rows = [(0, start_y, first_height)]
+        if first_height < self.height:
+            rows.append((first_height, 0, self.height - first_height))
+        for dest_x, src_x, width in columns:
+            for dest_y, src_y, height in rows:
+                win.blit(self.image, (dest_x, dest_y), (src_x, src_y, width, height))
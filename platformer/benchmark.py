@@ -0,0 +1,277 @@
+# benchmark.py
+
+import os
+import sys
+import json
+import time
+import platform
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from config import WIDTH, HEIGHT, SIM_RATE, BACKGROUND_PARALLAX
+from assets import ASSETS
+from game import World
+from headless import init_headless, scripted_run
+from replay import Replay, ReplayPlayer
+from levelgen import generate_level, write_level_csv, DENSITIES
+from renderer import Renderer
+from background import Background
+from hud import HUD
+
+REPORT_VERSION = 1
+DEFAULT_SIZES = "64x16,256x24,1024x32"
+# Metrics where a larger value in the new report is a regression
+COMPARED_METRICS = ("load_s", "update_ms_mean", "draw_ms_mean", "peak_alloc_bytes")
+
+def percentile(samples, fraction):
+    """
+    Returns the given percentile (0..1) of a list of samples.
+    """
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def peak_load_alloc(filename, fps, stream=False):
+    """
+    Peak bytes allocated while loading a level, measured with tracemalloc.
+    Loads a fresh copy of the file, so the compiled level cache is as cold
+    as for the timed load in bench_level.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = os.path.join(tmp, os.path.basename(filename))
+        shutil.copyfile(filename, copy)
+        tracemalloc.start()
+        try:
+            world = World.from_csv(copy, fps, stream)
+            _, peak_alloc = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        world.level.close()
+    return peak_alloc
+
+def bench_level(filename, ticks, stream=False, playback=None):
+    """
+    Measures one level: load time, peak allocations, update and draw time per frame.
+    :param filename: CSV level file
+    :param ticks: Number of frames to simulate and draw
+    :param stream: Load the level with StreamingLevel instead of all at once
+    :param playback: Optional ReplayPlayer supplying the input instead of the built-in script
+    :return: Dictionary of measurements
+    """
+    window = pygame.display.get_surface()
+    ASSETS.reset_stats()
+
+    # Timed and traced in separate loads: tracemalloc slows down
+    # allocation-heavy loading several times over
+    fps = playback.replay.fps if playback else SIM_RATE
+    start = time.perf_counter()
+    world = World.from_csv(filename, fps, stream)
+    load_s = time.perf_counter() - start
+    asset_stats = ASSETS.stats()
+    peak_alloc = peak_load_alloc(filename, fps, stream)
+
+    renderer = Renderer(WIDTH, HEIGHT)
+    background = Background("Purple.png", WIDTH, HEIGHT, BACKGROUND_PARALLAX)
+    hud = HUD(WIDTH)
+    script = scripted_run()
+    player = world.player
+
+    update_times = []
+    draw_times = []
+    drawn = []
+    state = world.state()
+    for tick in range(ticks):
+        controls = playback.next_controls() if playback else script(tick, state)
+        start = time.perf_counter()
+        state = world.step(controls)
+        update_times.append(time.perf_counter() - start)
+        if playback is not None:
+            playback.verify(world)
+
+        # Camera centred on the player
+        offset_x = player.rect.centerx - WIDTH // 2
+        offset_y = player.rect.centery - HEIGHT // 2
+        start = time.perf_counter()
+        renderer.begin_frame(offset_x, offset_y)
+        background.draw(window, offset_x, offset_y)
+        renderer.draw_level(window, world.level, offset_x, offset_y)
+        renderer.draw_sprite(window, player, offset_x, offset_y)
+        renderer.mark_dirty(hud.draw(window, world.score, player.health, player.MAX_HEALTH))
+        renderer.present()
+        draw_times.append(time.perf_counter() - start)
+        drawn.append(renderer.drawn)
+        if world.done:
+            break
+    tilemap = world.level.tilemap
+    terrain_bytes = tilemap.nbytes if tilemap is not None else 0
+    world.level.close()
+
+    result = {
+        "objects": len(world.level.objects),
+        "terrain_bytes": terrain_bytes,
+        "load_s": load_s,
+        "peak_alloc_bytes": peak_alloc,
+        "asset_misses": asset_stats["misses"],
+        "asset_hits": asset_stats["hits"],
+        "frames": len(update_times),
+        "update_ms_mean": 1000 * sum(update_times) / len(update_times),
+        "update_ms_p95": 1000 * percentile(update_times, 0.95),
+        "draw_ms_mean": 1000 * sum(draw_times) / len(draw_times),
+        "draw_ms_p95": 1000 * percentile(draw_times, 0.95),
+        "drawn_mean": sum(drawn) / len(drawn),
+    }
+    if playback is not None:
+        result["replay_diverged_at"] = playback.diverged_at
+    return result
+
+def run_replay(filename, stream=False):
+    """
+    Benchmarks the level and input of a recorded replay, so the same
+    playthrough can be compared across commits.
+    :param filename: Replay file recorded on a level file (see replay.py)
+    :return: Report dictionary with one result
+    """
+    replay = Replay.load(filename)
+    if replay.level_file is None:
+        raise ValueError(f"{filename} was recorded on the built-in level; benchmarks need a level file")
+    replay.check_level(replay.level_file)
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    init_headless()
+
+    playback = ReplayPlayer(replay)
+    name = "replay-" + os.path.splitext(os.path.basename(filename))[0]
+    result = {"name": name, "level": replay.level_file, "replay_ticks": len(replay)}
+    result.update(bench_level(replay.level_file, len(replay), stream, playback))
+    print(f"{name:>20}  load {result['load_s'] * 1000:8.1f} ms"
+          f"  update {result['update_ms_mean']:6.3f} ms"
+          f"  draw {result['draw_ms_mean']:6.3f} ms  {playback.report()}")
+    return {
+        "version": REPORT_VERSION,
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "replay": filename,
+            "stream": stream,
+        },
+        "results": [result],
+    }
+
+def run_suite(sizes, densities, ticks, seed=0, workdir=None, stream=False):
+    """
+    Generates levels for every size/density pair and benchmarks each one.
+    :param sizes: List of (cols, rows)
+    :param densities: List of DENSITIES keys
+    :param ticks: Frames to simulate and draw per level
+    :param stream: Benchmark streaming mode (see StreamingLevel)
+    :return: Report dictionary
+    """
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    init_headless()
+
+    results = []
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        # Decode all assets once so load times measure per-tile cost only
+        warmup = os.path.join(tmp, "warmup.csv")
+        write_level_csv(warmup, generate_level(16, 8, "dense", seed))
+        World.from_csv(warmup)
+
+        for density in densities:
+            for cols, rows in sizes:
+                filename = os.path.join(tmp, f"level_{cols}x{rows}_{density}.csv")
+                write_level_csv(filename, generate_level(cols, rows, density, seed))
+                result = {"name": f"{cols}x{rows}-{density}", "cols": cols, "rows": rows,
+                          "cells": cols * rows, "density": density,
+                          "file_bytes": os.path.getsize(filename)}
+                result.update(bench_level(filename, ticks, stream))
+                results.append(result)
+                print(f"{result['name']:>20}  load {result['load_s'] * 1000:8.1f} ms"
+                      f"  update {result['update_ms_mean']:6.3f} ms"
+                      f"  draw {result['draw_ms_mean']:6.3f} ms"
+                      f"  peak {result['peak_alloc_bytes'] / 1e6:7.1f} MB")
+
+    return {
+        "version": REPORT_VERSION,
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "ticks": ticks,
+            "seed": seed,
+            "stream": stream,
+        },
+        "results": results,
+    }
+
+def compare_reports(baseline, current, threshold):
+    """
+    Compares two reports and lists metrics that got worse by more than threshold.
+    :param threshold: Allowed relative increase (0.2 = 20%)
+    :return: List of human readable regression descriptions
+    """
+    old = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        previous = old.get(result["name"])
+        if previous is None:
+            continue
+        for metric in COMPARED_METRICS:
+            before, after = previous.get(metric), result.get(metric)
+            if before and after is not None and after > before * (1 + threshold):
+                regressions.append(f"{result['name']}: {metric} {before:.4g} -> {after:.4g} "
+                                   f"(+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+def parse_sizes(text):
+    """
+    Parses '64x16,256x24' into [(64, 16), (256, 24)].
+    """
+    return [tuple(int(part) for part in size.split("x")) for size in text.split(",") if size]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark level load, update and draw time against level size.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma separated COLSxROWS list")
+    parser.add_argument("--densities", default="normal",
+                        help=f"comma separated list of {', '.join(sorted(DENSITIES))}")
+    parser.add_argument("--ticks", type=int, default=300, help="frames simulated and drawn per level")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stream", action="store_true", help="load levels in streaming mode")
+    parser.add_argument("--output", default="benchmark_report.json", help="JSON report to write")
+    parser.add_argument("--replay", help="benchmark a recorded replay instead of generated levels")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown reported as a regression (default 0.2)")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        report = run_replay(args.replay, args.stream)
+    else:
+        report = run_suite(parse_sizes(args.sizes), args.densities.split(","), args.ticks, args.seed,
+                           stream=args.stream)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_reports(json.load(f), report, args.threshold)
+        for line in regressions:
+            print("REGRESSION", line)
+        if regressions:
+            return 1
+    if any(result.get("replay_diverged_at") is not None for result in report["results"]):
+        print("REPLAY DIVERGED")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,7 @@
 import pygame
+from assets import ASSETS
+from utils import get_mask
+from spatial import SpatialHash
 
 class Coin(pygame.sprite.Sprite):
     
@@ -7,9 +10,71 @@ class Coin(pygame.sprite.Sprite):
     def __init__(self, x, y, size=24):
         super().__init__()
         self.rect = pygame.Rect(x, y, size, size)
-        self.image = pygame.Surface((size, size), pygame.SRCALPHA)
-        pygame.draw.circle(self.image, self.COLOR, (size // 2, size // 2), size // 2)
-        self.mask = pygame.mask.from_surface(self.image)
+        # Every coin of one size shares the same gold circle and mask
+        self.image = ASSETS.get(("coin", size), lambda: self._make_image(size))
+        self.mask = get_mask(self.image)
+
+    @classmethod
+    def _make_image(cls, size):
+        image = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(image, cls.COLOR, (size // 2, size // 2), size // 2)
+        return image
 
     def draw(self, win, offset_x, offset_y):
-        win.blit(self.image, (self.rect.x - offset_x, self.rect.y - offset_y))
\ No newline at end of file
+        win.blit(self.image, (self.rect.x - offset_x, self.rect.y - offset_y))
+
+class CoinStore:
+    """
+    Container for a level's coins.
+    Coins sit in their own spatial hash, so pickups are a local query around
+    the player and removal is O(1) per coin, no matter how many coins the
+    level has or how many were already collected.
+    """
+    def __init__(self, cell_size=96):
+        """
+        :param cell_size: Grid cell size, usually the level's block size
+        """
+        self.grid = SpatialHash(cell_size)
+        self.collected = 0
+
+    def __len__(self):
+        return len(self.grid)
+
+    def __contains__(self, coin):
+        return coin in self.grid
+
+    def __iter__(self):
+        return iter(self.grid)
+
+    def add(self, coin, order):
+        """
+        Adds a coin.
+        :param order: Level order reserved for the coin, stored as coin.order
+        """
+        coin.order = order
+        self.grid.insert(coin, order)
+
+    def remove(self, coin):
+        """
+        Removes a coin without touching any other coin.
+        """
+        self.grid.remove(coin)
+
+    def query(self, rect, after=-1):
+        """
+        Returns the coins overlapping rect, optionally only those after a level order.
+        """
+        coins = self.grid.query(rect)
+        if after >= 0:
+            coins = [coin for coin in coins if coin.order > after]
+        return coins
+
+    def collect(self, rect):
+        """
+        Removes and returns every coin touching rect.
+        """
+        coins = [coin for coin in self.grid.query(rect) if rect.colliderect(coin.rect)]
+        for coin in coins:
+            self.grid.remove(coin)
+        self.collected += len(coins)
+        return coins
@@ -2,7 +2,25 @@
 
 WIDTH = 1024
 HEIGHT = 768
-FPS = 60
+FPS = 60  # render frame cap (0 = uncapped)
+SIM_RATE = 60  # fixed simulation ticks per second
+MAX_CATCH_UP_TICKS = 5  # max ticks simulated per rendered frame before dropping time
 PLAYER_VEL = 5
 
-BG_COLOR = (255, 255, 255)
\ No newline at end of file
+BG_COLOR = (255, 255, 255)
+
+# Keep processed sprite frames and masks in __assetcache__/ between runs
+ASSET_DISK_CACHE = True
+
+# Solid terrain tiles are merged into collision rects within chunks of
+# this many tiles per side
+TERRAIN_CHUNK_TILES = 16
+
+# Background scroll speed relative to the camera (0 = fixed, 1 = moves with the world)
+BACKGROUND_PARALLAX = 0
+
+# Streaming mode (--stream): level objects are loaded in square regions of
+# this many tiles around the player and camera
+STREAM_REGION_TILES = 16
+# Resident size of loaded regions before far ones are evicted
+STREAM_MEMORY_BUDGET = 128 * 1024 * 1024
@@ -1,4 +1,6 @@
 import pygame
+import numpy as np
+from utils import collide_solid_rect
 
 class Enemy(pygame.sprite.Sprite):
     """
@@ -32,4 +34,168 @@ class Enemy(pygame.sprite.Sprite):
             self.direction = "left"
 
     def draw(self, win, offset_x, offset_y):
-        win.blit(self.image, (self.rect.x - offset_x, self.rect.y - offset_y))
\ No newline at end of file
+        win.blit(self.image, (self.rect.x - offset_x, self.rect.y - offset_y))
+
+class SwarmEnemy(pygame.sprite.Sprite):
+    """
+    Lightweight view of one enemy stored in an EnemySwarm.
+    Only created for enemies that are drawn or collided with; its rect is
+    refreshed from the swarm arrays whenever the swarm hands it out. It is
+    not an Enemy: the swarm moves it, so it has no move().
+    """
+    COLOR = Enemy.COLOR
+    mask = None
+    image = None
+
+    def __init__(self, swarm, index):
+        super().__init__()
+        self.swarm = swarm
+        self.index = index
+        self.order = int(swarm.order[index])
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.sync()
+
+    def sync(self):
+        """
+        Copies the enemy's current state out of the swarm arrays.
+        """
+        swarm, i = self.swarm, self.index
+        self.rect.update(int(swarm.x[i]), int(swarm.y[i]), int(swarm.width[i]), int(swarm.height[i]))
+        self.left_bound = int(swarm.left[i])
+        self.right_bound = int(swarm.right[i])
+        self.x_vel = int(swarm.vel[i])
+        self.direction = "right" if self.x_vel > 0 else "left"
+
+    @property
+    def previous_position(self):
+        """
+        Position before the last swarm step, used for render interpolation.
+        """
+        return int(self.swarm.prev_x[self.index]), int(self.swarm.prev_y[self.index])
+
+    def collide(self, sprite, dx=0, dy=0):
+        """
+        Pixel-accurate test of a masked sprite against this solid enemy.
+        :param dx: Test as if the sprite were moved right by dx
+        :param dy: Test as if the sprite were moved down by dy
+        :return: Overlap point or None, like pygame.sprite.collide_mask
+        """
+        return collide_solid_rect(self.rect, sprite, dx, dy)
+
+    def draw(self, win, offset_x, offset_y):
+        win.fill(self.COLOR, (self.rect.x - offset_x, self.rect.y - offset_y,
+                              self.rect.width, self.rect.height))
+
+class EnemySwarm:
+    """
+    Struct-of-arrays storage for every patrolling enemy of a level.
+    All enemies move with one vectorized patrol/bounce step per tick and
+    are found with one vectorized AABB test, so thousands of enemies cost a
+    few NumPy operations instead of a Python loop. SwarmEnemy views are only
+    built for enemies that a query returns.
+    """
+    COLUMNS = ("x", "y", "width", "height", "left", "right", "vel", "order")
+
+    def __init__(self):
+        for name in self.COLUMNS:
+            setattr(self, name, np.zeros(0, dtype=np.int64))
+        self.active = np.zeros(0, dtype=bool)
+        self.prev_x = self.x.copy()
+        self.prev_y = self.y.copy()
+        self._views = {}
+
+    def __len__(self):
+        return int(self.active.sum())
+
+    def __contains__(self, obj):
+        """
+        True if obj is a view of an active enemy of this swarm.
+        """
+        return getattr(obj, "swarm", None) is self and bool(self.active[obj.index])
+
+    def add(self, x, y, width, height, left_bound, right_bound, speed, order):
+        """
+        Adds one enemy; same parameters as Enemy plus its level order.
+        The slot of a removed enemy is reused when there is one, so levels
+        that keep loading and unloading enemies don't grow the arrays.
+        :return: Index of the enemy in the arrays
+        """
+        row = (x, y, width, height, left_bound, right_bound, speed, order)
+        free = np.flatnonzero(~self.active)
+        if not len(free):
+            self.add_many([row])
+            return len(self.x) - 1
+        index = int(free[0])
+        for name, value in zip(self.COLUMNS, row):
+            getattr(self, name)[index] = value
+        self.active[index] = True
+        self.prev_x[index] = x
+        self.prev_y[index] = y
+        self._views.pop(index, None)
+        return index
+
+    def add_many(self, rows):
+        """
+        Appends several enemies at once.
+        :param rows: Iterable of (x, y, width, height, left, right, speed, order)
+        """
+        rows = np.asarray(list(rows), dtype=np.int64).reshape(-1, len(self.COLUMNS))
+        for column, name in enumerate(self.COLUMNS):
+            setattr(self, name, np.concatenate((getattr(self, name), rows[:, column])))
+        self.active = np.concatenate((self.active, np.ones(len(rows), dtype=bool)))
+        self.prev_x = self.x.copy()
+        self.prev_y = self.y.copy()
+
+    def remove(self, index):
+        """
+        Deactivates one enemy; its slot is kept so indices stay stable.
+        """
+        self.active[index] = False
+        self._views.pop(index, None)
+
+    def step(self):
+        """
+        Moves every enemy one tick, bouncing between its bounds like Enemy.move().
+        """
+        np.copyto(self.prev_x, self.x)
+        np.copyto(self.prev_y, self.y)
+        x, vel = self.x, self.vel
+        x += vel * self.active
+        hit_left = x <= self.left
+        hit_right = ~hit_left & (x + self.width >= self.right)
+        x[hit_left] = self.left[hit_left]
+        vel[hit_left] = np.abs(vel[hit_left])
+        x[hit_right] = self.right[hit_right] - self.width[hit_right]
+        vel[hit_right] = -np.abs(vel[hit_right])
+
+    def overlapping(self, rect, after=-1):
+        """
+        Vectorized AABB test against rect.
+        :param rect: pygame.Rect area to test
+        :param after: Only enemies with a level order greater than this
+        :return: Array of enemy indices
+        """
+        hits = (self.active
+                & (self.x < rect.right) & (self.x + self.width > rect.left)
+                & (self.y < rect.bottom) & (self.y + self.height > rect.top)
+                & (self.width > 0) & (self.height > 0))
+        if after >= 0:
+            hits &= self.order > after
+        return np.flatnonzero(hits)
+
+    def query(self, rect, after=-1):
+        """
+        Returns SwarmEnemy views of the enemies overlapping rect.
+        """
+        return [self.view(int(i)) for i in self.overlapping(rect, after)]
+
+    def view(self, index):
+        """
+        Returns the (cached) SwarmEnemy view of one enemy, synced to its current state.
+        """
+        view = self._views.get(index)
+        if view is None:
+            view = self._views[index] = SwarmEnemy(self, index)
+        else:
+            view.sync()
+        return view
@@ -0,0 +1,342 @@
+# game.py
+
+import zlib
+import struct
+import pygame
+from config import SIM_RATE, PLAYER_VEL
+from objects import Fire
+from profiler import PhaseProfiler
+from spatial import collision_rect
+
+class Controls:
+    """
+    Player input for one simulation tick.
+    """
+    def __init__(self, left=False, right=False, jump=False):
+        """
+        :param left: Move left is held
+        :param right: Move right is held
+        :param jump: Jump was pressed this tick
+        """
+        self.left = left
+        self.right = right
+        self.jump = jump
+
+    @classmethod
+    def from_keyboard(cls, keys, jump=False):
+        """
+        Builds controls from pygame.key.get_pressed() and the tick's KEYDOWN events.
+        """
+        return cls(left=bool(keys[pygame.K_LEFT] or keys[pygame.K_a]),
+                   right=bool(keys[pygame.K_RIGHT] or keys[pygame.K_d]),
+                   jump=jump)
+
+def collides(player, obj, dx=0, dy=0):
+    """
+    Pixel-accurate collision test between the player and an object.
+    Fully solid shapes (terrain tiles, swarm enemies) provide their own
+    collide() that only samples the player's mask.
+    :param dx: Test as if the player were moved right by dx (it isn't moved)
+    :param dy: Test as if the player were moved down by dy
+    :return: Overlap point or None.
+    """
+    collide = getattr(obj, "collide", None)
+    if collide is not None:
+        return collide(player, dx, dy)
+    rect = player.rect
+    return player.mask.overlap(obj.mask, (obj.rect.x - rect.x - dx, obj.rect.y - rect.y - dy))
+
+def swept_start(player, dy):
+    """
+    Returns the player's rect before it moved dy this tick.
+    """
+    return player.rect.move(0, -round(dy))
+
+def first_crossed(player, objects, start, dy):
+    """
+    Finds the first object the player passed through completely while
+    moving from start to its current rect, which a test at the end position
+    alone would miss at high speed. Candidates come from the rects' time of
+    impact; the masks are only sampled for those, at enough positions along
+    the path to see every row of the player pass over the object.
+    :param player: Player object, already moved by dy.
+    :param objects: Objects around the path.
+    :param start: Player rect before the move (see swept_start).
+    :param dy: Vertical distance moved this tick.
+    :return: The object hit first, or None.
+    """
+    rect = player.rect
+    first = None
+    first_distance = None
+    for obj in objects:
+        box = collision_rect(obj)
+        if box.right <= rect.left or box.left >= rect.right:
+            continue
+        # Only objects fully between the start and end rect; ones the player
+        # still overlaps are resolved by handle_vertical_collision
+        if dy > 0:
+            if box.top < start.bottom or box.bottom > rect.top:
+                continue
+            distance = box.top - start.bottom
+        else:
+            if box.bottom > start.top or box.top < rect.bottom:
+                continue
+            distance = start.top - box.bottom
+        if first is not None and distance >= first_distance:
+            continue
+        for y in range(box.top - rect.height + 1, box.bottom, max(1, box.height)):
+            if collides(player, obj, 0, y - rect.y):
+                first, first_distance = obj, distance
+                break
+    return first
+
+def handle_vertical_collision(player, objects, dy, level=None):
+    """
+    Handles collisions for vertical movement (jumping/falling).
+    The move is swept first: if the player passed through an object this
+    tick it is put back at the first one it hit. Objects it overlaps then
+    snap it out and trigger landing or head hit.
+    :param player: Player object, already moved by dy.
+    :param objects: List of objects around the player and the path it moved along.
+    :param dy: Vertical velocity (direction of movement).
+    :param level: Optional Level the objects were queried from. Snapping moves the
+                  player, so objects at the new position are picked up from it.
+    :return: List of collided objects.
+    """
+    collided_objects = []
+    if dy != 0:
+        obj = first_crossed(player, objects, swept_start(player, dy), dy)
+        if obj is not None:
+            box = collision_rect(obj)
+            if dy > 0:
+                player.rect.bottom = box.top
+                player.landed()
+            else:
+                player.rect.top = box.bottom
+                player.hit_head()
+            collided_objects.append(obj)
+
+    pending = list(objects)
+    index = 0
+    while index < len(pending):
+        obj = pending[index]
+        index += 1
+        if not collides(player, obj):
+            continue
+        if dy > 0:
+            player.rect.bottom = obj.rect.top
+            player.landed()
+        elif dy < 0:
+            player.rect.top = obj.rect.bottom
+            player.hit_head()
+        collided_objects.append(obj)
+        if level is not None and dy != 0:
+            pending[index:] = level.grid.merge(pending[index:], level.query(player.rect, obj))
+    return collided_objects
+
+def probe_sides(player, objects, probe):
+    """
+    Finds what the player would hit moving probe pixels left or right.
+    Both sides are tested in one pass over the objects with the player's
+    mask offset by the probe, so the player is never moved and re-masked.
+    :param player: Player object.
+    :param objects: List of objects to check, in level order.
+    :param probe: Distance to test in pixels.
+    :return: Tuple (first object hit on the left, first object hit on the right), None where free.
+    """
+    collide_left = collide_right = None
+    for obj in objects:
+        if collide_left is None and collides(player, obj, -probe, 0):
+            collide_left = obj
+        if collide_right is None and collides(player, obj, probe, 0):
+            collide_right = obj
+        if collide_left is not None and collide_right is not None:
+            break
+    return collide_left, collide_right
+
+def handle_move(player, level, controls, now):
+    """
+    Handles player movement based on input and prevents movement through obstacles.
+    Also handles player being hit by hazards (e.g., fire).
+    :param player: Player object.
+    :param level: Level whose spatial index supplies the nearby objects.
+    :param controls: Controls held down this tick.
+    :param now: Simulation time in milliseconds, used for the damage interval.
+    """
+    player.x_vel = 0
+    probe = int(PLAYER_VEL * 1.6)
+    # Broadphase: only objects around the player (including the probe distance)
+    # and along the path it fell or jumped this tick can pass the tests below
+    area = player.rect.inflate(probe * 2 + 2, 0).union(swept_start(player, player.y_vel))
+    objects = level.query(area)
+    collide_left, collide_right = probe_sides(player, objects, probe)
+
+    # Move left/right if no collision
+    if controls.left and not collide_left:
+        player.move_left(PLAYER_VEL)
+    if controls.right and not collide_right:
+        player.move_right(PLAYER_VEL)
+
+    # Handle vertical collision (jump/fall)
+    vertical_collide = handle_vertical_collision(player, objects, player.y_vel, level)
+    to_check = [collide_left, collide_right, *vertical_collide]
+
+    fire_touched = False  # track if player is touching fire
+
+    # If player collides with fire, set hit state
+    for obj in to_check:
+        if obj is not None and level.is_hazard(obj):
+            player.make_hit()
+            fire_touched = True
+
+    if fire_touched:
+        last = player.last_fire_damage_time
+        if last is None or now - last >= player.DAMAGE_INTERVAL:
+            player.take_damage(1)  # or whatever amount per tick
+            player.last_fire_damage_time = now
+    else:
+        # Reset timer if player is not on fire
+        # (so they take damage immediately next time they touch)
+        player.last_fire_damage_time = None
+
+class World:
+    """
+    The game simulation without any window, input device or clock.
+    One call to step() advances the level by one fixed tick, so the same
+    code drives the interactive game and headless runs.
+    """
+    def __init__(self, player, level, fps=SIM_RATE, profiler=None):
+        """
+        :param player: Player instance
+        :param level: Level with the objects to simulate
+        :param fps: Simulation ticks per second
+        :param profiler: Optional PhaseProfiler timing the phases of each tick
+        """
+        self.player = player
+        self.level = level
+        self.fps = fps
+        self.score = 0
+        self.ticks = 0
+        self.won = False
+        self.previous_positions = {}  # player -> (x, y) before the last tick; swarm enemies keep their own
+        self.profiler = profiler if profiler is not None else PhaseProfiler()
+
+    @classmethod
+    def load(cls, filename, fps=SIM_RATE, stream=False, progress=None):
+        """
+        Loads a level file (see from_csv), or the built-in level if filename is None.
+        """
+        if filename is None:
+            from level_loader import load_default_level
+            player, level = load_default_level()
+            return cls(player, level, fps)
+        return cls.from_csv(filename, fps, stream, progress)
+
+    @classmethod
+    def from_csv(cls, filename, fps=SIM_RATE, stream=False, progress=None):
+        """
+        Loads a CSV (or compiled) level with all fire hazards switched on.
+        CSV levels are loaded through the compiled level cache.
+        :param stream: Load the level region by region around the player
+                       (StreamingLevel) instead of all at once
+        :param progress: Optional callable(done, total) called while the
+                         level is built (not used when streaming)
+        """
+        # Imported on first use: the loaders pull in the level compiler and
+        # the streaming thread pool, which the menu and built-in level never need
+        if stream:
+            from streaming import load_level_stream
+            player, level = load_level_stream(filename)
+        else:
+            from level_loader import load_level
+            player, level = load_level(filename, progress=progress)
+        for hazard in level.hazards:
+            if isinstance(hazard, Fire):
+                hazard.on()
+        return cls(player, level, fps)
+
+    @property
+    def time_ms(self):
+        """
+        Simulated milliseconds since the level started.
+        """
+        return self.ticks * 1000 // self.fps
+
+    @property
+    def done(self):
+        """
+        True once the flag is reached or the player has died.
+        """
+        return self.won or self.player.health <= 0
+
+    def step(self, controls):
+        """
+        Advances the simulation by one tick.
+        :param controls: Controls for this tick
+        :return: State dictionary after the tick (see state())
+        """
+        player = self.player
+        level = self.level
+        profiler = self.profiler
+        self.previous_positions = {player: (player.rect.x, player.rect.y)}
+        level.focus(player.rect, self.ticks)
+
+        # Update player and hazard (fire) animations and movement
+        with profiler.phase("player"):
+            if controls.jump and player.jump_count < 2:
+                player.jump()
+            player.loop(self.fps)
+        with profiler.phase("objects"):
+            for obj in level.animated:
+                obj.loop()
+            # One vectorized patrol step for every enemy
+            level.enemies.step()
+
+        # Handle user movement and object collisions
+        with profiler.phase("handle_move"):
+            handle_move(player, level, controls, self.time_ms)
+
+        with profiler.phase("pickups"):
+            # Local query around the player; collected coins are dropped in O(1)
+            self.score += len(level.coins.collect(player.rect))
+            for goal in level.goals:
+                if player.rect.colliderect(goal.rect):
+                    self.won = True
+
+        self.ticks += 1
+        return self.state()
+
+    def state(self):
+        """
+        Returns a snapshot of the simulation as plain values.
+        """
+        player = self.player
+        return {
+            "tick": self.ticks,
+            "x": player.rect.x,
+            "y": player.rect.y,
+            "x_vel": player.x_vel,
+            "y_vel": player.y_vel,
+            "health": player.health,
+            "score": self.score,
+            "won": self.won,
+            "dead": player.health <= 0,
+        }
+
+    def checksum(self):
+        """
+        CRC32 of the simulation state after the last tick: the player, the
+        score, the coins left and every enemy's position and velocity.
+        Replays store one per tick, so a change in the simulation shows up
+        at the first tick it alters, even away from the player.
+        """
+        player = self.player
+        data = struct.pack("<qqqdddqqq??q", self.ticks, player.rect.x, player.rect.y,
+                           player.x_vel, player.y_vel, player.health, self.score,
+                           player.jump_count, player.fall_count, player.hit, self.won,
+                           self.level.coins_left())
+        crc = zlib.crc32(data)
+        enemies = self.level.enemies
+        for column in (enemies.x, enemies.y, enemies.vel):
+            crc = zlib.crc32(column[enemies.active].tobytes(), crc)
+        return crc
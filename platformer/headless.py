@@ -0,0 +1,107 @@
+# headless.py
+
+import os
+import sys
+import time
+import argparse
+
+# Must be set before pygame creates a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from config import SIM_RATE
+from game import World, Controls
+from replay import Replay
+
+class HeadlessEngine:
+    """
+    Runs a level without a visible window, dialogs or frame limiter.
+    Input is scripted per tick and the simulation runs as fast as the CPU allows.
+    """
+    def __init__(self, level_file, fps=SIM_RATE, stream=False):
+        """
+        :param level_file: CSV level to load
+        :param fps: Simulation ticks per second (physics rate, not a frame cap)
+        :param stream: Load the level region by region around the player
+        """
+        init_headless()
+        self.level_file = level_file
+        self.world = World.from_csv(level_file, fps, stream)
+
+    def step(self, controls):
+        """
+        Advances the simulation by one tick.
+        :param controls: Controls for this tick
+        :return: State dictionary after the tick
+        """
+        return self.world.step(controls)
+
+    def run(self, script, max_ticks, recording=None):
+        """
+        Steps the simulation until max_ticks or until the level is done.
+        :param script: Either a sequence of Controls (one per tick, idle once
+                       exhausted) or a callable (tick, state) -> Controls
+        :param max_ticks: Upper bound on the number of ticks to simulate
+        :param recording: Optional Replay every tick is recorded into
+        :return: Tuple (final state, ticks per second)
+        """
+        world = self.world
+        idle = Controls()
+        state = world.state()
+        start = time.perf_counter()
+        for tick in range(max_ticks):
+            if callable(script):
+                controls = script(tick, state)
+            elif tick < len(script):
+                controls = script[tick]
+            else:
+                controls = idle
+            state = world.step(controls)
+            if recording is not None:
+                recording.record(controls, world)
+            if world.done:
+                break
+        elapsed = time.perf_counter() - start
+        ticks = state["tick"]
+        return state, (ticks / elapsed if elapsed > 0 else float("inf"))
+
+def init_headless():
+    """
+    Initialises pygame on the SDL dummy driver.
+    A display mode is still required for convert()/convert_alpha().
+    """
+    if not pygame.get_init():
+        pygame.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+
+def scripted_run(hold_right=True, jump_every=45):
+    """
+    Simple built-in script: run in one direction and jump periodically.
+    """
+    def script(tick, state):
+        return Controls(left=not hold_right, right=hold_right,
+                        jump=jump_every > 0 and tick % jump_every == 0)
+    return script
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a level headless and report simulation throughput.")
+    parser.add_argument("level", help="CSV level file")
+    parser.add_argument("--ticks", type=int, default=10000, help="maximum number of ticks to simulate")
+    parser.add_argument("--left", action="store_true", help="hold left instead of right")
+    parser.add_argument("--jump-every", type=int, default=45, help="jump every N ticks (0 = never)")
+    parser.add_argument("--stream", action="store_true", help="load the level region by region")
+    parser.add_argument("--record", help="save the scripted input as a replay file")
+    args = parser.parse_args(argv)
+
+    engine = HeadlessEngine(args.level, stream=args.stream)
+    recording = Replay(args.level, engine.world.fps, stream=args.stream) if args.record else None
+    state, tps = engine.run(scripted_run(not args.left, args.jump_every), args.ticks, recording)
+    if recording is not None:
+        recording.save(args.record)
+    print(state)
+    print(f"{state['tick']} ticks, {tps:.0f} ticks/s")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# hud.py
+
+import pygame
+from assets import ASSETS
+from config import WIDTH
+
+class HUD:
+    """
+    Score and health bar overlay.
+    The font is loaded once, and the score/health surfaces are only
+    re-rendered when the values they show change.
+    """
+    SCORE_COLOR = (255, 223, 0)
+    HEALTH_COLOR = (255, 0, 0)
+    OUTLINE_COLOR = (0, 0, 0)
+    BAR_WIDTH = 200
+    BAR_HEIGHT = 25
+    MARGIN = 20
+
+    def __init__(self, width=WIDTH):
+        """
+        :param width: Screen width, used to right-align the score
+        """
+        self.width = width
+        self.font = ASSETS.get(("font", "Arial", 32, True),
+                               lambda: pygame.font.SysFont("Arial", 32, bold=True))
+        self.score = None
+        self.score_image = None
+        self.score_rect = None
+        self.health = None
+        self.health_image = None
+        self.health_rect = pygame.Rect(self.MARGIN, self.MARGIN, self.BAR_WIDTH, self.BAR_HEIGHT)
+
+    def update(self, score, health, max_health):
+        """
+        Re-renders the surfaces whose values changed.
+        :return: List of screen rects that changed since the last update
+        """
+        dirty = []
+        if score != self.score:
+            if self.score_rect is not None:
+                dirty.append(self.score_rect)
+            self.score = score
+            self.score_image = self.font.render(f"Score: {score}", True, self.SCORE_COLOR)
+            self.score_rect = self.score_image.get_rect(topright=(self.width - self.MARGIN, self.MARGIN))
+            dirty.append(self.score_rect)
+        if health != self.health:
+            self.health = health
+            self.health_image = self._render_health_bar(health, max_health)
+            dirty.append(self.health_rect)
+        return dirty
+
+    def _render_health_bar(self, health, max_health):
+        """
+        Draws the health bar into its own surface.
+        """
+        image = pygame.Surface((self.BAR_WIDTH, self.BAR_HEIGHT), pygame.SRCALPHA)
+        fill = (health / max_health) * self.BAR_WIDTH
+        pygame.draw.rect(image, self.HEALTH_COLOR, pygame.Rect(0, 0, fill, self.BAR_HEIGHT))
+        pygame.draw.rect(image, self.OUTLINE_COLOR, image.get_rect(), 2)
+        return image
+
+    def draw(self, window, score, health, max_health):
+        """
+        Draws the HUD, re-rendering only what changed.
+        :return: List of screen rects that changed since the last frame
+        """
+        dirty = self.update(score, health, max_health)
+        window.blit(self.score_image, self.score_rect)
+        window.blit(self.health_image, self.health_rect)
+        return dirty
@@ -0,0 +1,178 @@
+# level.py
+
+from spatial import SpatialHash
+from enemy import Enemy, EnemySwarm
+from collectibles import Coin, CoinStore
+from objects import Block, Fire, Flag
+
+# Registries an object joins when it is added, by class. Systems that run
+# every tick iterate only their registry instead of isinstance-scanning
+# every object.
+REGISTRIES = (
+    (Fire, ("hazards", "animated")),
+    (Flag, ("goals",)),
+    (Block, ("solids",)),
+)
+REGISTRY_NAMES = ("solids", "hazards", "animated", "goals")
+
+class Level:
+    """
+    Holds every object of a loaded level together with a spatial index,
+    so collision code only has to look at objects near the player.
+    Objects must be added/removed through the level to keep the index in sync.
+
+    Besides `objects`, each object is filed once by type into the registries
+    `solids` (blocks), `hazards` (hurt on touch), `animated` (loop() every
+    tick) and `goals` (finish the level). Objects and registries are
+    insertion-ordered dicts used as sets, so they iterate in level order
+    and removal is O(1). Enemies (`enemies`) and coins (`coins`) have their
+    own stores, and static terrain is a TileMap (`tilemap`) that is queried
+    by grid position instead of holding an object per tile.
+    """
+    def __init__(self, block_size=96):
+        """
+        :param block_size: Tile size of the level, used as the grid cell size
+        """
+        self.block_size = block_size
+        self.objects = {}
+        self.solids = {}
+        self.hazards = {}
+        self.animated = {}
+        self.goals = {}
+        self.tilemap = None  # static terrain, see set_tilemap()
+        self.grid = SpatialHash(block_size)
+        self.enemies = EnemySwarm()  # enemies live in arrays, not in objects
+        self.coins = CoinStore(block_size)  # coins live in their own index
+
+    def add(self, obj, order=None):
+        """
+        Adds an object to the level and the spatial index.
+        Enemy instances are moved into the enemy swarm and coins into the
+        coin store instead.
+        :param order: Optional fixed level order (collision order); by default
+                      objects are ordered by when they were added
+        """
+        if isinstance(obj, Coin):
+            self.coins.add(obj, self.grid.reserve() if order is None else order)
+            return
+        if isinstance(obj, Enemy):
+            rect = obj.rect
+            self.add_enemy(rect.x, rect.y, rect.width, rect.height,
+                           obj.left_bound, obj.right_bound, obj.x_vel, order)
+            return
+        self.objects[obj] = None
+        self.grid.insert(obj, order)
+        self._register(obj)
+
+    def _register(self, obj):
+        for cls, names in REGISTRIES:
+            if isinstance(obj, cls):
+                for name in names:
+                    getattr(self, name)[obj] = None
+                return
+
+    def _unregister(self, obj):
+        for name in REGISTRY_NAMES:
+            getattr(self, name).pop(obj, None)
+
+    def add_enemy(self, x, y, width, height, left_bound, right_bound, speed=2, order=None):
+        """
+        Adds a patrolling enemy to the swarm (same parameters as Enemy).
+        :return: Index of the enemy in the swarm
+        """
+        if order is None:
+            order = self.grid.reserve()
+        return self.enemies.add(x, y, width, height, left_bound, right_bound, speed, order)
+
+    def set_tilemap(self, tilemap):
+        """
+        Sets the static terrain. Its tiles take the level order of their
+        grid position (row * cols + col), so objects that share the grid
+        must be added with the same numbering; objects added without an
+        order sort after the whole grid.
+        """
+        self.tilemap = tilemap
+        if tilemap is not None:
+            self.grid.skip_to(tilemap.rows * tilemap.cols)
+
+    def remove(self, obj):
+        """
+        Removes an object (e.g. a collected coin) from the level.
+        """
+        if isinstance(obj, Coin):
+            self.coins.remove(obj)
+            return
+        del self.objects[obj]
+        self.grid.remove(obj)
+        self._unregister(obj)
+
+    def is_hazard(self, obj):
+        """
+        True if touching obj hurts the player (fire, enemies).
+        """
+        return obj in self.hazards or obj in self.enemies
+
+    def moved(self, obj):
+        """
+        Must be called after a moving object (e.g. an Enemy) changed its rect.
+        """
+        self.grid.move(obj)
+
+    def focus(self, rect, tick=0):
+        """
+        Tells the level which area is about to be simulated; called once at
+        the start of every tick. A plain Level is always fully loaded, so
+        this only trims the tile map's cached solids; a StreamingLevel also
+        loads the regions around rect.
+        :param tick: Number of ticks simulated so far
+        """
+        if self.tilemap is not None:
+            self.tilemap.trim()
+
+    def close(self):
+        """
+        Releases anything the level keeps running (nothing for a plain Level).
+        """
+
+    def query(self, rect, after=None):
+        """
+        Returns the objects whose rect overlaps rect.
+        :param rect: pygame.Rect area to search
+        :param after: Optional object; only objects added after it are returned
+        :return: List of objects in level order
+        """
+        objects = self.grid.query(rect, after)
+        first = -1 if after is None else self.grid.order_of(after)
+        tiles = self.tilemap.query(rect, first) if self.tilemap is not None else []
+        enemies = self.enemies.query(rect, first)
+        coins = self.coins.query(rect, first)
+        if tiles or enemies or coins:
+            return self.grid.merge(objects, tiles, enemies, coins)
+        return objects
+
+    def visible(self, rect):
+        """
+        Returns the terrain and the drawable objects overlapping rect.
+        :param rect: pygame.Rect in world coordinates (usually the camera view)
+        :return: Tuple (list with the tile map if it is in view, list of objects in level order)
+        """
+        objects = [obj for obj in self.grid.query(rect) if hasattr(obj, "draw")]
+        enemies = self.enemies.query(rect, -1)
+        coins = self.coins.query(rect, -1)
+        if enemies or coins:
+            objects = self.grid.merge(objects, enemies, coins)
+        tilemap = self.tilemap
+        terrain = [tilemap] if tilemap is not None and tilemap.rect.colliderect(rect) else []
+        return terrain, objects
+
+    def coins_left(self):
+        """
+        Number of coins of the level not collected yet.
+        """
+        return len(self.coins)
+
+    def drawable_count(self):
+        """
+        Total number of drawables: the tile map, objects, enemies and coins.
+        """
+        return (self.tilemap is not None) + len(self.objects) + len(self.enemies) + len(self.coins)
@@ -0,0 +1,633 @@
+# level_analyzer.py
+
+import os
+import csv
+import sys
+import json
+import math
+import time
+import argparse
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from config import SIM_RATE, PLAYER_VEL
+from player import Player
+from level_compiler import CELL_KINDS
+from level_loader import find_levels
+
+BLOCK_SIZE = 96
+PROBE = int(PLAYER_VEL * 1.6)  # side probe distance of handle_move
+# Entity rect sizes used by level_loader (rects start at the cell's top-left)
+ENTITY_SIZES = {"C": 24, "G": 48}
+# Jump timing tried by the search (see Reachability): the double jump on
+# every DOUBLE_JUMP_EVERY-th tick of a jump, and the first jump of a fall
+# (walking off a ledge, or from the spawn) before the player has dropped
+# a pixel and then at every FALL_JUMP_PIXELS of drop. Finer steps find the
+# same floors on the shipped levels and only make the search slower.
+DOUBLE_JUMP_EVERY = 8
+FALL_JUMP_PIXELS = 96
+MAX_AIR_TICKS = 600
+
+def check_enemy_cell(cell, errors, warnings, where):
+    """
+    Validates a 'leftErightEspeedEwidthEheight' enemy cell the way
+    level_loader reads it: the first five fields must be integers.
+    :param where: Cell position prefix for the messages
+    """
+    fields = cell.split("E")
+    if len(fields) < 5:
+        errors.append(f"{where}: enemy cell '{cell}' needs leftErightEspeedEwidthEheight")
+        return
+    try:
+        left, right, speed, width, height = (int(field) for field in fields[:5])
+    except ValueError:
+        errors.append(f"{where}: enemy cell '{cell}' has a field that is not an integer")
+        return
+    if len(fields) > 5:
+        warnings.append(f"{where}: enemy cell '{cell}' has extra fields, only the first five are used")
+    if width <= 0 or height <= 0:
+        warnings.append(f"{where}: enemy cell '{cell}' has an empty size {width}x{height}")
+    elif right - left < width:
+        warnings.append(f"{where}: enemy cell '{cell}' patrols a range narrower than itself")
+    if speed == 0:
+        warnings.append(f"{where}: enemy cell '{cell}' has speed 0 and never moves")
+
+def parse_level(filename):
+    """
+    Reads a CSV level without loading any sprites and checks every cell.
+    :return: Tuple (rows as lists of cell strings, list of errors, list of warnings)
+    """
+    errors = []
+    warnings = []
+    with open(filename, newline="") as csvfile:
+        rows = list(csv.reader(csvfile))
+    players = 0
+    goals = 0
+    for row_idx, row in enumerate(rows):
+        for col_idx, cell in enumerate(row):
+            if not cell:
+                continue
+            where = f"row {row_idx}, col {col_idx}"
+            if cell in CELL_KINDS:
+                players += cell == "P"
+                goals += cell == "G"
+            elif "E" in cell:
+                check_enemy_cell(cell, errors, warnings, where)
+            else:
+                warnings.append(f"{where}: unknown cell '{cell}' is ignored")
+    if players > 1:
+        warnings.append(f"{players} player starts, the last one is used")
+    if not goals:
+        warnings.append("no goal flag (G)")
+    return rows, errors, warnings
+
+_paths = {}  # (state, block_size, size) -> vertical path, see vertical_path
+_steps = []  # path step id -> (rows before, rows after, reach after) of a tick
+_step_ids = {}  # the other way round
+
+def rect_rows(dy, block_size, size):
+    """
+    Rows a player rect dy pixels below standing height is in, counted from
+    the standing row.
+    :return: Tuple ((top, bottom) rows the rect overlaps, for each ENTITY_SIZES kind the
+             range of rows whose entities it can overlap)
+    """
+    rows = ((block_size - size + dy) // block_size, (block_size - 1 + dy) // block_size)
+    # An entity's rect starts at its cell's top, so it only reaches down
+    reach = tuple(((dy - size - side) // block_size + 2, (dy - 1) // block_size + 2)
+                  for side in ENTITY_SIZES.values())
+    return rows, reach
+
+def vertical_path(state, block_size, size, ticks):
+    """
+    Vertical movement of the player from state with nothing in the way, in
+    whole pixels like its rect. Chain states repeat across passes and
+    levels, so paths are kept and extended when a longer one is needed.
+    :param state: (dy, y_vel, fall_count, jump_count), dy being pixels below standing height
+    :param ticks: Path length needed
+    :return: List of at least ticks (dy, fall_count, y_vel, rows, step) tuples, one per tick:
+             dy and fall_count at its start, y_vel and rows (see rect_rows) after its move,
+             and the id in _steps of the (rows before, rows after, reach after) its masks
+             depend on
+    """
+    key = (state, block_size, size)
+    path = _paths.get(key)
+    if path is None:
+        path = _paths[key] = []
+    if path:
+        dy, fall_count, y_vel, rows, step = path[-1]
+        reach = _steps[step][2]
+        dy += math.floor(y_vel + 0.5)
+        fall_count = min(fall_count + 1, SIM_RATE)
+    else:
+        dy, y_vel, fall_count, _ = state
+        rows, reach = rect_rows(dy, block_size, size)
+    while len(path) < ticks:
+        y_vel = Player.fall_speed(y_vel, fall_count, SIM_RATE)
+        moved = dy + math.floor(y_vel + 0.5)
+        moved_rows, reach = rect_rows(moved, block_size, size)
+        step = _step_ids.setdefault((rows, moved_rows, reach), len(_step_ids))
+        if step == len(_steps):
+            _steps.append((rows, moved_rows, reach))
+        path.append((dy, fall_count, y_vel, moved_rows, step))
+        dy, rows = moved, moved_rows
+        fall_count = min(fall_count + 1, SIM_RATE)  # gravity stops growing there
+    return path
+
+class PassMasks(dict):
+    """
+    Dict that computes a missing value from its key, so a lookup that hits
+    stays a plain dict access.
+    """
+    def __init__(self, compute):
+        """
+        :param compute: Callable(key) that returns the value
+        """
+        super().__init__()
+        self.compute = compute
+
+    def __missing__(self, key):
+        value = self[key] = self.compute(key)
+        return value
+
+class Reachability:
+    """
+    Searches where the player can get to in a level, with the movement
+    rules of Player and handle_move: PLAYER_VEL per tick sideways, blocked
+    PROBE pixels before a wall, Player.JUMP_SPEED jumps (two until landing,
+    also after walking off a ledge) and Player.fall_speed gravity, moving
+    whole pixels like the player's rect. Only terrain (B) blocks; the player
+    is taken as its SIZE x SIZE rect, so the result errs on the safe side for
+    narrow gaps. Fire and enemies hurt but don't stop the player, so they
+    are ignored.
+
+    Sideways moves are whole PLAYER_VEL steps, so the player's x is always
+    on a lattice through the spawn. The search keeps the lattice positions
+    the player can be at as an integer bitset (bit slot * stride + row) and
+    every tick moves all of them left, right or not at all, which covers
+    every sequence of sideways inputs, turning at the apex included.
+    Vertical movement doesn't depend on x, so it is followed as chains of
+    (dy, y_vel, fall_count, jump_count) states relative to a standing row,
+    each moving the positions of every row at once. The search runs in
+    passes: each one starts at rest on the runs (floor the player can walk
+    along) the previous one landed on, and follows the chains that walk off
+    their ends, jump and double jump (see DOUBLE_JUMP_EVERY and
+    FALL_JUMP_PIXELS) until every position has landed or fallen out.
+
+    Jumps are only tried at those steps, so a jump that needs tighter timing
+    is missed and the search can report a reachable cell as unreachable
+    (never the other way round).
+    """
+    REST = (0, 0.0, 0, 0)  # standing on a run
+
+    def __init__(self, rows, block_size=BLOCK_SIZE, size=Player.SIZE):
+        """
+        :param rows: Level cells as returned by parse_level
+        :param block_size: Tile size in pixels
+        :param size: Player rect width/height in pixels
+        """
+        self.block_size = block_size
+        self.size = size
+        self.entities = {}  # (col, row) -> (kind, pygame-style rect tuple)
+        self.spawn = (100, 100)
+        cols = max((len(cells) for cells in rows), default=0)
+        # Grid rows from here on count from an empty row above the level
+        solid = np.zeros((len(rows) + 2, cols), dtype=bool)
+        for row, cells in enumerate(rows):
+            for col, cell in enumerate(cells):
+                if cell == "B":
+                    solid[row + 1, col] = True
+                elif cell in ENTITY_SIZES:
+                    side = ENTITY_SIZES[cell]
+                    self.entities[(col, row)] = (cell, (col * block_size, row * block_size, side, side))
+                elif cell == "P":
+                    self.spawn = (col * block_size, row * block_size)
+        self.stride = len(rows) + 1  # bits per slot, one per row the player can stand in
+        solid_rows = np.flatnonzero(solid.any(axis=1))
+        self.lowest = int(solid_rows[-1]) if len(solid_rows) else 0  # nothing to land on below it
+        self.air_ticks = self._air_ticks()
+
+        # Lattice slots from a little left of the level to a little right of it
+        spawn_x = self.spawn[0]
+        self.origin = (spawn_x + size + 2 * block_size) // PLAYER_VEL + 1  # slot of the spawn
+        self.slots = self.origin + ((cols + 2) * block_size - spawn_x) // PLAYER_VEL + 1
+        self.xs = spawn_x + PLAYER_VEL * (np.arange(self.slots) - self.origin)
+        self.grids = {"overlap": self._overlap(solid, self.xs),
+                      "right": self._overlap(solid, self.xs + PROBE),
+                      "left": self._overlap(solid, self.xs - PROBE)}
+        self.entity_slots = {}  # (col, row) -> (grid row, first slot, last slot) its rect overlaps
+        for kind in ENTITY_SIZES:
+            self.grids[kind] = np.zeros((len(solid), self.slots), dtype=bool)
+        for cell, (kind, (x, _, width, _)) in self.entities.items():
+            first = int(np.searchsorted(self.xs, x - size, "right"))
+            last = int(np.searchsorted(self.xs, x + width, "left")) - 1
+            self.entity_slots[cell] = (cell[1] + 1, first, last)
+            self.grids[kind][cell[1] + 1, first:last + 1] = True
+        self._find_runs()
+        self._masks = {}  # (grid name, row offset) -> bitset over all slots
+        # Masks laid out for the current pass (see _pass), by _mask key and by what they are for
+        self._cuts = PassMasks(lambda key: self._cut(self._mask(*key)))
+        self._sides = PassMasks(self._side_masks)
+        self._lands = PassMasks(self._land_masks)
+        self._touches = PassMasks(self._touch_masks)
+        self._steps = PassMasks(self._step_masks)
+
+    def _air_ticks(self):
+        """
+        Longest a chain can stay in the air before falling out, from the top
+        row: walking off, jumping at any FALL_JUMP_PIXELS step of the fall and
+        double jumping at the top of that jump.
+        """
+        block, size = self.block_size, self.size
+        jump = vertical_path((0, -Player.JUMP_SPEED, 0, 1), block, size, MAX_AIR_TICKS)
+        apex = next(tick for tick, step in enumerate(jump) if step[2] >= 0)
+        flight = [step[0] for step in vertical_path((0, -Player.JUMP_SPEED, jump[apex][1], 2),
+                                                    block, size, MAX_AIR_TICKS)]
+        fall = [step[0] for step in vertical_path(self.REST, block, size, MAX_AIR_TICKS)]
+        out = self.lowest * block + size  # the rect is below the lowest row from here on
+        top = flight.index(min(flight))  # heights only grow from here
+        longest = bisect_left(fall, out)
+        for jump_dy in range(0, out, FALL_JUMP_PIXELS):
+            longest = max(longest, bisect_left(fall, jump_dy) + apex
+                          + bisect_left(flight, out - jump_dy - jump[apex][0], top))
+        return min(longest, MAX_AIR_TICKS)
+
+    def _overlap(self, solid, xs):
+        """
+        For every grid row and every x in xs: would a player rect at x
+        overlap a solid tile of that row?
+        :return: Bool array (rows x len(xs))
+        """
+        block, cols = self.block_size, solid.shape[1]
+        hits = np.zeros((len(solid), len(xs)), dtype=bool)
+        for edge in (xs, xs + self.size - 1):
+            col = edge // block
+            inside = (col >= 0) & (col < cols)
+            hits[:, inside] |= solid[:, col[inside]]
+        return hits
+
+    def _find_runs(self):
+        """
+        Splits the standing positions (rect free, solid tile under it) into
+        runs the player can walk along without jumping.
+        """
+        overlap, right, left = self.grids["overlap"], self.grids["right"], self.grids["left"]
+        standing = ~overlap[:-1] & overlap[1:]
+        walk = standing[:, :-1] & standing[:, 1:] & ~right[:-1, :-1] & ~left[:-1, 1:]
+        self.runs = []  # (grid row, first slot, last slot)
+        self.run_ids = np.zeros(standing.shape, dtype=np.int32)  # index in runs + 1, 0 = can't stand
+        for row in range(len(standing)):
+            slots = np.flatnonzero(standing[row])
+            if not len(slots):
+                continue
+            apart = ~walk[row, slots[:-1]] | (slots[1:] != slots[:-1] + 1)
+            starts = np.flatnonzero(np.concatenate(([True], apart)))
+            ends = np.append(starts[1:], len(slots)) - 1
+            for first, last in zip(slots[starts].tolist(), slots[ends].tolist()):
+                self.runs.append((row, first, last))
+                self.run_ids[row, first:last + 1] = len(self.runs)
+
+    def _span(self, row, first, last):
+        """
+        Bitset of the positions in slots first..last of a grid row.
+        """
+        stride = self.stride
+        return ((1 << (stride * (last - first + 1))) - 1) // ((1 << stride) - 1) << (first * stride + row)
+
+    def _mask(self, name, offset):
+        """
+        Bitset of the positions whose grid row offset rows below their own
+        is set in grids[name] for their slot ("alive": isn't below the
+        lowest solid tile), over all slots.
+        """
+        key = (name, offset)
+        bits = self._masks.get(key)
+        if bits is None:
+            stride = self.stride
+            grid = np.zeros((self.slots, stride), dtype=bool)
+            if name == "alive":
+                grid[:, :max(0, min(stride, self.lowest - offset + 1))] = True
+            else:
+                source = self.grids[name]
+                first, stop = max(0, -offset), min(stride, len(source) - offset)
+                if first < stop:
+                    grid[:, first:stop] = source[first + offset:stop + offset].T
+            bits = self._masks[key] = int.from_bytes(np.packbits(grid, axis=None, bitorder="little").tobytes(),
+                                                     "little")
+        return bits
+
+    def _cut(self, bits):
+        """
+        Cuts the slots of the current pass out of a bitset over all slots.
+        """
+        return (bits >> self._shift) & self._keep
+
+    def _step_masks(self, step):
+        """
+        Masks for one tick of a chain (step as in vertical_path), see
+        _side_masks, _land_masks and _touch_masks.
+        """
+        rows, moved_rows, reach = _steps[step]
+        return self._sides[rows] + self._lands[moved_rows] + self._touches[reach]
+
+    def _side_masks(self, rows):
+        """
+        Positions that can move right and left with the rect over rows (top,
+        bottom) from the standing row.
+        """
+        top, bottom = rows
+        cuts, keep = self._cuts, self._keep
+        return (keep & ~(cuts["right", top] | cuts["right", bottom]),
+                keep & ~(cuts["left", top] | cuts["left", bottom]))
+
+    def _land_masks(self, rows):
+        """
+        Positions whose rect over rows (top, bottom) from the standing row
+        overlaps a tile, those of them overlapping one in row top, and the
+        free ones (leaving out the ones that have fallen out).
+        """
+        top, bottom = rows
+        alive, upper = self._cuts["alive", top], self._cuts["overlap", top]
+        blocked = upper | self._cuts["overlap", bottom]
+        return alive & blocked, alive & upper, alive & ~blocked
+
+    def _touch_masks(self, reach):
+        """
+        Positions whose rect overlaps a coin or flag in the rows of reach (see
+        rect_rows), and (kind, row offset, positions) for each row.
+        """
+        touch, kinds = 0, []
+        for kind, (first, stop) in zip(ENTITY_SIZES, reach):
+            for row in range(first, stop):
+                bits = self._cuts[kind, row]
+                if bits:
+                    kinds.append((kind, row, bits))
+                    touch |= bits
+        return touch, kinds
+
+    def _decode(self, bits):
+        """
+        Positions of a bitset of the current pass.
+        :return: Tuple of arrays (slots, grid rows)
+        """
+        data = np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+        index = np.flatnonzero(np.unpackbits(data, bitorder="little"))
+        return index // self.stride + self._base, index % self.stride
+
+    def _touch(self, bits, kind, offset, touched):
+        """
+        Adds the coins/flags of one kind overlapped by the positions in bits
+        (offset rows below theirs) to touched, and takes them out of the masks.
+        """
+        block, size, side = self.block_size, self.size, ENTITY_SIZES[kind]
+        slots, rows = self._decode(bits)
+        for slot, row in set(zip(slots.tolist(), (rows + offset - 1).tolist())):
+            x = int(self.xs[slot])
+            for col in range((x - side) // block + 1, (x + size - 1) // block + 1):
+                cell = (col, row)
+                entity = self.entities.get(cell)
+                if entity is None or entity[0] != kind or cell in touched:
+                    continue
+                touched.add(cell)
+                grid_row, first, last = self.entity_slots[cell]
+                self.grids[kind][grid_row, first:last + 1] = False
+                for key in [key for key in self._masks if key[0] == kind]:
+                    if 0 <= grid_row - key[1] < self.stride:
+                        span = self._span(grid_row - key[1], first, last)
+                        self._masks[key] &= ~span
+                        if key in self._cuts:
+                            self._cuts[key] &= ~self._cut(span)
+                self._touches.clear()
+                self._steps.clear()
+
+    def _chain(self, state, positions, queue, jumps, touched):
+        """
+        Moves positions along one vertical chain until they have all landed
+        or fallen out, queueing the chains that branch off it: head hits on
+        queue, jumps on jumps.
+        :param state: (dy, y_vel, fall_count, jump_count) the chain starts in
+        :return: Bitset of the standing positions landed on
+        """
+        block, size, stride, steps = self.block_size, self.size, self.stride, self._steps
+        start_dy, _, _, jump_count = state
+        next_jump = (start_dy // FALL_JUMP_PIXELS + 1) * FALL_JUMP_PIXELS
+        landed = 0
+        path = vertical_path(state, block, size, self.air_ticks)
+        for tick in range(self.air_ticks):
+            if not positions:
+                break
+            dy, fall_count, y_vel, rows, step = path[tick]
+            if jump_count == 0:
+                if dy == start_dy:
+                    branch = (dy, -Player.JUMP_SPEED, 0, 1)
+                    jumps[branch] = jumps.get(branch, 0) | positions
+                elif dy >= next_jump:
+                    # Jump from the last step passed, a whole number of rows
+                    # below one of the standing jump heights
+                    jump_dy = dy - dy % FALL_JUMP_PIXELS
+                    next_jump = jump_dy + FALL_JUMP_PIXELS
+                    down, jump_dy = divmod(jump_dy, block)
+                    branch = (jump_dy, -Player.JUMP_SPEED, 0, 1)
+                    jumps[branch] = jumps.get(branch, 0) | (positions & self._cuts["alive", down]) << down
+            elif jump_count == 1 and tick and not tick % DOUBLE_JUMP_EVERY:
+                branch = (dy, -Player.JUMP_SPEED, fall_count, 2)
+                jumps[branch] = jumps.get(branch, 0) | positions
+
+            # Sideways first, blocked by the tiles beside the rect before it moves
+            right, left, blocked, upper, free, touch, kinds = steps[step]
+            positions |= ((positions & right) << stride) | ((positions & left) >> stride)
+            hit = positions & blocked
+            positions &= free
+            if hit and not y_vel:
+                positions |= hit  # handle_move only collides while moving
+            elif hit:
+                upper &= hit
+                for hits, row in zip((upper, hit & ~upper), rows):
+                    if not hits:
+                        continue
+                    if y_vel > 0:
+                        # Stands on the tile row it hit
+                        landed |= hits << (row - 1) if row > 0 else hits >> (1 - row)
+                    else:
+                        branch = (row * block + size, -y_vel, 0, jump_count)
+                        queue[branch] = queue.get(branch, 0) | hits
+
+            if touch and positions & touch:
+                for kind, offset, bits in kinds:
+                    found = positions & bits
+                    if found:
+                        self._touch(found, kind, offset, touched)
+        return landed
+
+    def _pass(self, state, spans, touched):
+        """
+        Follows all chains from positions at rest in one state.
+        :param spans: List of (grid row, first slot, last slot) the positions are in
+        :return: Tuple of arrays (slots, grid rows) of the standing positions landed on
+        """
+        stride = self.stride
+        # Positions move a slot per tick at most, so nothing leaves this window
+        self._base = max(0, min(span[1] for span in spans) - self.air_ticks)
+        self._shift = self._base * stride
+        top = min(self.slots, max(span[2] for span in spans) + self.air_ticks + 1)
+        self._keep = (1 << ((top - self._base) * stride)) - 1
+        for masks in (self._cuts, self._sides, self._lands, self._touches, self._steps):
+            masks.clear()
+        positions = 0
+        for row, first, last in spans:
+            positions |= self._span(row, first - self._base, last - self._base)
+
+        chains = ({}, {}, {})  # by jump count; every chain with fewer jumps runs first
+        chains[state[3]][state] = positions
+        landed = 0
+        for jump_count, queue in enumerate(chains):
+            done = {}
+            jumps = chains[jump_count + 1] if jump_count < 2 else None
+            while queue:
+                state, positions = queue.popitem()
+                seen = done.get(state, 0)
+                positions &= ~seen
+                if positions:
+                    done[state] = seen | positions
+                    landed |= self._chain(state, positions, queue, jumps, touched)
+        return self._decode(landed)
+
+    def _groups(self, spans):
+        """
+        Splits spans into groups far enough apart that their positions can't
+        meet in a pass, so each pass window stays small.
+        """
+        spans = sorted(spans, key=lambda span: span[1])
+        groups = [[spans[0]]]
+        end = spans[0][2]
+        for span in spans[1:]:
+            if span[1] - end > 2 * self.air_ticks:
+                groups.append([])
+            groups[-1].append(span)
+            end = max(end, span[2])
+        return groups
+
+    def search(self):
+        """
+        Finds the runs reachable from the spawn, a pass per group of runs
+        landed on in the one before.
+        :return: Tuple (set of reachable standing cells, set of touched coin/flag cells)
+        """
+        block, size = self.block_size, self.size
+        touched = set()
+        reached = set()  # run ids
+        spawn_y = self.spawn[1]
+        row = spawn_y // block + 1
+        if row >= self.stride:
+            return set(), touched
+        slots, rows = self._pass((spawn_y - row * block + size, 0.0, 0, 0),
+                                 [(row, self.origin, self.origin)], touched)
+        while True:
+            found = set(self.run_ids[rows, slots].tolist()) - reached
+            found.discard(0)
+            if not found:
+                break
+            reached |= found
+            landed = [self._pass(self.REST, group, touched)
+                      for group in self._groups([self.runs[run - 1] for run in found])]
+            slots = np.concatenate([slots for slots, _ in landed])
+            rows = np.concatenate([rows for _, rows in landed])
+
+        nodes = set()
+        half = size // 2
+        for run in reached:
+            row, first, last = self.runs[run - 1]
+            for col in range((int(self.xs[first]) + half) // block, (int(self.xs[last]) + half) // block + 1):
+                nodes.add((col, row - 1))
+        return nodes, touched
+
+def analyze_level(filename, block_size=BLOCK_SIZE):
+    """
+    Validates one CSV level and checks that its flag and coins can be reached.
+    Runs without a display, so it can be used in worker processes.
+    :return: Report dictionary (plain values)
+    """
+    start = time.perf_counter()
+    report = {"file": filename, "errors": [], "warnings": []}
+    try:
+        rows, errors, warnings = parse_level(filename)
+    except (OSError, UnicodeDecodeError, csv.Error) as error:
+        report["errors"].append(f"cannot read level: {error}")
+        report["seconds"] = time.perf_counter() - start
+        return report
+    report["errors"] += errors
+    report["warnings"] += warnings
+    report["cols"] = max((len(row) for row in rows), default=0)
+    report["rows"] = len(rows)
+
+    search = Reachability(rows, block_size)
+    nodes, touched = search.search()
+    coins = sorted(cell for cell, entity in search.entities.items() if entity[0] == "C")
+    goals = sorted(cell for cell, entity in search.entities.items() if entity[0] == "G")
+    missed = [cell for cell in coins if cell not in touched]
+    report["standing_cells"] = len(nodes)
+    report["coins"] = len(coins)
+    report["coins_reachable"] = len(coins) - len(missed)
+    report["goal_reachable"] = any(cell in touched for cell in goals)
+    # The search can miss jumps that need exact timing, so these are warnings
+    if goals and not report["goal_reachable"]:
+        report["warnings"].append("goal flag " + ", ".join(f"(row {row}, col {col})" for col, row in goals)
+                                  + " cannot be reached")
+    if missed:
+        report["warnings"].append(f"{len(missed)} coin(s) cannot be reached: "
+                                  + ", ".join(f"(row {row}, col {col})" for col, row in missed))
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+def analyze_levels(files, jobs=None):
+    """
+    Analyzes levels on a process pool; reports come back in the order of files.
+    :param jobs: Worker processes (None = one per CPU, 1 = in this process)
+    """
+    if jobs == 1 or len(files) < 2:
+        return [analyze_level(filename) for filename in files]
+    jobs = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(analyze_level, files, chunksize=max(1, len(files) // (jobs * 8))))
+
+def format_report(report):
+    """
+    One summary line per level, followed by its errors and warnings.
+    """
+    status = "ERROR" if report["errors"] else "WARN" if report["warnings"] else "OK"
+    line = f"{status:5} {report['file']}"
+    if "rows" in report:
+        goal = "goal reachable" if report["goal_reachable"] else "goal NOT reachable"
+        line += (f"  {report['cols']}x{report['rows']}, coins {report['coins_reachable']}/{report['coins']},"
+                 f" {goal}  ({report['seconds'] * 1000:.0f} ms)")
+    lines = [line]
+    lines += [f"    error: {message}" for message in report["errors"]]
+    lines += [f"    warning: {message}" for message in report["warnings"]]
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate CSV levels and check that their flag and coins can be reached.")
+    parser.add_argument("paths", nargs="+", help="CSV level files or directories")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--json", help="also write the reports to this JSON file")
+    parser.add_argument("--quiet", action="store_true", help="only print levels with problems")
+    parser.add_argument("--strict", action="store_true", help="exit with status 1 on warnings too")
+    args = parser.parse_args(argv)
+
+    files = find_levels(args.paths)
+    start = time.perf_counter()
+    reports = analyze_levels(files, args.jobs)
+    elapsed = time.perf_counter() - start
+    for report in reports:
+        if not args.quiet or report["errors"] or report["warnings"]:
+            print(format_report(report))
+    failed = sum(1 for report in reports if report["errors"])
+    warned = sum(1 for report in reports if report["warnings"] and not report["errors"])
+    print(f"{len(files)} levels in {elapsed:.2f} s: {failed} with errors, {warned} with warnings")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+    return 1 if failed or (args.strict and warned) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
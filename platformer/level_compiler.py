@@ -0,0 +1,264 @@
+# level_compiler.py
+
+import os
+import csv
+import sys
+import mmap
+import struct
+import hashlib
+import argparse
+import tempfile
+import numpy as np
+
+# Compiled level layout (little endian):
+#   header     HEADER, padded to 8 bytes
+#   tiles      rows * cols uint8 tile kinds, row-major, padded to 8 bytes
+#   entities   entity_count * ENTITY_FIELDS int32, sorted by CSV position
+MAGIC = b"PLVL"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIiiIqq20s")  # magic, version, reserved, cols, rows,
+                                          # player col/row, entity count,
+                                          # source size, source mtime_ns, source sha1
+EXTENSION = ".lvl"
+CACHE_DIR = "__levelcache__"
+
+# Tile kinds in the packed grid
+TILE_EMPTY = 0
+TILE_BLOCK = 1
+TILE_FIRE = 2
+TILE_COIN = 3
+TILE_GOAL = 4
+TILE_PLAYER = 5
+TILE_ENEMY = 6
+CELL_KINDS = {"B": TILE_BLOCK, "F": TILE_FIRE, "C": TILE_COIN, "G": TILE_GOAL, "P": TILE_PLAYER}
+
+# Entity table columns; left/right/speed/width/height are only used by enemies
+ENTITY_FIELDS = 8
+KIND, COL, ROW, LEFT, RIGHT, SPEED, WIDTH, HEIGHT = range(ENTITY_FIELDS)
+
+def _align(offset, size=8):
+    return (offset + size - 1) // size * size
+
+def _source_hash(filename):
+    digest = hashlib.sha1()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+def parse_enemy_cell(cell):
+    """
+    Reads a 'leftErightEspeedEwidthEheight' enemy cell. Fields after the
+    fifth are ignored (level_analyzer warns about them).
+    :return: Tuple (left, right, speed, width, height)
+    :raises ValueError: Fewer than five fields, or one of them not an integer
+    """
+    fields = cell.split('E')
+    if len(fields) < 5:
+        raise ValueError(f"enemy cell '{cell}' needs leftErightEspeedEwidthEheight")
+    try:
+        return tuple(int(field) for field in fields[:5])
+    except ValueError:
+        raise ValueError(f"enemy cell '{cell}' has a field that is not an integer") from None
+
+def compile_level(source, output):
+    """
+    Compiles a CSV level into the binary format.
+    Enemy cells ('leftErightEspeedEwidthEheight') are decoded once here
+    instead of on every load.
+    :param source: CSV level file
+    :param output: Compiled file to write (replaced atomically)
+    :return: output
+    """
+    grid = []
+    entities = []
+    player = (-1, -1)
+    with open(source, newline='') as csvfile:
+        for row_idx, row in enumerate(csv.reader(csvfile)):
+            tiles = bytearray(len(row))
+            for col_idx, cell in enumerate(row):
+                kind = CELL_KINDS.get(cell)
+                if kind is None:
+                    if 'E' not in cell:
+                        continue  # empty or unknown cell
+                    try:
+                        left, right, speed, width, height = parse_enemy_cell(cell)
+                    except ValueError as error:
+                        raise ValueError(f"{source}: row {row_idx}, col {col_idx}: {error}") from None
+                    entities.append((TILE_ENEMY, col_idx, row_idx, left, right, speed, width, height))
+                    tiles[col_idx] = TILE_ENEMY
+                    continue
+                tiles[col_idx] = kind
+                if kind == TILE_PLAYER:
+                    player = (col_idx, row_idx)
+                elif kind != TILE_BLOCK:
+                    entities.append((kind, col_idx, row_idx, 0, 0, 0, 0, 0))
+            grid.append(tiles)
+
+    cols = max((len(tiles) for tiles in grid), default=0)
+    stat = os.stat(source)
+    header = HEADER.pack(MAGIC, VERSION, 0, cols, len(grid), player[0], player[1], len(entities),
+                         stat.st_size, stat.st_mtime_ns, _source_hash(source))
+
+    directory = os.path.dirname(output) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(suffix=EXTENSION, dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header.ljust(_align(HEADER.size), b"\0"))
+            for tiles in grid:
+                f.write(tiles.ljust(cols, b"\0"))
+            f.write(b"\0" * (_align(cols * len(grid)) - cols * len(grid)))
+            f.write(np.asarray(entities, dtype="<i4").reshape(-1, ENTITY_FIELDS).tobytes())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, output)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return output
+
+def compiled_path(source):
+    """
+    Returns where the compiled cache of a CSV level lives:
+    levels/x.csv -> levels/__levelcache__/x.lvl
+    """
+    directory, name = os.path.split(source)
+    return os.path.join(directory, CACHE_DIR, os.path.splitext(name)[0] + EXTENSION)
+
+def _fallback_path(source):
+    """
+    Cache location in the temp directory, for read-only level folders.
+    """
+    key = hashlib.sha1(os.path.abspath(source).encode()).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), "platformer" + CACHE_DIR, key + EXTENSION)
+
+def _read_header(filename):
+    try:
+        with open(filename, "rb") as f:
+            data = f.read(HEADER.size)
+    except OSError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    header = HEADER.unpack(data)
+    if header[0] != MAGIC or header[1] != VERSION:
+        return None
+    return header
+
+def _is_current(source, output):
+    """
+    Checks a compiled file against its source: mtime and size first, then
+    the content hash (a touched but unchanged CSV is not recompiled; its
+    new mtime is written into the header instead).
+    """
+    header = _read_header(output)
+    if header is None:
+        return False
+    stat = os.stat(source)
+    size, mtime_ns, digest = header[8:11]
+    if size == stat.st_size and mtime_ns == stat.st_mtime_ns:
+        return True
+    if size != stat.st_size or _source_hash(source) != digest:
+        return False
+    try:
+        with open(output, "r+b") as f:
+            f.write(HEADER.pack(*header[:9], stat.st_mtime_ns, digest))
+    except OSError:
+        pass
+    return True
+
+def ensure_compiled(filename, force=False):
+    """
+    Returns the path of an up-to-date compiled level, compiling if needed.
+    :param filename: CSV level (compiled via the cache) or an already compiled file
+    :param force: Recompile even if the cache is current
+    """
+    if filename.endswith(EXTENSION):
+        return filename
+    for output in (compiled_path(filename), _fallback_path(filename)):
+        if not force and _is_current(filename, output):
+            return output
+        try:
+            return compile_level(filename, output)
+        except OSError:
+            continue  # level folder not writable, use the temp directory
+    raise OSError(f"Cannot write a compiled cache for {filename}")
+
+class CompiledLevel:
+    """
+    Read-only view of a compiled level.
+    The file is memory-mapped and `tiles` (rows x cols uint8) and `entities`
+    (N x ENTITY_FIELDS int32) are NumPy views straight into the mapping, so
+    opening a level costs the same however large it is; pages are only read
+    when a part of the level is actually used.
+    """
+    def __init__(self, filename):
+        """
+        :param filename: Compiled level file (see ensure_compiled)
+        """
+        self.filename = filename
+        with open(filename, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = HEADER.unpack_from(self._mmap, 0)
+        if header[0] != MAGIC or header[1] != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{filename} is not a compiled level (version {VERSION})")
+        _, _, _, self.cols, self.rows, player_col, player_row, count = header[:8]
+        self.player = None if player_col < 0 else (player_col, player_row)
+
+        offset = _align(HEADER.size)
+        self.tiles = np.frombuffer(self._mmap, dtype=np.uint8, count=self.rows * self.cols,
+                                   offset=offset).reshape(self.rows, self.cols)
+        offset += _align(self.rows * self.cols)
+        self.entities = np.frombuffer(self._mmap, dtype="<i4", count=count * ENTITY_FIELDS,
+                                      offset=offset).reshape(count, ENTITY_FIELDS)
+
+    def tile(self, col, row):
+        """
+        Returns the tile kind at (col, row), TILE_EMPTY outside the level.
+        """
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return int(self.tiles[row, col])
+        return TILE_EMPTY
+
+    def block_cells(self, col0=0, row0=0, col1=None, row1=None):
+        """
+        Returns the (col, row) of every solid tile in the given tile range.
+        """
+        rows, cols = np.nonzero(self.tiles[row0:row1, col0:col1] == TILE_BLOCK)
+        return list(zip((cols + col0).tolist(), (rows + row0).tolist()))
+
+    def entities_in(self, col0, row0, col1, row1):
+        """
+        Returns the entity rows with col0 <= col < col1 and row0 <= row < row1.
+        Entities are sorted by CSV position, so the row band is a binary search.
+        """
+        row_column = self.entities[:, ROW]
+        start, end = np.searchsorted(row_column, (row0, row1))
+        band = self.entities[start:end]
+        return band[(band[:, COL] >= col0) & (band[:, COL] < col1)]
+
+    def close(self):
+        """
+        Releases the mapping; tiles/entities must not be used afterwards.
+        """
+        self.tiles = self.entities = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # arrays handed out still point into the mapping; freed with them
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile CSV levels into the binary level format.")
+    parser.add_argument("levels", nargs="+", help="CSV level files")
+    parser.add_argument("--force", action="store_true", help="recompile even if the cache is current")
+    args = parser.parse_args(argv)
+    for source in args.levels:
+        output = ensure_compiled(source, args.force)
+        level = CompiledLevel(output)
+        print(f"{source} -> {output}  {level.cols}x{level.rows}, {len(level.entities)} entities")
+        level.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,90 @@
 # level_loader.py
 
+import os
 import csv
+from glob import glob
+import numpy as np
 from objects import Block, Fire, Flag
 from player import Player
-from enemy import Enemy
 from collectibles import Coin
-from config import WIDTH, HEIGHT
+from level import Level
+from terrain import TileMap
+from config import WIDTH as SCREEN_WIDTH, HEIGHT as SCREEN_HEIGHT
+from utils import prefetch_sprite_sheets, prefetch_scaled_image, prefetch_block
+from level_compiler import (ensure_compiled, parse_enemy_cell, CompiledLevel, TILE_BLOCK, TILE_FIRE,
+                            TILE_COIN, TILE_GOAL, TILE_ENEMY, KIND, COL, ROW, LEFT, RIGHT, SPEED, WIDTH, HEIGHT)
 
-def load_level_csv(filename, block_size=96):
+def add_cell(level, cell, x, y, order=None):
     """
-    Loads a level from a CSV file and returns player, objects.
+    Creates the object for one non-terrain, non-player CSV cell and adds it.
+    :param level: Level (or anything with the same add/add_enemy methods)
+    :param cell: Cell text from the CSV
+    :param x: World x of the cell
+    :param y: World y of the cell
+    :param order: Optional fixed level order, passed on to level.add
+    """
+    if cell == 'F':
+        level.add(Fire(x, y, 16, 32), order)  # Adjust size as needed
+    elif 'E' in cell:
+        left_bound, right_bound, speed, width, height = parse_enemy_cell(cell)
+        level.add_enemy(x, y, width, height, left_bound, right_bound, speed, order)
+    elif cell == 'C':
+        level.add(Coin(x, y, 24), order)
+    elif cell == 'G':
+        level.add(Flag(x, y, 48), order)
+    # Add more symbols as you add more objects!
+
+def add_entity(level, entity, block_size, order=None):
+    """
+    Creates the object for one row of a compiled level's entity table and adds it.
+    :param level: Level (or anything with the same add/add_enemy methods)
+    :param entity: Entity row (see level_compiler.ENTITY_FIELDS)
+    :param block_size: Tile size in pixels
+    :param order: Optional fixed level order, passed on to level.add
+    """
+    kind = entity[KIND]
+    x = entity[COL] * block_size
+    y = entity[ROW] * block_size
+    if kind == TILE_FIRE:
+        level.add(Fire(x, y, 16, 32), order)
+    elif kind == TILE_ENEMY:
+        level.add_enemy(x, y, entity[WIDTH], entity[HEIGHT], entity[LEFT], entity[RIGHT],
+                        entity[SPEED], order)
+    elif kind == TILE_COIN:
+        level.add(Coin(x, y, 24), order)
+    elif kind == TILE_GOAL:
+        level.add(Flag(x, y, 48), order)
+
+def prefetch_assets(block_size=96):
+    """
+    Worker-thread half of warm_assets(): reads or decodes the files behind
+    the shared level sprites without converting them.
+    """
+    prefetch_sprite_sheets("MainCharacters", "NinjaFrog", 32, 32, True)
+    prefetch_sprite_sheets("Traps", "Fire", 16, 32)
+    prefetch_scaled_image(Flag.IMAGE, 48)
+    prefetch_block(block_size)
+
+def warm_assets(block_size=96):
+    """
+    Builds the sprites shared by every level object on the main thread,
+    so levels can then be built on other threads from cached surfaces only.
+    """
+    Player(0, 0, 50, 50)
+    Fire(0, 0, 16, 32)
+    Coin(0, 0, 24)
+    Flag(0, 0, 48)
+    Block(0, 0, block_size)
+
+def load_level_csv(filename, block_size=96, progress=None):
+    """
+    Loads a level from a CSV file and returns player, level.
+    :param progress: Optional callable(done, total) called after each CSV row
     Returns:
         player: Player instance at specified location
-        objects: List of Block, Fire, etc.
+        level: Level holding the terrain tile map, Fire, etc. and their spatial index
     """
-    objects = []
+    level = Level(block_size)
     player = None
 
     # Open CSV and parse it row by row
@@ -22,35 +92,105 @@ def load_level_csv(filename, block_size=96):
         reader = csv.reader(csvfile)
         rows = list(reader)
 
+    # Static terrain goes into the tile map; every object gets its grid
+    # position as level order, so collision order follows the CSV.
+    cols = max((len(row) for row in rows), default=0)
+    tiles = np.zeros((len(rows), cols), dtype=np.uint8)
+
     # Loop through the CSV grid
     for row_idx, row in enumerate(rows):
         for col_idx, cell in enumerate(row):
             x = col_idx * block_size
             y = row_idx * block_size
             if cell == 'B':
-                objects.append(Block(x, y, block_size))
-            elif cell == 'F':
-                objects.append(Fire(x, y, 16, 32))  # Adjust size as needed
+                tiles[row_idx, col_idx] = TILE_BLOCK
             elif cell == 'P':
                 player = Player(x, y, 50, 50)  # Adjust player size as needed
-            elif 'E' in cell:
-                enemy_data = cell.split('E')
-                print(enemy_data)
-                left_bound = int(enemy_data[0])
-                right_bound = int(enemy_data[1])
-                speed = int(enemy_data[2])
-                width = int(enemy_data[3])
-                height = int(enemy_data[4])
-                objects.append(Enemy(x, y, width, height, left_bound, right_bound, speed))
-            elif cell == 'C':
-                objects.append(Coin(x, y, 24))
-            elif cell == 'G':
-                objects.append(Flag(x, y, 48))
-            # Add more symbols as you add more objects!
-            
+            else:
+                try:
+                    add_cell(level, cell, x, y, row_idx * cols + col_idx)
+                except ValueError as error:
+                    raise ValueError(f"{filename}: row {row_idx}, col {col_idx}: {error}") from None
+        if progress is not None:
+            progress(row_idx + 1, len(rows))
+    level.set_tilemap(TileMap(tiles, block_size))
 
     # If no player defined, spawn at 100,100 by default
     if player is None:
         player = Player(100, 100, 50, 50)
 
-    return player, objects
+    return player, level
+
+def load_level_compiled(filename, block_size=96, progress=None):
+    """
+    Loads a compiled level (see level_compiler.py) and returns player, level,
+    like load_level_csv. Objects get their CSV position as level order, so
+    collision order is the same as with the CSV loader.
+    """
+    data = CompiledLevel(filename)
+    level = Level(block_size)
+    cols = data.cols
+
+    # Copied, the file is unmapped below (StreamingLevel keeps the mapping instead)
+    level.set_tilemap(TileMap(np.array(data.tiles), block_size))
+    entities = data.entities.tolist()
+    for done, entity in enumerate(entities, 1):
+        add_entity(level, entity, block_size, entity[ROW] * cols + entity[COL])
+        if progress is not None and done % 256 == 0:
+            progress(done, len(entities))
+
+    if data.player is not None:
+        player = Player(data.player[0] * block_size, data.player[1] * block_size, 50, 50)
+    else:
+        player = Player(100, 100, 50, 50)
+    data.close()
+    return player, level
+
+def load_level(filename, block_size=96, progress=None):
+    """
+    Loads a CSV or compiled level and returns player, level.
+    CSV levels are compiled once and then loaded from the cached binary
+    file until the CSV changes.
+    :param progress: Optional callable(done, total) called while the level is built
+    :raises ValueError: A cell the level can't be built from (e.g. a malformed
+                        enemy cell), named with its file, row and column
+    """
+    try:
+        compiled = ensure_compiled(filename)
+    except OSError:
+        return load_level_csv(filename, block_size, progress)
+    return load_level_compiled(compiled, block_size, progress)
+
+def load_default_level(block_size=96):
+    """
+    Builds the built-in level (a floor, a few blocks, fire and an enemy)
+    played when no level file is given, and returns player, level.
+    """
+    # Create a floor that covers the width of the level
+    floor = [Block(i * block_size, SCREEN_HEIGHT - block_size, block_size)
+             for i in range(-SCREEN_WIDTH // block_size, SCREEN_WIDTH * 2 // block_size)]
+    player = Player(100, 100, 50, 50)
+
+    level = Level(block_size)
+    # Add a fire hazard and some extra blocks
+    for obj in [
+        *floor,
+        Block(0, SCREEN_HEIGHT - block_size * 2, block_size),
+        Block(block_size * 3, SCREEN_HEIGHT - block_size * 4, block_size),
+        Fire(200, SCREEN_HEIGHT - block_size - 64, 16, 32),
+    ]:
+        level.add(obj)
+    level.add_enemy(300, SCREEN_HEIGHT - block_size * 2, 40, 40, left_bound=200, right_bound=500, speed=2)
+    return player, level
+
+def find_levels(paths):
+    """
+    Expands directories into the CSV levels below them.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(glob(os.path.join(path, "**", "*.csv"), recursive=True))
+        else:
+            files.append(path)
+    return files
@@ -0,0 +1,81 @@
+# levelgen.py
+
+import csv
+import random
+import argparse
+
+# Fraction of cells of each kind, per density preset
+DENSITIES = {
+    "sparse": {"platform": 0.03, "F": 0.005, "C": 0.01, "E": 0.002},
+    "normal": {"platform": 0.08, "F": 0.01, "C": 0.03, "E": 0.005},
+    "dense": {"platform": 0.20, "F": 0.03, "C": 0.08, "E": 0.02},
+}
+
+def generate_level(cols, rows, density="normal", seed=0, block_size=96):
+    """
+    Generates a synthetic level grid in the CSV level format.
+    The bottom row is solid ground, the player starts on the left, the flag
+    sits at the far right and platforms, fire, coins and patrolling enemies
+    are scattered in between.
+    :param cols: Level width in tiles
+    :param rows: Level height in tiles (at least 4)
+    :param density: Key of DENSITIES or a dict with the same keys
+    :param seed: Random seed, the same arguments always give the same level
+    :param block_size: Tile size used for the enemy patrol bounds
+    :return: List of rows, each a list of cell strings
+    """
+    rates = DENSITIES[density] if isinstance(density, str) else density
+    rng = random.Random(seed)
+    grid = [["" for _ in range(cols)] for _ in range(rows)]
+
+    # Solid floor, with a few gaps away from the start and the goal
+    for col in range(cols):
+        grid[rows - 1][col] = "B"
+    for col in range(8, cols - 8):
+        if rng.random() < 0.02:
+            grid[rows - 1][col] = ""
+
+    for row in range(1, rows - 1):
+        for col in range(4, cols - 2):
+            roll = rng.random()
+            if roll < rates["platform"]:
+                grid[row][col] = "B"
+                continue
+            roll -= rates["platform"]
+            if roll < rates["F"]:
+                grid[row][col] = "F"
+                continue
+            roll -= rates["F"]
+            if roll < rates["C"]:
+                grid[row][col] = "C"
+                continue
+            roll -= rates["C"]
+            if roll < rates["E"]:
+                # left E right E speed E width E height, bounds in pixels
+                left = max(0, col - rng.randint(1, 3)) * block_size
+                right = (col + rng.randint(2, 4)) * block_size
+                grid[row][col] = f"{left}E{right}E{rng.randint(1, 3)}E80E80"
+
+    grid[rows - 2][1] = "P"
+    grid[rows - 2][cols - 2] = "G"
+    return grid
+
+def write_level_csv(filename, grid):
+    """
+    Writes a generated grid as a CSV level.
+    """
+    with open(filename, "w", newline="") as csvfile:
+        csv.writer(csvfile).writerows(grid)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic CSV level.")
+    parser.add_argument("output", help="CSV file to write")
+    parser.add_argument("--cols", type=int, default=256)
+    parser.add_argument("--rows", type=int, default=24)
+    parser.add_argument("--density", choices=sorted(DENSITIES), default="normal")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    write_level_csv(args.output, generate_level(args.cols, args.rows, args.density, args.seed))
+
+if __name__ == "__main__":
+    main()
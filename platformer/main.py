@@ -1,325 +1,260 @@
 # main.py
 
-import sys
+from time import perf_counter
+_STARTED = perf_counter()  # start of the import phase in --startup-profile
+
+import argparse
 import pygame
 import pygame.time
-import wx
-from config import WIDTH, HEIGHT, FPS, BG_COLOR, PLAYER_VEL
-from utils import load_sprite_sheets, get_block
-from player import Player
-from objects import Block, Fire, Flag
-from enemy import Enemy
-from collectibles import Coin
-from level_loader import load_level_csv
-import os
-import thread
-
-def get_background(name):
-    """
-    Loads the background image and calculates tile positions to fill the screen.
-    :param name: Filename of the background image.
-    :return: Tuple (list of tile positions, background image surface)
-    """
-    from os.path import join
-    image = pygame.image.load(join("assets", "Background", name))
-    _, _, width, height = image.get_rect()
-    tiles = []
-    for i in range(WIDTH // width + 1):
-        for j in range(HEIGHT // height + 1):
-            pos = (i * width, j * height)
-            tiles.append(pos)
-    return tiles, image
-
-def draw_health_bar(window, health, max_health):
-    """Draws a health bar at the top left of the screen."""
-    bar_width = 200
-    bar_height = 25
-    x, y = 20, 20
-    fill = (health / max_health) * bar_width
-    outline_rect = pygame.Rect(x, y, bar_width, bar_height)
-    fill_rect = pygame.Rect(x, y, fill, bar_height)
-    pygame.draw.rect(window, (255, 0, 0), fill_rect)
-    pygame.draw.rect(window, (0, 0, 0), outline_rect, 2)
-
-def draw_score(window, score):
-    font = pygame.font.SysFont("Arial", 32, bold=True)
-    score_text = font.render(f"Score: {score}", True, (255, 223, 0))
-    text_rect = score_text.get_rect(topright=(WIDTH - 20, 20))
-    window.blit(score_text, text_rect)
-
-def draw(window, background, bg_image, player, objects, offset_x, offset_y, score):
+from config import WIDTH, HEIGHT, SIM_RATE, MAX_CATCH_UP_TICKS, BG_COLOR, BACKGROUND_PARALLAX
+from game import World, Controls
+from renderer import Renderer
+from background import Background
+from hud import HUD
+from profiler import PhaseProfiler, StartupProfile
+from scenes import Scene, SceneManager, ResultScene, LoadingScene, next_level
+from replay import Replay, ReplayPlayer
+from preload import Preloader
+
+def draw(window, background, player, level, offset_x, offset_y, score, renderer, hud):
     """
     Draws the entire game scene (background, objects, player) on the window.
     :param window: The pygame display window.
-    :param background: List of tile positions for the background.
-    :param bg_image: The background image surface.
+    :param background: Pre-composited Background.
     :param player: Player object.
-    :param objects: List of game objects (blocks, hazards, etc).
+    :param level: Level with the terrain tile map and game objects (hazards, etc).
     :param offset_x: Horizontal camera offset.
     :param offset_y: Vertical camera offset.
+    :param renderer: Renderer that culls everything outside the camera.
+    :param hud: Cached score/health overlay.
     """
-    for tile in background:
-        window.blit(bg_image, tile)
+    renderer.begin_frame(offset_x, offset_y)
+    background.draw(window, offset_x, offset_y)
 
-    for obj in objects:
-        obj.draw(window, offset_x, offset_y)
+    renderer.draw_level(window, level, offset_x, offset_y)
 
-    player.draw(window, offset_x, offset_y)
-    draw_score(window, score)
-    draw_health_bar(window, player.health, player.MAX_HEALTH)
-    pygame.display.update()
+    renderer.draw_sprite(window, player, offset_x, offset_y)
+    renderer.mark_dirty(hud.draw(window, score, player.health, player.MAX_HEALTH))
 
-def handle_vertical_collision(player, objects, dy):
+def update_camera(player, offset_x, offset_y):
     """
-    Handles collisions for vertical movement (jumping/falling).
-    Adjusts player position if collision occurs, and triggers landing or head hit.
-    :param player: Player object.
-    :param objects: List of objects to check collision against.
-    :param dy: Vertical velocity (direction of movement).
-    :return: List of collided objects.
+    Scrolls the camera when the player moves into the scroll margins.
+    Called once per simulation tick.
+    :return: Tuple (offset_x, offset_y)
     """
-    collided_objects = []
-    for obj in objects:
-        if pygame.sprite.collide_mask(player, obj):
-            if dy > 0:
-                player.rect.bottom = obj.rect.top
-                player.landed()
-            elif dy < 0:
-                player.rect.top = obj.rect.bottom
-                player.hit_head()
-            collided_objects.append(obj)
-    return collided_objects
+    scroll_area_width = WIDTH // 5
+    scroll_area_height = HEIGHT // 6
 
-def collide(player, objects, dx):
-    """
-    Checks for collision in the horizontal direction.
-    Moves player temporarily, checks for mask collision, then reverts move.
-    :param player: Player object.
-    :param objects: List of objects to check.
-    :param dx: Amount to move horizontally for collision check.
-    :return: The first collided object or None.
-    """
-    player.move(dx, 0)
-    player.update()
-    collided_object = None
-    for obj in objects:
-        if pygame.sprite.collide_mask(player, obj):
-            collided_object = obj
-            break
-    player.move(-dx, 0)
-    player.update()
-    return collided_object
+    # Handle horizontal camera scrolling
+    if ((player.rect.right - offset_x >= WIDTH - scroll_area_width) and player.x_vel > 0) or (
+        (player.rect.left - offset_x <= scroll_area_width) and player.x_vel < 0
+    ):
+        offset_x += player.x_vel
+
+    # Handle vertical camera scrolling
+    if ((player.rect.bottom - offset_y >= HEIGHT - scroll_area_height) and player.y_vel > 0) or (
+        (player.rect.top - offset_y <= scroll_area_height) and player.y_vel < 0
+    ):
+        offset_y += player.y_vel
+    return offset_x, offset_y
 
-def handle_move(player, objects):
+class LevelScene(Scene):
     """
-    Handles player movement based on key input and prevents movement through obstacles.
-    Also handles player being hit by hazards (e.g., fire).
-    :param player: Player object.
-    :param objects: List of objects to interact with.
+    Plays one level: processes events, updates the player and objects,
+    draws everything and manages camera scrolling, then hands over to a
+    ResultScene when the level is won or lost.
+    Press F3 to toggle the frame profiler overlay.
     """
-    keys = pygame.key.get_pressed()
-    player.x_vel = 0
-    collide_left = collide(player, objects, -PLAYER_VEL * 1.6)
-    collide_right = collide(player, objects, PLAYER_VEL * 1.6)
-
-    # Move left/right if no collision
-    if (keys[pygame.K_LEFT] or keys[pygame.K_a]) and not collide_left:
-        player.move_left(PLAYER_VEL)
-    if (keys[pygame.K_RIGHT] or keys[pygame.K_d]) and not collide_right:
-        player.move_right(PLAYER_VEL)
-
-    # Handle vertical collision (jump/fall)
-    vertical_collide = handle_vertical_collision(player, objects, player.y_vel)
-    to_check = [collide_left, collide_right, *vertical_collide]
-
-    fire_touched = False  # track if player is touching fire
-
-    # If player collides with fire, set hit state
-    for obj in to_check:
-        if obj and getattr(obj, 'name', None) == "fire":
-            player.make_hit()
-            fire_touched = True
-
-        if isinstance(obj, Enemy):
-            player.make_hit()
-            fire_touched = True
-
-    if fire_touched:
-        current_time = pygame.time.get_ticks()  # milliseconds since pygame.init()
-        if current_time - player.last_fire_damage_time >= player.DAMAGE_INTERVAL:
-            player.take_damage(1)  # or whatever amount per tick
-            player.last_fire_damage_time = current_time
-    else:
-        # Reset timer if player is not on fire
-        # (so they take damage immediately next time they touch)
-        player.last_fire_damage_time = 0
-
-def main(level_file=None):
-    score = 0
+    def __init__(self, level_file=None, trace_file=None, stream=False, record_file=None, replay=None):
+        """
+        :param level_file: Optional CSV level to play (None = built-in level).
+        :param trace_file: If given, profile every frame and write a Chrome trace there on exit.
+        :param stream: Load the CSV level region by region around the camera.
+        :param record_file: If given, record the input of every tick and save it there as a Replay on exit.
+        :param replay: Replay to play back instead of reading the keyboard;
+                       the game quits when it ends.
+        Set `world` before the scene is entered to play an already loaded
+        World (see scenes.LoadingScene); otherwise enter() loads the level.
+        """
+        self.world = None
+        self.level_file = level_file
+        self.trace_file = trace_file
+        self.stream = stream
+        self.record_file = record_file
+        self.replay = replay
+        self.recording = None
+        self.playback = None
+
+    def enter(self):
+        # Composite the background once for this resolution (cached across levels)
+        self.background = Background("Purple.png", WIDTH, HEIGHT, BACKGROUND_PARALLAX)
+
+        # If level_file is specified, load that level (all fire objects ON). Else, use a default.
+        if self.world is None:
+            self.world = World.load(self.level_file, SIM_RATE, self.stream)
+        preloader = self.manager.preloader
+        if preloader is not None and self.replay is None:
+            # Load the level the result screen offers next while this one is played
+            preloader.preload(next_level(self.level_file), self.stream)
+        if self.record_file is not None:
+            self.recording = Replay(self.level_file, SIM_RATE, stream=self.stream)
+        if self.replay is not None:
+            if self.replay.fps != SIM_RATE:
+                raise ValueError(f"Replay was recorded at {self.replay.fps} ticks/s, SIM_RATE is {SIM_RATE}")
+            self.playback = ReplayPlayer(self.replay)
+
+        self.renderer = Renderer(WIDTH, HEIGHT)
+        self.hud = HUD(WIDTH)
+        self.profiler = PhaseProfiler(enabled=self.trace_file is not None)
+        self.world.profiler = self.profiler
+
+        # Camera/scrolling offsets
+        self.offset_x = 0
+        self.offset_y = 0
+        self.previous_offset = (0, 0)  # camera before the last tick
+
+        self.accumulator = 0.0
+        self.jump_pending = False
+
+    def exit(self):
+        if self.trace_file is not None:
+            self.profiler.export_chrome_trace(self.trace_file)
+        if self.recording is not None:
+            self.recording.save(self.record_file)
+        self.world.level.close()
+
+    def frame(self, events, frame_time):
+        """
+        Fixed-timestep frame: the simulation always advances in 1/SIM_RATE
+        steps, rendering happens once per frame (capped at FPS by the
+        manager) and draws moving objects interpolated between the last two ticks.
+        """
+        world = self.world
+        player = world.player
+        renderer = self.renderer
+        profiler = self.profiler
+        step_time = 1.0 / SIM_RATE
+
+        profiler.begin_frame()
+        # Handle key events
+        with profiler.phase("events"):
+            for event in events:
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE:
+                        self.jump_pending = True
+                    elif event.key == pygame.K_F3:
+                        profiler.toggle_overlay()
+                        renderer.invalidate()
+            keys = pygame.key.get_pressed()
+
+        # Advance the simulation by as many ticks as the elapsed time covers
+        self.accumulator += frame_time
+        ticks = 0
+        while self.accumulator >= step_time and ticks < MAX_CATCH_UP_TICKS:
+            self.previous_offset = (self.offset_x, self.offset_y)
+            if self.playback is not None:
+                controls = self.playback.next_controls()
+            else:
+                controls = Controls.from_keyboard(keys, self.jump_pending)
+            world.step(controls)
+            if self.recording is not None:
+                self.recording.record(controls, world)
+            if self.playback is not None:
+                self.playback.verify(world)
+            self.jump_pending = False
+            self.accumulator -= step_time
+            ticks += 1
+            self.offset_x, self.offset_y = update_camera(player, self.offset_x, self.offset_y)
+            outcome = None
+            if world.won:
+                outcome = "won"
+            elif player.health <= 0:
+                outcome = "dead"
+            if self.playback is not None and (outcome is not None or self.playback.finished):
+                profiler.end_frame()
+                self.manager.quit()
+                return
+            if outcome is not None:
+                profiler.end_frame()
+                self.manager.replace(ResultScene(outcome, self.level_file, world.score))
+                return
+        if ticks == MAX_CATCH_UP_TICKS:
+            # Too far behind: drop the backlog instead of spiralling
+            self.accumulator = min(self.accumulator, step_time)
+
+        # Draw the current frame between the last two ticks
+        alpha = self.accumulator / step_time
+        previous_offset = self.previous_offset
+        draw_x = previous_offset[0] + (self.offset_x - previous_offset[0]) * alpha
+        draw_y = previous_offset[1] + (self.offset_y - previous_offset[1]) * alpha
+        renderer.interpolate(world.previous_positions, alpha)
+        with profiler.phase("draw"):
+            draw(
+                window=self.manager.window,
+                background=self.background,
+                player=player,
+                level=world.level,
+                offset_x=draw_x,
+                offset_y=draw_y,
+                score=world.score,
+                renderer=renderer,
+                hud=self.hud
+            )
+            renderer.mark_dirty(profiler.draw_overlay(self.manager.window))
+        with profiler.phase("display"):
+            renderer.present()
+        profiler.end_frame()
+
+def run(scene, trace_file=None, stream=False, startup_profile=False):
     """
-    Main game loop. Initializes pygame, sets up the scene, processes events,
-    updates the player and objects, draws everything, and manages camera scrolling.
+    Opens the game window and runs scenes in this process until the player quits.
+    Levels started from menus/results get the same trace_file and stream settings.
+    :param scene: First Scene (e.g. a LevelScene or scenes.MenuScene)
+    :param startup_profile: Print how long imports, SDL init, asset decode
+                            and building the first scene took
+    :return: The SceneManager, with its recorded transition times
     """
+    startup = StartupProfile(_STARTED, startup_profile)
+    startup.mark("imports")
     pygame.init()
     game_window = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Platformer")
-    clock = pygame.time.Clock()
-
-    # Load background tiles
-    background, bg_image = get_background("Purple.png")
-
-    # Set up game world objects
-    block_size = 96
-    
-    # If level_file is specified, load that level. Else, use a default.
-    if level_file is not None:
-        player, objects = load_level_csv(level_file)
-        # Make sure all fire objects are ON
-        for obj in objects:
-            if isinstance(obj, Fire):
-                obj.on()
-        
-
-    else:
-        # Create a floor that covers the width of the level
-        floor = [Block(i * block_size, HEIGHT - block_size, block_size)
-                for i in range(-WIDTH // block_size, WIDTH * 2 // block_size)]
-        player = Player(100, 100, 50, 50)
-        enemy = Enemy(x=300, y=HEIGHT - 96*2, width=40, height=40, left_bound=200, right_bound=500, speed=2)
-
-        # Add a fire hazard and some extra blocks
-        fire = Fire(200, HEIGHT - block_size - 64, 16, 32)
-
-        objects = [
-            *floor,
-            Block(0, HEIGHT - block_size * 2, block_size),
-            Block(block_size * 3, HEIGHT - block_size * 4, block_size),
-            fire,
-            enemy
-        ]
-
-    # Camera/scrolling offsets
-    offset_x = 0
-    scroll_area_width = WIDTH // 5
-
-    offset_y = 0
-    scroll_area_height = HEIGHT // 6
-
-    run = True
-    while run:
-        clock.tick(FPS)
-        # Handle window close and key events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                run = False
-                break
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE and player.jump_count < 2:
-                    player.jump()
-
-        # Update player and hazard (fire) animations and movement
-        player.loop(FPS)
-        for obj in objects:
-            if isinstance(obj, Fire):
-                obj.loop()
-            if isinstance(obj, Enemy):
-                obj.move()
-
-        # Handle user movement and object collisions
-        handle_move(player, objects)
-
-        coins_collected = []
-        for obj in objects:
-            if isinstance(obj, Coin):
-                if player.rect.colliderect(obj.rect):
-                    coins_collected.append(obj)
-                    score += 1
-            if isinstance(obj, Flag):
-                if player.rect.colliderect(obj.rect):
-                    pygame.quit()
-                    show_win_dialog()
-                    return 
-
-        for coin in coins_collected:
-            objects.remove(coin)
-
-    
-
-        # Draw the current frame
-        draw(
-            window=game_window,
-            background=background,
-            bg_image=bg_image,
-            player=player,
-            objects=objects,
-            offset_x=offset_x,
-            offset_y=offset_y,
-            score=score
-        )
-        # Handle horizontal camera scrolling
-        if ((player.rect.right - offset_x >= WIDTH - scroll_area_width) and player.x_vel > 0) or (
-            (player.rect.left - offset_x <= scroll_area_width) and player.x_vel < 0
-        ):
-            offset_x += player.x_vel
-
-        # Handle vertical camera scrolling
-        if ((player.rect.bottom - offset_y >= HEIGHT - scroll_area_height) and player.y_vel > 0) or (
-            (player.rect.top - offset_y <= scroll_area_height) and player.y_vel < 0
-        ):
-            offset_y += player.y_vel
-
-        if player.health <= 0:
-            pygame.quit()
-            show_game_over_dialog()
-            return  # or break/run = False, as appropriate
-
+    startup.mark("SDL init")
+
+    # Show the background before any level or sprite is loaded
+    Background("Purple.png", WIDTH, HEIGHT, BACKGROUND_PARALLAX).draw(game_window, 0, 0)
+    pygame.display.flip()
+    startup.mark("first frame")
+
+    preloader = Preloader(SIM_RATE)
+    # Restarting from the settings keeps these options
+    restart_args = (["--trace", trace_file] if trace_file else []) + (["--stream"] if stream else [])
+    manager = SceneManager(game_window, lambda level_file: LevelScene(level_file, trace_file, stream),
+                           preloader=preloader, restart_args=restart_args)
+    manager.on_transition = startup.scene_ready
+    manager.run(scene)
+    preloader.close()
     pygame.quit()
-    quit()
-
-def show_game_over_dialog():
-    # wx must run on main thread! 
-    app = wx.App(False)
-    dialog = wx.MessageDialog(
-        None,
-        "Game Over!\nWhat do you want to do?",
-        "Game Over",
-        wx.YES_NO | wx.ICON_QUESTION
-    )
-    dialog.SetYesNoLabels("Return to Main Menu", "Exit Game")
-    result = dialog.ShowModal()
-    dialog.Destroy()
-    if result == wx.ID_YES:
-        python = sys.executable
-        os.execl(python, python, "menu.py")
-    else:
-        sys.exit(0)
+    return manager
 
-def show_win_dialog():
-    app = wx.App(False)
-    dialog = wx.MessageDialog(
-        None,
-        "Congratulations! You win!\nLoad another level?",
-        "Level Complete",
-        wx.YES_NO | wx.ICON_INFORMATION
-    )
-    dialog.SetYesNoLabels("Load Level", "Quit")
-    result = dialog.ShowModal()
-    dialog.Destroy()
-    if result == wx.ID_YES:
-        # Open file dialog to select next CSV level
-        with wx.FileDialog(None, "Open CSV Level", wildcard="CSV files (*.csv)|*.csv",
-                           style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST) as fileDialog:
-            if fileDialog.ShowModal() == wx.ID_CANCEL:
-                sys.exit(0)
-            path = fileDialog.GetPath()
-            print(path)
-            python = sys.executable
-            os.execl(python, sys.executable, "main.py", f"\"{path}\"")
-    else:
-        sys.exit(0)
+def main(level_file=None, trace_file=None, stream=False, startup_profile=False, record_file=None):
+    """
+    Plays a level, then continues with the result screen and menus in the same process.
+    :param level_file: Optional CSV level to play.
+    :param trace_file: If given, profile every frame and write a Chrome trace there when a level ends.
+    :param stream: Load CSV levels region by region around the camera.
+    :param startup_profile: Print a start-up time breakdown once the level is on screen.
+    :param record_file: If given, save the input of this level as a replay there (see replay.py).
+    """
+    scene = LoadingScene(LevelScene(level_file, trace_file, stream, record_file))
+    return run(scene, trace_file, stream, startup_profile)
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        main(sys.argv[1])
-    else:
-        main()
+    parser = argparse.ArgumentParser(description="Play a level, then continue with the result screen and menus.")
+    parser.add_argument("level", nargs="?", help="CSV level file (default: the built-in level)")
+    parser.add_argument("--trace", metavar="FILE", help="profile every frame and write a Chrome trace there")
+    parser.add_argument("--record", metavar="FILE", help="save the input of the level as a replay there")
+    parser.add_argument("--stream", action="store_true", help="load the level region by region")
+    parser.add_argument("--startup-profile", action="store_true", help="print a start-up time breakdown")
+    args = parser.parse_args()
+    main(args.level, args.trace, args.stream, args.startup_profile, args.record)
@@ -1,20 +1,22 @@
 # objects.py
 
 import pygame
-from utils import get_block, load_sprite_sheets
+from utils import get_block, get_mask, get_scaled_image, load_sprite_sheets
+from assets import ASSETS
 from os.path import join
 
 class Object(pygame.sprite.Sprite):
     """
     Base class for all static and dynamic objects (platforms, hazards, etc).
     """
-    def __init__(self, x, y, width, height, name=None):
+    def __init__(self, x, y, width, height, name=None, image=None):
         """
         Initialize object at (x, y) with given size.
+        :param image: Surface to use, by default a new transparent one
         """
         super().__init__()
         self.rect = pygame.Rect(x, y, width, height)
-        self.image = pygame.Surface((width, height), pygame.SRCALPHA)
+        self.image = pygame.Surface((width, height), pygame.SRCALPHA) if image is None else image
         self.width = width
         self.height = height
         self.name = name
@@ -29,15 +31,14 @@ class Flag(pygame.sprite.Sprite):
     """
     The level finish/cup flag.
     """
+    IMAGE = join("assets", "Items", "Checkpoints", "End", "End (Idle).png")
+
     def __init__(self, x, y, size=48):
         super().__init__()
         self.rect = pygame.Rect(x, y, size, size)
-        # Load the flag image
-        path = join("assets", "Items", "Checkpoints", "End", "End (idle).png")
-        image = pygame.image.load(path).convert_alpha()
-        # Scale if needed
-        self.image = pygame.transform.scale(image, (size, size))
-        self.mask = pygame.mask.from_surface(self.image)
+        # Load the flag image (decoded and scaled once per size)
+        self.image = get_scaled_image(self.IMAGE, size)
+        self.mask = get_mask(self.image)
 
     def draw(self, win, offset_x, offset_y):
         win.blit(self.image, (self.rect.x - offset_x, self.rect.y - offset_y))
@@ -50,10 +51,19 @@ class Block(Object):
         """
         Creates a terrain block at (x, y) with a specific size.
         """
-        super().__init__(x, y, size, size)
-        block = get_block(size)
-        self.image.blit(block, (0, 0))
-        self.mask = pygame.mask.from_surface(self.image)
+        # All blocks of one size share a single tile surface and mask
+        image = ASSETS.get(("block_tile", size), lambda: self._make_tile(size))
+        super().__init__(x, y, size, size, image=image)
+        self.mask = get_mask(self.image)
+
+    @staticmethod
+    def _make_tile(size):
+        """
+        Crops the terrain sprite to the block size.
+        """
+        image = pygame.Surface((size, size), pygame.SRCALPHA)
+        image.blit(get_block(size), (0, 0))
+        return image
 
 class Fire(Object):
     """
@@ -64,12 +74,12 @@ class Fire(Object):
 
     def __init__(self, x, y, width, height):
         """
-        Initializes fire at (x, y) with given size, loads sprites if needed.
+        Initializes fire at (x, y) with given size, sprites are shared between fires.
         """
         super().__init__(x, y, width, height, "fire")
         self.fire = load_sprite_sheets("Traps", "Fire", width, height)
         self.image = self.fire["off"][0]
-        self.mask = pygame.mask.from_surface(self.image)
+        self.mask = get_mask(self.image)
         self.animation_count = 0
         self.animation_name = "off"
 
@@ -93,4 +103,17 @@ class Fire(Object):
         sprite_index = (self.animation_count // self.ANIMATION_DELAY) % len(sprites)
         self.image = sprites[sprite_index]
         self.animation_count = (self.animation_count + 1) % (self.ANIMATION_DELAY * len(sprites))
-        self.mask = pygame.mask.from_surface(self.image)
+        self.mask = get_mask(self.image)
+
+    def skip_to(self, loops):
+        """
+        Puts the animation where `loops` calls to loop() from the start
+        leave it, e.g. for a fire loaded while the level is already running.
+        """
+        if loops <= 0:
+            return
+        sprites = self.fire[self.animation_name]
+        period = self.ANIMATION_DELAY * len(sprites)
+        self.image = sprites[((loops - 1) % period) // self.ANIMATION_DELAY]
+        self.animation_count = loops % period
+        self.mask = get_mask(self.image)
@@ -1,7 +1,7 @@
 # player.py
 
 import pygame
-from utils import load_sprite_sheets
+from utils import load_sprite_sheets, get_mask
 from config import PLAYER_VEL, FPS
 
 class Player(pygame.sprite.Sprite):
@@ -13,6 +13,8 @@ class Player(pygame.sprite.Sprite):
     DAMAGE_INTERVAL = 1000  # milliseconds
     COLOR = (255, 0, 0)
     GRAVITY = 0.98
+    JUMP_SPEED = GRAVITY * 8  # upward speed set by each jump
+    SIZE = 64  # sprite frames are 32x32 scaled 2x; the rect takes their size
     SPRITES = None  # Will be set after pygame.display is initialized
     ANIMATION_DELAY = 3
 
@@ -25,6 +27,7 @@ class Player(pygame.sprite.Sprite):
         if Player.SPRITES is None:
             Player.SPRITES = load_sprite_sheets("MainCharacters", "NinjaFrog", 32, 32, True)
         self.rect = pygame.Rect(x, y, width, height)
+        self.sprite = self.SPRITES["idle_left"][0]  # drawable before the first loop()
         self.x_vel = 0
         self.y_vel = 0
         self.mask = None
@@ -35,7 +38,7 @@ class Player(pygame.sprite.Sprite):
         self.hit = False
         self.hit_count = 0
         self.health = self.MAX_HEALTH
-        self.last_fire_damage_time = 0 
+        self.last_fire_damage_time = None  # None = the next touch hurts at once
 
     def take_damage(self, amount):
         """Reduces health and clamps at zero."""
@@ -50,7 +53,7 @@ class Player(pygame.sprite.Sprite):
         """
         Makes the player jump if allowed (double jump).
         """
-        self.y_vel = -self.GRAVITY * 8
+        self.y_vel = -self.JUMP_SPEED
         self.animation_count = 0
         self.jump_count += 1
         if self.jump_count == 1:
@@ -88,11 +91,19 @@ class Player(pygame.sprite.Sprite):
             self.direction = "right"
             self.animation_count = 0
 
+    @classmethod
+    def fall_speed(cls, y_vel, fall_count, fps):
+        """
+        Vertical speed after one tick of gravity.
+        :param fall_count: Ticks since the player last landed, hit its head or jumped from the ground
+        """
+        return y_vel + min(0.98, (fall_count / fps) * cls.GRAVITY)
+
     def loop(self, fps):
         """
         Updates player's movement, gravity, hit status, and sprite animation each frame.
         """
-        self.y_vel += min(0.98, (self.fall_count / fps) * self.GRAVITY)
+        self.y_vel = self.fall_speed(self.y_vel, self.fall_count, fps)
         self.move(self.x_vel, self.y_vel)
 
         if self.hit:
@@ -149,7 +160,7 @@ class Player(pygame.sprite.Sprite):
         Updates the player's rect and mask based on the current sprite.
         """
         self.rect = self.sprite.get_rect(topleft=(self.rect.x, self.rect.y))
-        self.mask = pygame.mask.from_surface(self.sprite)
+        self.mask = get_mask(self.sprite)
 
     def draw(self, win, offset_x, offset_y):
         """
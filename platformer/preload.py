@@ -0,0 +1,163 @@
+# preload.py
+
+from concurrent.futures import ThreadPoolExecutor
+from config import WIDTH, HEIGHT, SIM_RATE, BACKGROUND_PARALLAX
+from background import Background
+from level_compiler import ensure_compiled
+from level_loader import prefetch_assets, warm_assets
+from game import World
+
+BACKGROUND = "Purple.png"
+
+class LevelLoad:
+    """
+    One level being loaded in the background, in three steps:
+      reading     worker thread: compile/parse the level file, read the
+                  sprite cache and decode the images the level needs
+      converting  main thread: convert the decoded surfaces for the display
+      building    worker thread: build the tile map, the objects and the World
+    Surfaces are only converted on the main thread; everything else runs
+    off it. poll() moves the load along; `progress` goes from 0 to 1.
+    """
+    READING = "reading"
+    CONVERTING = "converting"
+    BUILDING = "building"
+    READY = "ready"
+
+    def __init__(self, executor, level_file, fps=SIM_RATE, stream=False):
+        """
+        :param executor: Executor the worker steps run on
+        :param level_file: CSV or compiled level (None = built-in level)
+        :param fps: Simulation ticks per second of the World
+        :param stream: Build a StreamingLevel
+        """
+        self.level_file = level_file
+        self.fps = fps
+        self.stream = stream
+        self.stage = self.READING
+        self.progress = 0.0
+        self.world = None
+        self._executor = executor
+        self._future = executor.submit(self._read)
+
+    def _read(self):
+        if self.level_file is not None:
+            try:
+                ensure_compiled(self.level_file)
+            except OSError:
+                pass  # unreadable or unwritable: the build step reports/falls back
+        prefetch_assets()
+        Background.prefetch(BACKGROUND, WIDTH, HEIGHT)
+        self.progress = 0.2
+
+    def _convert(self):
+        Background(BACKGROUND, WIDTH, HEIGHT, BACKGROUND_PARALLAX)
+        warm_assets()
+        self.progress = 0.3
+
+    def _build(self):
+        def building(done, total):
+            self.progress = 0.3 + 0.7 * done / total
+        return World.load(self.level_file, self.fps, self.stream, building)
+
+    @property
+    def ready(self):
+        return self.stage == self.READY
+
+    @property
+    def failed(self):
+        """
+        True if a worker step raised; poll() raises the error.
+        """
+        future = self._future
+        return future.done() and not future.cancelled() and future.exception() is not None
+
+    def poll(self):
+        """
+        Runs the main-thread step once reading is done and picks up the
+        built World. Errors raised on the worker are raised here.
+        :return: True once the World is built
+        """
+        if self.stage == self.READING and self._future.done():
+            self._future.result()
+            self.stage = self.CONVERTING
+            self._convert()
+            self.stage = self.BUILDING
+            self._future = self._executor.submit(self._build)
+        elif self.stage == self.BUILDING and self._future.done():
+            self.world = self._future.result()
+            self.progress = 1.0
+            self.stage = self.READY
+        return self.stage == self.READY
+
+    def cancel(self):
+        """
+        Drops the load: a queued step is cancelled, a running one is left
+        to finish and the World it builds is closed.
+        """
+        def close(future):
+            if not future.cancelled() and future.exception() is None and future.result() is not None:
+                future.result().level.close()
+        self._future.cancel()
+        self._future.add_done_callback(close)
+        self.world = None
+
+class Preloader:
+    """
+    Loads levels on one background thread, so the window keeps drawing
+    (see scenes.LoadingScene) while a level is read and built, and the
+    next level can be loaded while the current one is played.
+    """
+    def __init__(self, fps=SIM_RATE):
+        """
+        :param fps: Simulation ticks per second of the loaded Worlds
+        """
+        self.fps = fps
+        self.loads = {}  # (level_file, stream) -> LevelLoad
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def load(self, level_file, stream=False):
+        """
+        Returns the load of a level, starting it unless it is already under way.
+        """
+        key = (level_file, stream)
+        load = self.loads.get(key)
+        if load is None:
+            load = self.loads[key] = LevelLoad(self._executor, level_file, self.fps, stream)
+        return load
+
+    def take(self, level_file, stream=False):
+        """
+        Removes a finished load and returns its World, which the caller then owns.
+        """
+        return self.loads.pop((level_file, stream)).world
+
+    def preload(self, level_file, stream=False):
+        """
+        Starts loading the level likely to be played next, dropping any
+        other load that hasn't been taken.
+        :param level_file: Level to load (None = nothing to preload)
+        """
+        for key in list(self.loads):
+            if key != (level_file, stream):
+                self.loads.pop(key).cancel()
+        if level_file is not None:
+            self.load(level_file, stream)
+
+    def poll(self):
+        """
+        Moves every load along; call once per frame on the main thread.
+        Failed loads are left for whoever takes them to raise.
+        """
+        for load in list(self.loads.values()):
+            if not load.failed:
+                load.poll()
+
+    def close(self):
+        """
+        Cancels every load and stops the worker thread.
+        """
+        for load in self.loads.values():
+            load.cancel()
+        self.loads.clear()
+        self._executor.shutdown(wait=True, cancel_futures=True)
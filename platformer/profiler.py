@@ -0,0 +1,241 @@
+# profiler.py
+
+import json
+import pygame
+from collections import deque
+from time import perf_counter
+from assets import ASSETS
+
+class _NullPhase:
+    """
+    Context manager used while profiling is disabled; does nothing.
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_PHASE = _NullPhase()
+
+class _Phase:
+    """
+    Times one named phase of the current frame.
+    """
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._record(self.name, self.start, perf_counter())
+        return False
+
+class PhaseProfiler:
+    """
+    Per-frame phase timings for the main loop.
+    Wrap each phase in `with profiler.phase("name"):` between begin_frame()
+    and end_frame(). Keeps rolling averages and p99 frame times for the
+    on-screen overlay, and a bounded timeline that can be exported as a
+    Chrome trace (chrome://tracing, Perfetto). While disabled, phase()
+    returns a shared no-op context manager.
+    """
+    OVERLAY_COLOR = (255, 255, 255)
+    OVERLAY_BACKGROUND = (0, 0, 0, 160)
+
+    def __init__(self, enabled=False, window=120, max_frames=36000):
+        """
+        :param enabled: Start with timing switched on
+        :param window: Number of frames used for rolling averages and p99
+        :param max_frames: Number of frames kept for trace export
+        """
+        self.enabled = enabled
+        self.overlay = False
+        self._enabled_without_overlay = enabled
+        self.window = window
+        self.frame_times = deque(maxlen=window)
+        self.phase_times = {}  # name -> deque of per-frame durations
+        self.timeline = deque(maxlen=max_frames)  # (start, duration, [(name, start, duration)])
+        self._phases = {}
+        self._frame_start = None
+        self._frame_phases = []
+        self._origin = perf_counter()
+        self._font = None
+
+    def phase(self, name):
+        """
+        Returns a context manager timing one phase of the current frame.
+        """
+        if not self.enabled:
+            return _NULL_PHASE
+        timer = self._phases.get(name)
+        if timer is None:
+            timer = self._phases[name] = _Phase(self, name)
+        return timer
+
+    def begin_frame(self):
+        """
+        Marks the start of a frame.
+        """
+        if self.enabled:
+            self._frame_start = perf_counter()
+            self._frame_phases = []
+
+    def end_frame(self):
+        """
+        Marks the end of a frame and folds its phases into the statistics.
+        """
+        if not self.enabled or self._frame_start is None:
+            return
+        end = perf_counter()
+        start = self._frame_start
+        self._frame_start = None
+        self.frame_times.append(end - start)
+
+        totals = {}
+        for name, _, duration in self._frame_phases:
+            totals[name] = totals.get(name, 0.0) + duration
+        for name, duration in totals.items():
+            times = self.phase_times.get(name)
+            if times is None:
+                times = self.phase_times[name] = deque(maxlen=self.window)
+            times.append(duration)
+        self.timeline.append((start, end - start, self._frame_phases))
+
+    def _record(self, name, start, end):
+        self._frame_phases.append((name, start, end - start))
+
+    def toggle_overlay(self):
+        """
+        Shows/hides the overlay; timing is switched on while it is visible.
+        Hiding it restores the previous state, so a profiler started
+        enabled (e.g. for --trace) keeps recording.
+        """
+        self.overlay = not self.overlay
+        if self.overlay:
+            self._enabled_without_overlay = self.enabled
+            self.enabled = True
+        else:
+            self.enabled = self._enabled_without_overlay
+            if not self.enabled:
+                self._frame_start = None  # don't fold a stale start into the next shown frame
+
+    def summary(self):
+        """
+        Returns rolling statistics in milliseconds.
+        :return: Dictionary with frame avg/p99 and the average of each phase
+        """
+        if not self.frame_times:
+            return {"frame_avg": 0.0, "frame_p99": 0.0, "phases": {}}
+        frames = sorted(self.frame_times)
+        p99 = frames[min(len(frames) - 1, int(len(frames) * 0.99))]
+        phases = {name: 1000 * sum(times) / len(times) for name, times in self.phase_times.items()}
+        return {"frame_avg": 1000 * sum(frames) / len(frames), "frame_p99": 1000 * p99, "phases": phases}
+
+    def draw_overlay(self, window, pos=(20, 60)):
+        """
+        Draws the rolling statistics on screen if the overlay is visible.
+        :return: List with the screen rect drawn over (empty when hidden)
+        """
+        if not self.overlay:
+            return []
+        if self._font is None:
+            self._font = ASSETS.get(("font", "Consolas", 16, False),
+                                    lambda: pygame.font.SysFont("Consolas", 16))
+        stats = self.summary()
+        fps = 1000 / stats["frame_avg"] if stats["frame_avg"] else 0
+        lines = [f"frame {stats['frame_avg']:6.2f} ms  p99 {stats['frame_p99']:6.2f} ms  {fps:5.0f} fps"]
+        for name, avg in stats["phases"].items():
+            lines.append(f"{name:<12} {avg:6.3f} ms")
+
+        images = [self._font.render(line, True, self.OVERLAY_COLOR) for line in lines]
+        width = max(image.get_width() for image in images) + 12
+        height = sum(image.get_height() for image in images) + 12
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill(self.OVERLAY_BACKGROUND)
+        y = 6
+        for image in images:
+            panel.blit(image, (6, y))
+            y += image.get_height()
+        return [window.blit(panel, pos)]
+
+    def chrome_trace(self):
+        """
+        Returns the recorded timeline in Chrome trace event format.
+        """
+        events = []
+        origin = self._origin
+        for index, (start, duration, phases) in enumerate(self.timeline):
+            events.append({"name": "frame", "ph": "X", "pid": 1, "tid": 1,
+                           "ts": (start - origin) * 1e6, "dur": duration * 1e6,
+                           "args": {"frame": index}})
+            for name, phase_start, phase_duration in phases:
+                events.append({"name": name, "ph": "X", "pid": 1, "tid": 1,
+                               "ts": (phase_start - origin) * 1e6, "dur": phase_duration * 1e6})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, filename):
+        """
+        Writes the timeline as a Chrome trace JSON file.
+        """
+        with open(filename, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+class StartupProfile:
+    """
+    Wall-clock breakdown of a cold start (--startup-profile).
+    Each mark() closes a phase that started at the previous mark. Time spent
+    decoding assets (ASSETS loaders) on this thread is taken out of every
+    phase and shown as its own line. While disabled, mark() does nothing.
+    """
+    def __init__(self, start, enabled=False):
+        """
+        :param start: perf_counter() value at which start-up began
+        :param enabled: Record and print the breakdown
+        """
+        self.enabled = enabled
+        self.phases = []  # (name, seconds excluding asset decode)
+        self.asset_time = 0.0
+        self._last = start
+        self._start = start
+        self._last_assets = ASSETS.thread_load_time()
+
+    def mark(self, name):
+        """
+        Ends the current phase under the given name.
+        """
+        if not self.enabled:
+            return
+        now = perf_counter()
+        assets = ASSETS.thread_load_time() - self._last_assets
+        self.phases.append((name, now - self._last - assets))
+        self.asset_time += assets
+        self._last = now
+        self._last_assets = ASSETS.thread_load_time()
+
+    def scene_ready(self, name, ms):
+        """
+        SceneManager.on_transition hook: the first scene to show a frame
+        ends start-up, so the report is printed then and profiling stops.
+        """
+        if not self.enabled:
+            return
+        self.mark(f"{name} setup")
+        print(self.report())
+        self.enabled = False
+
+    def report(self):
+        """
+        Returns the breakdown as text, in milliseconds.
+        """
+        lines = ["startup profile"]
+        for name, seconds in self.phases + [("asset decode", self.asset_time)]:
+            lines.append(f"  {name:<20} {seconds * 1000:8.1f} ms")
+        lines.append(f"  {'total':<20} {(self._last - self._start) * 1000:8.1f} ms")
+        return "\n".join(lines)
@@ -0,0 +1,150 @@
+# renderer.py
+
+import pygame
+from config import WIDTH, HEIGHT
+
+class Renderer:
+    """
+    Draws only the part of a level that overlaps the camera.
+    Visible chunks and objects come from the level's spatial index, so the
+    draw cost depends on what is on screen rather than on level size.
+
+    It also tracks dirty rectangles: while the camera is still, present()
+    only pushes the screen regions where something moved, animated,
+    appeared or disappeared since the previous frame.
+    """
+    def __init__(self, width=WIDTH, height=HEIGHT, margin=64):
+        """
+        :param width: Viewport width in pixels
+        :param height: Viewport height in pixels
+        :param margin: Extra pixels around the viewport that still count as visible
+        """
+        self.width = width
+        self.height = height
+        self.margin = margin
+        self.drawn = 0   # objects/chunks drawn in the last frame
+        self.culled = 0  # objects/chunks skipped in the last frame
+        self.dirty = []  # screen rects changed this frame (None = whole screen)
+        self._records = {}       # obj -> (screen rect, image) drawn this frame
+        self._last_records = {}  # same for the previous frame
+        self._last_offset = None
+        self._full_update = True
+        self.previous_positions = {}  # obj -> (x, y) at the previous tick
+        self.alpha = 1.0
+
+    def view_rect(self, offset_x, offset_y):
+        """
+        Returns the camera rectangle in world coordinates, grown by the margin.
+        """
+        margin = self.margin
+        return pygame.Rect(int(offset_x) - margin, int(offset_y) - margin,
+                           self.width + margin * 2, self.height + margin * 2)
+
+    def begin_frame(self, offset_x, offset_y):
+        """
+        Starts a new frame; a camera move forces a full-screen update.
+        """
+        offset = (int(round(offset_x)), int(round(offset_y)))
+        if offset != self._last_offset:
+            self._full_update = True
+        self._last_offset = offset
+        self._last_records = self._records
+        self._records = {}
+        self.dirty = []
+
+    def invalidate(self):
+        """
+        Forces the next present() to push the whole screen.
+        """
+        self._full_update = True
+
+    def mark_dirty(self, rects):
+        """
+        Adds screen rects changed by something other than level objects (e.g. the HUD).
+        """
+        self.dirty.extend(rects)
+
+    def interpolate(self, previous_positions, alpha):
+        """
+        Sets up render interpolation for the next frame.
+        Objects found in previous_positions are drawn at
+        previous + (current - previous) * alpha.
+        :param previous_positions: Dict obj -> (x, y) before the last simulation tick
+        :param alpha: Fraction of a tick elapsed since the last tick (0..1)
+        """
+        self.previous_positions = previous_positions
+        self.alpha = alpha
+
+    def draw_sprite(self, window, obj, offset_x, offset_y):
+        """
+        Draws one object (interpolated if it moved last tick) and records
+        where it landed on screen.
+        """
+        previous = self.previous_positions.get(obj) or getattr(obj, "previous_position", None)
+        if previous is not None and self.alpha < 1:
+            # Drawing at current - (current - previous) * (1 - alpha)
+            lag = 1 - self.alpha
+            offset_x += (obj.rect.x - previous[0]) * lag
+            offset_y += (obj.rect.y - previous[1]) * lag
+        offset_x = int(round(offset_x))
+        offset_y = int(round(offset_y))
+        obj.draw(window, offset_x, offset_y)
+        image = getattr(obj, "image", None) or getattr(obj, "sprite", None)
+        size = obj.rect.size if image is None else image.get_size()
+        rect = pygame.Rect((obj.rect.x - offset_x, obj.rect.y - offset_y), size)
+        self._records[obj] = (rect, image)
+
+    def draw_level(self, window, level, offset_x, offset_y):
+        """
+        Draws the visible terrain and objects of a level.
+        :param window: Target surface.
+        :param level: Level to draw.
+        :param offset_x: Horizontal camera offset.
+        :param offset_y: Vertical camera offset.
+        """
+        offset_x = int(round(offset_x))
+        offset_y = int(round(offset_y))
+        terrain, objects = level.visible(self.view_rect(offset_x, offset_y))
+        for tilemap in terrain:
+            self.draw_sprite(window, tilemap, offset_x, offset_y)
+        for obj in objects:
+            self.draw_sprite(window, obj, offset_x, offset_y)
+
+        self.drawn = len(terrain) + len(objects)
+        self.culled = level.drawable_count() - self.drawn
+
+    def present(self):
+        """
+        Pushes the frame to the display.
+        Updates the whole screen after a camera move, otherwise only the
+        rects of things that changed since the previous frame.
+        """
+        if self._full_update:
+            self._full_update = False
+            self.dirty = None
+            pygame.display.update()
+            return
+
+        last = self._last_records
+        for obj, record in self._records.items():
+            previous = last.get(obj)
+            if previous != record:
+                self.dirty.append(record[0])
+                if previous is not None:
+                    self.dirty.append(previous[0])
+        for obj, previous in last.items():
+            if obj not in self._records:
+                self.dirty.append(previous[0])
+
+        screen = pygame.Rect(0, 0, self.width, self.height)
+        rects = [rect.clip(screen) for rect in self.dirty]
+        rects = [rect for rect in rects if rect]
+        if rects:
+            pygame.display.update(rects)
+
+    def stats(self):
+        """
+        Returns the drawn/culled counters and dirty rect count of the last frame.
+        """
+        dirty = None if self.dirty is None else len(self.dirty)
+        return {"drawn": self.drawn, "culled": self.culled, "dirty": dirty}
@@ -0,0 +1,244 @@
+# replay.py
+
+import sys
+import time
+import struct
+import hashlib
+import argparse
+from array import array
+from config import SIM_RATE
+from game import World, Controls
+
+# Replay file layout (little endian):
+#   header     HEADER
+#   level      UTF-8 level path as given when recording ("" = built-in level)
+#   inputs     tick count bytes, one bit set per held/pressed control
+#   checksums  tick count uint32, World.checksum() after each tick
+MAGIC = b"PRPL"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI20sHB")  # magic, version, sim rate, tick count, level sha1,
+                                      # level path length, streamed (1) or loaded whole (0)
+EXTENSION = ".replay"
+
+# Input bits
+LEFT = 1
+RIGHT = 2
+JUMP = 4
+
+def level_hash(level_file):
+    """
+    SHA1 of a level file's bytes; the built-in level (None) has a fixed hash.
+    """
+    digest = hashlib.sha1()
+    if level_file is None:
+        digest.update(b"built-in level")
+        return digest.digest()
+    with open(level_file, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+def encode_controls(controls):
+    """
+    Packs Controls into one byte.
+    """
+    return (LEFT if controls.left else 0) | (RIGHT if controls.right else 0) | (JUMP if controls.jump else 0)
+
+def decode_controls(bits):
+    """
+    Unpacks a byte written by encode_controls().
+    """
+    return Controls(left=bool(bits & LEFT), right=bool(bits & RIGHT), jump=bool(bits & JUMP))
+
+class Replay:
+    """
+    Per-tick input stream of one playthrough, with the hash of the level it
+    was recorded on and a checksum of the simulation state after every tick.
+    The simulation only depends on the level and the Controls of each tick,
+    so playing the inputs back takes exactly the same path, rendered at
+    any frame rate or headless at full speed.
+    """
+    def __init__(self, level_file=None, fps=SIM_RATE, level_sha1=None, stream=False):
+        """
+        :param level_file: Level being recorded (None = built-in level)
+        :param fps: Simulation ticks per second of the recording
+        :param level_sha1: Level hash; computed from level_file if not given
+        :param stream: The level was streamed (StreamingLevel) while recording
+        """
+        self.level_file = level_file
+        self.fps = fps
+        self.stream = stream
+        self.level_sha1 = level_hash(level_file) if level_sha1 is None else level_sha1
+        self.inputs = bytearray()
+        self.checksums = array("I")
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def record(self, controls, world):
+        """
+        Appends one tick; call right after world.step(controls).
+        """
+        self.inputs.append(encode_controls(controls))
+        self.checksums.append(world.checksum())
+
+    def controls(self, tick):
+        """
+        Returns the Controls of a tick (idle after the end of the recording).
+        """
+        if tick < len(self.inputs):
+            return decode_controls(self.inputs[tick])
+        return Controls()
+
+    def check_level(self, level_file):
+        """
+        Raises ValueError if level_file is not the level the replay was recorded on.
+        """
+        if level_hash(level_file) != self.level_sha1:
+            raise ValueError(f"{level_file or 'built-in level'} differs from the level "
+                             f"this replay was recorded on")
+
+    def save(self, filename):
+        """
+        Writes the replay file.
+        """
+        name = (self.level_file or "").encode("utf-8")
+        checksums = array("I", self.checksums)
+        if sys.byteorder == "big":
+            checksums.byteswap()
+        with open(filename, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.fps, len(self.inputs), self.level_sha1, len(name),
+                                int(self.stream)))
+            f.write(name)
+            f.write(self.inputs)
+            f.write(checksums.tobytes())
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Reads a replay file.
+        """
+        with open(filename, "rb") as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"{filename} is not a replay file")
+        magic, version, fps, ticks, level_sha1, name_size, stream = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{filename} is not a replay file (version {VERSION})")
+        offset = HEADER.size
+        level_file = data[offset:offset + name_size].decode("utf-8") or None
+        offset += name_size
+        replay = cls(level_file, fps, level_sha1, bool(stream))
+        replay.inputs = bytearray(data[offset:offset + ticks])
+        replay.checksums = array("I", data[offset + ticks:offset + ticks * 5])
+        if len(replay.inputs) != ticks or len(replay.checksums) != ticks:
+            raise ValueError(f"{filename} is truncated")
+        if sys.byteorder == "big":
+            replay.checksums.byteswap()
+        return replay
+
+class ReplayPlayer:
+    """
+    Feeds a Replay into a World tick by tick and compares the state
+    checksums with the recorded ones.
+    """
+    def __init__(self, replay):
+        self.replay = replay
+        self.tick = 0
+        self.diverged_at = None  # first tick whose checksum differed
+
+    @property
+    def finished(self):
+        return self.tick >= len(self.replay)
+
+    def next_controls(self):
+        """
+        Returns the Controls for the next world.step().
+        """
+        return self.replay.controls(self.tick)
+
+    def verify(self, world):
+        """
+        Checks the state after a step against the recording; call after every step.
+        :return: False once the playthrough has diverged
+        """
+        if self.tick < len(self.replay) and self.diverged_at is None:
+            if world.checksum() != self.replay.checksums[self.tick]:
+                self.diverged_at = self.tick
+        self.tick += 1
+        return self.diverged_at is None
+
+    def report(self):
+        """
+        One-line result of the playback.
+        """
+        if self.diverged_at is not None:
+            return f"replay diverged at tick {self.diverged_at} of {len(self.replay)}"
+        return f"replay matched {min(self.tick, len(self.replay))} of {len(self.replay)} ticks"
+
+def play_headless(replay, level_file=None, stream=None):
+    """
+    Plays a replay without a window as fast as possible.
+    :param level_file: Level to play instead of the recorded path (must have the same hash)
+    :param stream: Stream the level (None = as recorded)
+    :return: Tuple (ReplayPlayer, final state, ticks per second)
+    """
+    from headless import init_headless
+    init_headless()
+    level_file = level_file or replay.level_file
+    replay.check_level(level_file)
+    if stream is None:
+        stream = replay.stream
+    world = World.load(level_file, replay.fps, stream)
+    player = ReplayPlayer(replay)
+    state = world.state()
+    start = time.perf_counter()
+    while not player.finished:
+        state = world.step(player.next_controls())
+        player.verify(world)
+    elapsed = time.perf_counter() - start
+    world.level.close()
+    return player, state, (player.tick / elapsed if elapsed > 0 else float("inf"))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or play back recorded replays.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    info = commands.add_parser("info", help="print what a replay contains")
+    info.add_argument("replay", help="replay file")
+    play = commands.add_parser("play", help="play a replay and check it still takes the same path")
+    play.add_argument("replay", help="replay file")
+    play.add_argument("--level", help="level file to use instead of the recorded path")
+    play.add_argument("--render", action="store_true", help="play in the game window instead of headless")
+    play.add_argument("--stream", action="store_true",
+                      help="load the level region by region even if it was loaded whole when recorded")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.replay)
+    if args.command == "info":
+        print(f"level {replay.level_file or 'built-in'} sha1 {replay.level_sha1.hex()}"
+              f"{' (streamed)' if replay.stream else ''}")
+        print(f"{len(replay)} ticks at {replay.fps} ticks/s "
+              f"({len(replay) / replay.fps:.1f} s of play)")
+        return 0
+
+    level_file = args.level or replay.level_file
+    try:
+        replay.check_level(level_file)
+    except (OSError, ValueError) as error:
+        print(error)
+        return 1
+    stream = args.stream or replay.stream
+    if args.render:
+        from main import LevelScene, LoadingScene, run
+        scene = LevelScene(level_file, stream=stream, replay=replay)
+        run(LoadingScene(scene), stream=stream)
+        player = scene.playback
+    else:
+        player, state, tps = play_headless(replay, level_file, stream)
+        print(state)
+        print(f"{player.tick} ticks, {tps:.0f} ticks/s")
+    print(player.report())
+    return 0 if player.diverged_at is None else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
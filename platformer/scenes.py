@@ -0,0 +1,608 @@
+# scenes.py
+
+import os
+import math
+import sys
+from glob import glob, escape as glob_escape
+from time import perf_counter
+import pygame
+from assets import ASSETS
+from background import Background
+from config import WIDTH, HEIGHT, FPS
+
+LEVELS_DIR = "levels"
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+RESOLUTIONS = ["640x480", "800x600", "1024x768", "1280x720", "1920x1080"]
+
+def level_files(directory=LEVELS_DIR):
+    """
+    Returns the CSV levels of a directory, sorted by name.
+    """
+    return sorted(glob(os.path.join(directory, "*.csv")))
+
+def next_level(level_file):
+    """
+    Returns the level after level_file in its directory, or None after the last one.
+    The built-in level (None) is followed by the first level in LEVELS_DIR.
+    """
+    if level_file is None:
+        files = level_files()
+        return files[0] if files else None
+    files = level_files(os.path.dirname(level_file) or ".")
+    current = os.path.abspath(level_file)
+    for index, path in enumerate(files):
+        if os.path.abspath(path) == current:
+            return files[index + 1] if index + 1 < len(files) else None
+    return None
+
+def save_resolution(width, height, filename=os.path.join(GAME_DIR, "config.py")):
+    """
+    Overwrites WIDTH and HEIGHT in config.py.
+    """
+    lines = []
+    with open(filename, "r") as f:
+        for line in f:
+            if line.startswith("WIDTH"):
+                lines.append(f"WIDTH = {width}\n")
+            elif line.startswith("HEIGHT"):
+                lines.append(f"HEIGHT = {height}\n")
+            else:
+                lines.append(line)
+    with open(filename, "w") as f:
+        f.writelines(lines)
+
+class Scene:
+    """
+    One screen of the game (menu, level, result ...) run by a SceneManager.
+    Heavy setup belongs in enter() rather than __init__, so it is counted
+    in the transition time the manager measures.
+    """
+    manager = None
+    transitional = False  # only bridges a switch (LoadingScene), doesn't end it
+
+    def enter(self):
+        """
+        Called when the scene is pushed; the window is self.manager.window.
+        """
+
+    def exit(self):
+        """
+        Called when the scene is removed from the stack.
+        """
+
+    def frame(self, events, frame_time):
+        """
+        Handles one frame: input, update, draw and display update.
+        :param events: pygame events of this frame (QUIT is handled by the manager)
+        :param frame_time: Seconds since the previous frame
+        """
+
+class SceneManager:
+    """
+    Runs a stack of scenes in one process.
+    The display, fonts and decoded assets stay alive across scenes, so
+    going from the menu to a level or from one level to the next only
+    costs building the new scene. Levels are loaded behind a LoadingScene
+    by the preloader. The time from a switch until the new scene's first
+    frame is recorded in `transitions`.
+    """
+    def __init__(self, window, level_scene, fps=FPS, preloader=None, restart_args=()):
+        """
+        :param window: Display surface shared by every scene
+        :param level_scene: Callable level_file -> Scene that plays a level
+                            (level_file None = built-in level); the scene
+                            needs level_file, stream and world attributes
+        :param fps: Frame cap
+        :param preloader: preload.Preloader that loads levels in the background
+        :param restart_args: menu.py arguments that restart the game with the
+                             same options (see SettingsScene)
+        """
+        self.window = window
+        self.level_scene = level_scene
+        self.fps = fps
+        self.preloader = preloader
+        self.restart_args = list(restart_args)
+        self.clock = pygame.time.Clock()
+        self.stack = []
+        self.transitions = []  # (scene class name, ms until its first frame)
+        self.on_transition = None  # optional callable(scene name, ms)
+        self._switch_start = None
+        self._switch_scene = None
+
+    def _begin_switch(self):
+        if self._switch_start is None:
+            self._switch_start = perf_counter()
+
+    def push(self, scene):
+        """
+        Starts scene on top of the current one.
+        """
+        self._begin_switch()
+        scene.manager = self
+        self.stack.append(scene)
+        self._switch_scene = scene
+        scene.enter()
+
+    def pop(self):
+        """
+        Ends the current scene and returns to the one below it.
+        """
+        self._begin_switch()
+        self.stack.pop().exit()
+        self._switch_scene = self.stack[-1] if self.stack else None
+
+    def replace(self, scene):
+        """
+        Ends the current scene and starts scene in its place.
+        """
+        self._begin_switch()
+        if self.stack:
+            self.stack.pop().exit()
+        self.push(scene)
+
+    def play(self, level_file):
+        """
+        Replaces the current scene with a level, loaded behind a LoadingScene.
+        """
+        self.replace(LoadingScene(self.level_scene(level_file)))
+
+    def home(self):
+        """
+        Returns to the main menu, reusing the one on the stack if there is one.
+        """
+        while len(self.stack) > 1:
+            self.pop()
+        if not self.stack or not isinstance(self.stack[0], MenuScene):
+            self.replace(MenuScene())
+
+    def quit(self):
+        """
+        Ends every scene; run() returns afterwards.
+        """
+        while self.stack:
+            self.pop()
+
+    def run(self, scene):
+        """
+        Runs scenes, starting with scene, until the stack is empty or the window is closed.
+        """
+        self.push(scene)
+        while self.stack:
+            frame_time = self.clock.tick(self.fps) / 1000
+            events = pygame.event.get()
+            if any(event.type == pygame.QUIT for event in events):
+                self.quit()
+                break
+            scene = self.stack[-1]
+            scene.frame(events, frame_time)
+            if self.preloader is not None:
+                self.preloader.poll()
+            if self._switch_start is not None and scene is self._switch_scene and not scene.transitional:
+                # The new scene has shown its first frame
+                name = type(scene).__name__
+                ms = 1000 * (perf_counter() - self._switch_start)
+                self.transitions.append((name, ms))
+                self._switch_start = None
+                if self.on_transition is not None:
+                    self.on_transition(name, ms)
+            elif self._switch_start is not None:
+                # Don't let the next scene see the switch as elapsed game time
+                self.clock.tick()
+
+class LoadingScene(Scene):
+    """
+    Loads a level on the manager's preloader while showing a spinner, a
+    progress bar and the level name, then replaces itself with the level
+    scene. A level preloaded while the previous one was played starts
+    after a single frame.
+    """
+    transitional = True
+    BACKGROUND_COLOR = (20, 16, 32)
+    TEXT_COLOR = (255, 255, 255)
+    BAR_COLOR = (90, 70, 160)
+    OUTLINE_COLOR = (200, 200, 220)
+    BAR_SIZE = (400, 24)
+    DOTS = 8
+    SPIN_SPEED = 1.5  # turns per second
+
+    def __init__(self, scene):
+        """
+        :param scene: Level scene to start once loaded (from manager.level_scene);
+                      its world attribute is set to the loaded World
+        """
+        self.scene = scene
+        self.time = 0.0
+
+    def enter(self):
+        self.load = self.manager.preloader.load(self.scene.level_file, self.scene.stream)
+        font = ASSETS.get(("font", "Arial", 32, True),
+                          lambda: pygame.font.SysFont("Arial", 32, bold=True))
+        level_file = self.scene.level_file
+        name = os.path.splitext(os.path.basename(level_file))[0] if level_file else "built-in level"
+        self.label = font.render(f"Loading {name}", True, self.TEXT_COLOR)
+
+    def frame(self, events, frame_time):
+        try:
+            loaded = self.load.poll()
+        except (OSError, ValueError) as error:
+            # Unreadable file or a cell the loaders can't build (see level_loader.load_level)
+            self.manager.preloader.take(self.scene.level_file, self.scene.stream)
+            self.manager.replace(ResultScene("error", self.scene.level_file, message=str(error)))
+            return
+        if loaded:
+            self.scene.world = self.manager.preloader.take(self.scene.level_file, self.scene.stream)
+            self.manager.replace(self.scene)
+            return
+
+        window = self.manager.window
+        width, height = window.get_size()
+        self.time += frame_time
+        window.fill(self.BACKGROUND_COLOR)
+        window.blit(self.label, self.label.get_rect(center=(width // 2, height // 2 - 80)))
+
+        # Spinner: a ring of dots with the bright one going round
+        turn = self.time * self.SPIN_SPEED
+        for index in range(self.DOTS):
+            angle = 2 * math.pi * index / self.DOTS
+            fade = ((turn * self.DOTS - index) % self.DOTS) / self.DOTS
+            color = [int(channel * (1 - 0.8 * fade)) for channel in self.TEXT_COLOR]
+            center = (width // 2 + 28 * math.cos(angle), height // 2 - 10 + 28 * math.sin(angle))
+            pygame.draw.circle(window, color, center, 6)
+
+        bar = pygame.Rect(0, 0, *self.BAR_SIZE)
+        bar.center = (width // 2, height // 2 + 60)
+        filled = bar.inflate(-6, -6)
+        filled.width = int(filled.width * self.load.progress)
+        pygame.draw.rect(window, self.BAR_COLOR, filled)
+        pygame.draw.rect(window, self.OUTLINE_COLOR, bar, 2)
+        pygame.display.flip()
+
+class MenuList:
+    """
+    Vertical list of buttons picked with the mouse or the arrow keys and Enter.
+    Labels are rendered once when the list is built. A list that doesn't
+    fit in its bounds shows as many buttons as fit there and scrolls with
+    the selection and the mouse wheel.
+    """
+    TEXT_COLOR = (255, 255, 255)
+    BUTTON_COLOR = (40, 40, 60)
+    SELECTED_COLOR = (90, 70, 160)
+    OUTLINE_COLOR = (0, 0, 0)
+    ARROW_SIZE = 8  # half width of the more-above/more-below arrows
+
+    def __init__(self, options, center, width=320, height=56, spacing=16, bounds=None):
+        """
+        :param options: List of (label, callback) pairs
+        :param center: Screen position of the middle of the list
+        :param width: Button width in pixels
+        :param height: Button height in pixels
+        :param spacing: Gap between buttons in pixels
+        :param bounds: (top, bottom) screen rows the buttons must stay between (None = no limit)
+        """
+        font = ASSETS.get(("font", "Arial", 32, True),
+                          lambda: pygame.font.SysFont("Arial", 32, bold=True))
+        self.callbacks = [callback for _, callback in options]
+        self.labels = [font.render(label, True, self.TEXT_COLOR) for label, _ in options]
+        visible = len(options)
+        total = visible * height + (visible - 1) * spacing
+        top = center[1] - total // 2
+        if bounds is not None and (top < bounds[0] or top + total > bounds[1]):
+            visible = min(visible, max(1, (bounds[1] - bounds[0] + spacing) // (height + spacing)))
+            total = visible * height + (visible - 1) * spacing
+            top = (bounds[0] + bounds[1] - total) // 2
+        # Screen rects of the visible buttons; rects[i] shows option first + i
+        self.rects = [pygame.Rect(center[0] - width // 2, top + i * (height + spacing), width, height)
+                      for i in range(visible)]
+        self.first = 0
+        self.selected = 0
+
+    def select(self, index):
+        """
+        Selects an option and scrolls it into view.
+        """
+        self.selected = index
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + len(self.rects):
+            self.first = index - len(self.rects) + 1
+
+    def scroll(self, rows):
+        """
+        Scrolls the list by rows buttons (negative = up), keeping it full.
+        """
+        self.first = max(0, min(self.first + rows, len(self.callbacks) - len(self.rects)))
+
+    def handle(self, event):
+        """
+        Moves the selection, scrolls or runs the selected option's callback.
+        """
+        count = len(self.callbacks)
+        if event.type == pygame.KEYDOWN:
+            if event.key in (pygame.K_UP, pygame.K_w):
+                self.select((self.selected - 1) % count)
+            elif event.key in (pygame.K_DOWN, pygame.K_s):
+                self.select((self.selected + 1) % count)
+            elif event.key == pygame.K_PAGEUP:
+                self.select(max(0, self.selected - len(self.rects)))
+            elif event.key == pygame.K_PAGEDOWN:
+                self.select(min(count - 1, self.selected + len(self.rects)))
+            elif event.key in (pygame.K_RETURN, pygame.K_KP_ENTER, pygame.K_SPACE):
+                self.callbacks[self.selected]()
+        elif event.type == pygame.MOUSEWHEEL:
+            self.scroll(-event.y)
+        elif event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN):
+            for slot, rect in enumerate(self.rects):
+                if rect.collidepoint(event.pos):
+                    self.selected = self.first + slot
+                    if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                        self.callbacks[self.selected]()
+                    break
+
+    def draw(self, window):
+        for slot, rect in enumerate(self.rects):
+            index = self.first + slot
+            label = self.labels[index]
+            color = self.SELECTED_COLOR if index == self.selected else self.BUTTON_COLOR
+            pygame.draw.rect(window, color, rect, border_radius=8)
+            pygame.draw.rect(window, self.OUTLINE_COLOR, rect, 2, border_radius=8)
+            window.blit(label, label.get_rect(center=rect.center))
+        # Arrows in the gaps above and below when there are more options
+        size = self.ARROW_SIZE
+        if self.first > 0:
+            x, y = self.rects[0].midtop
+            pygame.draw.polygon(window, self.TEXT_COLOR, [(x - size, y - 4), (x + size, y - 4), (x, y - 4 - size)])
+        if self.first + len(self.rects) < len(self.labels):
+            x, y = self.rects[-1].midbottom
+            pygame.draw.polygon(window, self.TEXT_COLOR, [(x - size, y + 4), (x + size, y + 4), (x, y + 4 + size)])
+
+class OptionsScene(Scene):
+    """
+    Background, a title and a MenuList; Escape runs back().
+    Subclasses return their buttons from options().
+    """
+    TITLE_COLOR = (255, 255, 255)
+    SUBTITLE_COLOR = (255, 223, 0)
+    title = ""
+    subtitle = ""
+    MENU_TOP = 230  # y below the title and subtitle
+
+    def options(self):
+        """
+        :return: List of (label, callback) pairs
+        """
+        return []
+
+    def back(self):
+        self.manager.home()
+
+    def enter(self):
+        window = self.manager.window
+        width, height = window.get_size()
+        self.background = Background("Purple.png", width, height)
+        title_font = ASSETS.get(("font", "Arial", 64, True),
+                                lambda: pygame.font.SysFont("Arial", 64, bold=True))
+        font = ASSETS.get(("font", "Arial", 32, True),
+                          lambda: pygame.font.SysFont("Arial", 32, bold=True))
+        self.title_image = title_font.render(self.title, True, self.TITLE_COLOR)
+        self.subtitle_image = font.render(self.subtitle, True, self.SUBTITLE_COLOR) if self.subtitle else None
+        if self.subtitle_image is not None and self.subtitle_image.get_width() > width - 40:
+            # Long subtitles (e.g. load errors) are shrunk to fit the window
+            scale = (width - 40) / self.subtitle_image.get_width()
+            self.subtitle_image = pygame.transform.smoothscale_by(self.subtitle_image, scale)
+        # Buttons that don't fit between the subtitle and the bottom edge scroll there
+        self.menu = MenuList(self.options(), (width // 2, height // 2 + 40), bounds=(self.MENU_TOP, height - 20))
+
+    def handle(self, event):
+        """
+        Scene specific events; return True if the event was used.
+        """
+        return False
+
+    def draw(self, window):
+        """
+        Draws scene specific widgets over the background, before display update.
+        """
+
+    def frame(self, events, frame_time):
+        for event in events:
+            if self.handle(event):
+                continue
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                self.back()
+            else:
+                self.menu.handle(event)
+            if self.manager.stack[-1] is not self:
+                return  # an option switched scenes
+
+        window = self.manager.window
+        width = window.get_width()
+        self.background.draw(window, 0, 0)
+        window.blit(self.title_image, self.title_image.get_rect(center=(width // 2, 120)))
+        if self.subtitle_image is not None:
+            window.blit(self.subtitle_image, self.subtitle_image.get_rect(center=(width // 2, 190)))
+        self.menu.draw(window)
+        self.draw(window)
+        pygame.display.flip()
+
+class MenuScene(OptionsScene):
+    """
+    Main menu: play the built-in level, pick a level, settings or quit.
+    """
+    title = "Platformer"
+
+    def options(self):
+        manager = self.manager
+        return [
+            ("Play", lambda: manager.push(LoadingScene(manager.level_scene(None)))),
+            ("Load Level", lambda: manager.push(LevelSelectScene())),
+            ("Settings", lambda: manager.push(SettingsScene())),
+            ("Quit", manager.quit),
+        ]
+
+    def back(self):
+        self.manager.quit()
+
+class LevelSelectScene(OptionsScene):
+    """
+    Lists the CSV levels in LEVELS_DIR, plus "Open File..." for a level
+    anywhere else (OpenLevelScene). A CSV file dropped on the window is
+    played as well.
+    """
+    title = "Load Level"
+    subtitle = "or drop a CSV level on the window"
+
+    def options(self):
+        options = [(os.path.splitext(os.path.basename(path))[0],
+                    lambda path=path: self.manager.play(path)) for path in level_files()]
+        return options + [("Open File...", lambda: self.manager.push(OpenLevelScene())), ("Back", self.back)]
+
+    def handle(self, event):
+        if event.type == pygame.DROPFILE and event.file.lower().endswith(".csv"):
+            self.manager.play(event.file)
+            return True
+        return False
+
+class OpenLevelScene(OptionsScene):
+    """
+    Text field for the path of a CSV level, the in-window replacement for
+    the old wx file dialog. Tab completes directories and CSV files, Enter
+    plays the level, Escape goes back to the level list. A CSV file dropped
+    on the window fills in its path.
+    """
+    title = "Open Level"
+    TEXT_COLOR = (255, 255, 255)
+    FIELD_COLOR = (40, 40, 60)
+    OUTLINE_COLOR = (200, 200, 220)
+    ERROR_COLOR = (255, 110, 110)
+    # Keys MenuList would act on that are also typed into the path
+    TYPED_KEYS = (pygame.K_SPACE, pygame.K_w, pygame.K_s)
+
+    def __init__(self, path=""):
+        """
+        :param path: Initial text of the field
+        """
+        self.path = path
+        self.error = ""
+
+    def options(self):
+        return [("Open", self.open), ("Back", self.back)]
+
+    def back(self):
+        self.manager.pop()
+
+    def enter(self):
+        super().enter()
+        self.font = ASSETS.get(("font", "Arial", 24, False), lambda: pygame.font.SysFont("Arial", 24))
+        pygame.key.start_text_input()
+
+    def exit(self):
+        pygame.key.stop_text_input()
+
+    def open(self):
+        """
+        Plays the level at the typed path, or shows why it can't.
+        """
+        path = os.path.expanduser(self.path.strip())
+        if not path.lower().endswith(".csv"):
+            self.error = "Not a CSV level"
+        elif not os.path.isfile(path):
+            self.error = "File not found"
+        else:
+            self.manager.play(path)
+
+    def complete(self):
+        """
+        Extends the path to the longest prefix shared by the matching
+        directories and CSV files.
+        """
+        path = os.path.expanduser(self.path)
+        matches = [match + os.sep if os.path.isdir(match) else match
+                   for match in glob(glob_escape(path) + "*")
+                   if os.path.isdir(match) or match.lower().endswith(".csv")]
+        if matches:
+            self.path = os.path.commonprefix(matches)
+
+    def handle(self, event):
+        if event.type == pygame.TEXTINPUT:
+            self.path += event.text
+        elif event.type == pygame.DROPFILE:
+            self.path = event.file
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_BACKSPACE:
+            self.path = self.path[:-1]
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_TAB:
+            self.complete()
+        elif event.type == pygame.KEYDOWN and event.key in self.TYPED_KEYS:
+            pass  # the character arrives as TEXTINPUT
+        else:
+            return False
+        self.error = ""
+        return True
+
+    def draw(self, window):
+        width = window.get_width()
+        field = pygame.Rect(0, 0, min(width - 80, 640), 44)
+        field.center = (width // 2, 190)
+        pygame.draw.rect(window, self.FIELD_COLOR, field, border_radius=6)
+        pygame.draw.rect(window, self.OUTLINE_COLOR, field, 2, border_radius=6)
+        text = self.font.render(self.path + "|", True, self.TEXT_COLOR)
+        inner = field.inflate(-20, 0)
+        # Keep the end of long paths in view
+        window.set_clip(inner)
+        window.blit(text, text.get_rect(midleft=inner.midleft) if text.get_width() <= inner.width
+                    else text.get_rect(midright=inner.midright))
+        window.set_clip(None)
+        if self.error:
+            label = self.font.render(self.error, True, self.ERROR_COLOR)
+            window.blit(label, label.get_rect(center=(width // 2, window.get_height() - 40)))
+
+class SettingsScene(OptionsScene):
+    """
+    Resolution picker. WIDTH/HEIGHT are read at import time everywhere, so
+    a new resolution is saved to config.py and the game restarts into the menu.
+    """
+    title = "Settings"
+    subtitle = f"Resolution (now {WIDTH}x{HEIGHT})"
+
+    def options(self):
+        options = [(size, lambda size=size: self.apply(size)) for size in RESOLUTIONS]
+        return options + [("Back", self.back)]
+
+    def apply(self, size):
+        width, height = map(int, size.split("x"))
+        save_resolution(width, height)
+        pygame.quit()
+        python = sys.executable
+        os.execl(python, python, os.path.join(GAME_DIR, "menu.py"), *self.manager.restart_args)
+
+class ResultScene(OptionsScene):
+    """
+    Shown when a level ends: next level/load level/menu after a win,
+    retry/menu after dying, load level/menu when the level couldn't be loaded.
+    """
+    TITLES = {"won": "Level Complete!", "dead": "Game Over", "error": "Level Error"}
+
+    def __init__(self, outcome, level_file=None, score=0, message=""):
+        """
+        :param outcome: "won", "dead" or "error"
+        :param level_file: Level that was played (None = built-in level)
+        :param score: Final score
+        :param message: Why the level couldn't be loaded (outcome "error")
+        """
+        self.outcome = outcome
+        self.level_file = level_file
+        self.title = self.TITLES[outcome]
+        self.subtitle = message if outcome == "error" else f"Score: {score}"
+
+    def options(self):
+        manager = self.manager
+        if self.outcome == "won":
+            options = []
+            following = next_level(self.level_file)
+            if following is not None:
+                options.append(("Next Level", lambda: manager.play(following)))
+            options.append(("Load Level", lambda: manager.replace(LevelSelectScene())))
+        elif self.outcome == "error":
+            options = [("Load Level", lambda: manager.replace(LevelSelectScene()))]
+        else:
+            options = [("Retry", lambda: manager.play(self.level_file))]
+        return options + [("Main Menu", manager.home), ("Quit", manager.quit)]
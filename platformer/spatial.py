@@ -0,0 +1,167 @@
+# spatial.py
+
+import pygame
+
+def collision_rect(obj):
+    """
+    Returns the area an object can collide in.
+    This is its rect, grown to the size of its mask when the sprite is larger
+    than the rect (e.g. Fire keeps a 16x32 rect but a 32x64 scaled sprite).
+    """
+    rect = obj.rect
+    mask = getattr(obj, "mask", None)
+    if mask is None:
+        return rect
+    width, height = mask.get_size()
+    if width <= rect.width and height <= rect.height:
+        return rect
+    return pygame.Rect(rect.x, rect.y, max(width, rect.width), max(height, rect.height))
+
+class SpatialHash:
+    """
+    Uniform-grid spatial index over objects with a pygame.Rect `rect`.
+    Each object is stored in every cell its collision_rect() overlaps, so a query only
+    looks at the handful of cells around the queried area instead of the
+    whole level. Query results keep insertion order, which keeps collision
+    resolution identical to iterating the original objects list.
+    """
+    def __init__(self, cell_size=96):
+        """
+        :param cell_size: Width/height of one grid cell in pixels
+        """
+        self.cell_size = cell_size
+        self._cells = {}   # (cx, cy) -> {obj: None}
+        self._bounds = {}  # obj -> (cx0, cy0, cx1, cy1)
+        self._order = {}   # obj -> insertion sequence number
+        self._next_order = 0
+
+    def __len__(self):
+        return len(self._bounds)
+
+    def __contains__(self, obj):
+        return obj in self._bounds
+
+    def __iter__(self):
+        return iter(self._bounds)
+
+    def _cell_bounds(self, rect):
+        """
+        Returns the inclusive cell range (cx0, cy0, cx1, cy1) covered by rect.
+        """
+        size = self.cell_size
+        return (rect.left // size, rect.top // size,
+                (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    def reserve(self):
+        """
+        Reserves an insertion sequence number for an object kept outside the
+        grid (e.g. an enemy in the EnemySwarm), which stores it as `order`.
+        """
+        order = self._next_order
+        self._next_order += 1
+        return order
+
+    def skip_to(self, order):
+        """
+        Makes objects inserted or reserved from now on sort after every
+        sequence number below order (e.g. the grid positions of a loaded level).
+        """
+        self._next_order = max(self._next_order, order)
+
+    def order_of(self, obj):
+        """
+        Returns the insertion sequence number of an indexed or reserved object.
+        """
+        order = self._order.get(obj)
+        return obj.order if order is None else order
+
+    def insert(self, obj, order=None):
+        """
+        Adds an object to every cell its rect overlaps.
+        :param order: Optional sequence number reserved elsewhere (see reserve())
+        """
+        if obj in self._bounds:
+            return
+        bounds = self._cell_bounds(collision_rect(obj))
+        self._bounds[obj] = bounds
+        if order is None:
+            order = self.reserve()
+        self._order[obj] = order
+        self._link(obj, bounds)
+
+    def remove(self, obj):
+        """
+        Removes an object from the index. Unknown objects are ignored.
+        """
+        bounds = self._bounds.pop(obj, None)
+        if bounds is None:
+            return
+        del self._order[obj]
+        self._unlink(obj, bounds)
+
+    def move(self, obj):
+        """
+        Re-buckets an object after its rect changed.
+        Cheap when the object stays inside the same cells.
+        """
+        old = self._bounds.get(obj)
+        if old is None:
+            return
+        new = self._cell_bounds(collision_rect(obj))
+        if new == old:
+            return
+        self._unlink(obj, old)
+        self._link(obj, new)
+        self._bounds[obj] = new
+
+    def query(self, rect, after=None):
+        """
+        Returns the objects whose collision_rect() overlaps rect, in insertion order.
+        :param rect: pygame.Rect area to search
+        :param after: Optional indexed object; only objects inserted after it are returned
+        :return: List of objects
+        """
+        cx0, cy0, cx1, cy1 = self._cell_bounds(rect)
+        cells = self._cells
+        order = self._order
+        first = -1 if after is None else self.order_of(after)
+        found = {}
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    for obj in cell:
+                        if (obj not in found and order[obj] > first
+                                and rect.colliderect(collision_rect(obj))):
+                            found[obj] = None
+        if len(found) < 2:
+            return list(found)
+        return sorted(found, key=order.__getitem__)
+
+    def merge(self, *groups):
+        """
+        Merges lists of indexed objects into one duplicate-free list in insertion order.
+        """
+        merged = dict.fromkeys(obj for group in groups for obj in group)
+        return sorted(merged, key=self.order_of)
+
+    def _link(self, obj, bounds):
+        cx0, cy0, cx1, cy1 = bounds
+        cells = self._cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    cell = cells[(cx, cy)] = {}
+                cell[obj] = None
+
+    def _unlink(self, obj, bounds):
+        cx0, cy0, cx1, cy1 = bounds
+        cells = self._cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cell = cells.get((cx, cy))
+                if cell is not None:
+                    cell.pop(obj, None)
+                    if not cell:
+                        del cells[(cx, cy)]
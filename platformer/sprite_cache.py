@@ -0,0 +1,197 @@
+# sprite_cache.py
+
+import os
+import json
+import struct
+import hashlib
+import tempfile
+import pygame
+from assets import ASSETS
+from config import ASSET_DISK_CACHE
+
+CACHE_DIR = "__assetcache__"
+MAGIC = b"PSPR"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")  # magic, version, mask word size, JSON index length
+
+class SpriteCache:
+    """
+    Versioned on-disk cache of processed sprite frames and their collision masks.
+    Each entry holds a named set of frames (e.g. every animation of a sprite
+    sheet after slicing, scale2x and flipping) as one file: a small JSON
+    index followed by raw RGBA pixels and raw mask bits. Loading is one
+    bulk read plus a buffer copy per frame, with no image decoding,
+    transforms or mask building. Entries are keyed by the slicing
+    parameters and checked against the size and mtime of every source file.
+    """
+    def __init__(self, directory=CACHE_DIR, enabled=ASSET_DISK_CACHE):
+        """
+        :param directory: Folder the cache files are written to
+        :param enabled: If False, get() always builds and nothing is written
+        """
+        self.directory = directory
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._prefetched = {}  # key -> (stamp, frames from read()) waiting for get()
+
+    def _path(self, key):
+        name = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, name + ".sprites")
+
+    @staticmethod
+    def _stamp(sources):
+        stamp = []
+        for path in sources:
+            stat = os.stat(path)
+            stamp.append([path, stat.st_size, stat.st_mtime_ns])
+        return stamp
+
+    def get(self, key, sources, builder):
+        """
+        Returns the frames for key, from disk if the entry is current,
+        otherwise from builder() (and then written to disk).
+        :param key: Tuple of slicing/scaling parameters
+        :param sources: Paths of the image files the frames are made from
+        :param builder: Zero-argument callable returning {name: [surfaces]}
+        :return: Dictionary of lists of surfaces; masks are registered in ASSETS
+        """
+        if not self.enabled:
+            return builder()
+        stamp = self._stamp(sources)
+        prefetched = self._prefetched.pop(key, None)
+        if prefetched is not None and prefetched[0] == stamp:
+            frames = self._convert(prefetched[1])
+        else:
+            frames = self.load(key, stamp)
+        if frames is not None:
+            self.hits += 1
+            return frames
+        self.misses += 1
+        frames = builder()
+        self.store(key, stamp, frames)
+        return frames
+
+    def prefetch(self, key, sources):
+        """
+        Reads an entry ahead of get() without converting it. Needs no
+        display, so it can run on a worker thread; the next get() for key
+        then only converts the frames.
+        :return: False if there is no current entry (get() will have to build it)
+        """
+        if not self.enabled:
+            return False
+        if key in self._prefetched:
+            return True
+        stamp = self._stamp(sources)
+        frames = self.read(key, stamp)
+        if frames is None:
+            return False
+        self._prefetched[key] = (stamp, frames)
+        return True
+
+    def load(self, key, stamp):
+        """
+        Reads one entry.
+        :return: Frames dictionary, or None if missing, stale or unreadable
+        """
+        frames = self.read(key, stamp)
+        return None if frames is None else self._convert(frames)
+
+    def read(self, key, stamp):
+        """
+        Reads one entry into unconverted surfaces and their masks.
+        :return: Dictionary of lists of (surface, mask or None), or None if
+                 missing, stale or unreadable
+        """
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+            magic, version, word_size, index_size = HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version != VERSION:
+                return None
+            index = json.loads(data[HEADER.size:HEADER.size + index_size])
+        except (OSError, struct.error, ValueError):
+            return None
+        if index["key"] != repr(key) or index["sources"] != stamp:
+            return None
+
+        blob = memoryview(data)[HEADER.size + index_size:]
+        frames = {}
+        for name, entries in index["frames"].items():
+            surfaces = []
+            for width, height, offset, mask_offset, mask_size in entries:
+                pixels = bytes(blob[offset:offset + width * height * 4])
+                surface = pygame.image.frombuffer(pixels, (width, height), "RGBA")
+                mask = pygame.mask.Mask((width, height))
+                if mask_size and word_size == memoryview(mask).itemsize:
+                    memoryview(mask).cast("B")[:] = blob[mask_offset:mask_offset + mask_size]
+                else:
+                    mask = None
+                surfaces.append((surface, mask))
+            frames[name] = surfaces
+        return frames
+
+    @staticmethod
+    def _convert(frames):
+        """
+        Converts frames returned by read() for the display and registers their masks.
+        """
+        converted = {}
+        for name, surfaces in frames.items():
+            converted[name] = []
+            for surface, mask in surfaces:
+                surface = surface.convert_alpha()
+                if mask is not None:
+                    ASSETS.set_mask(surface, mask)
+                else:
+                    ASSETS.mask(surface)  # written on another platform, rebuild
+                converted[name].append(surface)
+        return converted
+
+    def store(self, key, stamp, frames):
+        """
+        Writes one entry atomically; a cache folder that can't be written is ignored.
+        """
+        blob = bytearray()
+        index = {"key": repr(key), "sources": stamp, "frames": {}}
+        word_size = 0
+        for name, surfaces in frames.items():
+            entries = index["frames"][name] = []
+            for surface in surfaces:
+                width, height = surface.get_size()
+                offset = len(blob)
+                blob += pygame.image.tobytes(surface, "RGBA")
+                mask_offset, mask_size = len(blob), 0
+                if width and height:
+                    bits = memoryview(ASSETS.mask(surface))
+                    word_size = bits.itemsize
+                    blob += bits.tobytes()
+                    mask_size = len(blob) - mask_offset
+                entries.append([width, height, offset, mask_offset, mask_size])
+
+        index_data = json.dumps(index).encode()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(suffix=".sprites", dir=self.directory)
+            with os.fdopen(fd, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, word_size, len(index_data)))
+                f.write(index_data)
+                f.write(blob)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        """
+        Deletes every cache file.
+        """
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(".sprites"):
+                os.remove(os.path.join(self.directory, name))
+
+# Shared instance used by utils
+SPRITE_CACHE = SpriteCache()
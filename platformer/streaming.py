@@ -0,0 +1,261 @@
+# streaming.py
+
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from objects import Fire
+from player import Player
+from collectibles import Coin
+from level import Level
+from level_loader import add_entity, warm_assets
+from level_compiler import (ensure_compiled, CompiledLevel, TILE_ENEMY, TILE_COIN, KIND, COL, ROW, LEFT, RIGHT,
+                            SPEED, WIDTH as ENTITY_WIDTH, HEIGHT as ENTITY_HEIGHT)
+from terrain import TileMap
+from config import WIDTH, HEIGHT, STREAM_REGION_TILES, STREAM_MEMORY_BUDGET
+
+# Rough resident cost of one loaded object
+OBJECT_BYTES = 512
+
+class StreamRegion:
+    """
+    The objects built from one square block of level tiles.
+    Collects objects like a Level (same add method) so the loader code can
+    fill it off the main thread; StreamingLevel attaches it to the level
+    later. Enemies are never part of a region, see StreamingLevel.
+    """
+    def __init__(self, key):
+        """
+        :param key: (region column, region row)
+        """
+        self.key = key
+        self.objects = []  # (object, order), coins included
+        self.nbytes = 0
+        self.last_used = 0
+
+    def add(self, obj, order):
+        """
+        Records an object (Fire, Coin, Flag, ...) with its level order.
+        """
+        self.objects.append((obj, order))
+
+class StreamingLevel(Level):
+    """
+    A level that is only loaded around the area in play.
+    The compiled level (see level_compiler.py) is memory-mapped; its terrain
+    is a TileMap straight over the mapped tile array, and its objects are
+    split into STREAM_REGION_TILES x STREAM_REGION_TILES regions. focus() builds the
+    regions around the player, prefetches the ring around them on a
+    background thread and evicts the least recently used far regions once
+    the resident size goes over the memory budget, so time to first frame
+    and memory stay bounded however large the level is.
+
+    A streamed level plays exactly like a fully loaded one, whenever its
+    regions get loaded:
+      - every object gets its CSV position as level order, so collision
+        order is the same as with load_level_csv;
+      - enemies move all the time, so they all join the enemy swarm up
+        front (a compact array row each) instead of with their region;
+      - fires are set to the animation frame of the current tick when
+        their region is attached, and collected coins stay collected;
+      - only focus(), called by the simulation, attaches and evicts
+        regions; drawing (visible()) just queues prefetches.
+    """
+    def __init__(self, filename, block_size=96, region_tiles=STREAM_REGION_TILES,
+                 memory_budget=STREAM_MEMORY_BUDGET, margin=(WIDTH, HEIGHT)):
+        """
+        :param filename: CSV or compiled level file
+        :param block_size: Tile size in pixels
+        :param region_tiles: Region width/height in tiles
+        :param memory_budget: Resident bytes kept before far regions are evicted
+        :param margin: (x, y) pixels around a focused rect that must be loaded
+        """
+        super().__init__(block_size)
+        self.filename = filename
+        self.region_tiles = region_tiles
+        self.region_size = region_tiles * block_size
+        self.memory_budget = memory_budget
+        self.margin = margin
+        self.regions = {}   # key -> attached StreamRegion
+        self._pending = {}  # key -> Future of a StreamRegion being prefetched
+        self._collected = set()  # level orders of coins already picked up
+        self._clock = 0
+        self.loads = 0
+        self.prefetched = 0
+        self.evictions = 0
+        self.data = CompiledLevel(ensure_compiled(filename))
+        self.cols = self.data.cols
+        self.rows = self.data.rows
+        self.player_start = None
+        if self.data.player is not None:
+            self.player_start = (self.data.player[0] * block_size, self.data.player[1] * block_size)
+        self.set_tilemap(TileMap(self.data.tiles, block_size))
+        # One array append for all enemies, in entity table order like load_level_compiled
+        entities = self.data.entities
+        enemies = entities[entities[:, KIND] == TILE_ENEMY].astype(np.int64)
+        cols, rows = enemies[:, COL], enemies[:, ROW]
+        self.enemies.add_many(np.column_stack((
+            cols * block_size, rows * block_size, enemies[:, ENTITY_WIDTH], enemies[:, ENTITY_HEIGHT],
+            enemies[:, LEFT], enemies[:, RIGHT], enemies[:, SPEED], self.order_at(cols, rows))))
+        self.coin_count = int(np.count_nonzero(entities[:, KIND] == TILE_COIN))
+        # Background builds only create objects from cached surfaces
+        warm_assets(block_size)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def coins_left(self):
+        """
+        Number of coins of the level not collected yet, resident or not.
+        """
+        return self.coin_count - self.coins.collected
+
+    def order_at(self, col, row):
+        """
+        Level order of the cell at (col, row): its position in the CSV.
+        """
+        return row * self.cols + col
+
+    def _region_keys(self, rect):
+        """
+        Returns the keys of the regions (inside the level) overlapping rect.
+        """
+        size = self.region_size
+        last_x = (self.cols - 1) // self.region_tiles
+        last_y = (self.rows - 1) // self.region_tiles
+        x0, y0 = max(0, rect.left // size), max(0, rect.top // size)
+        x1, y1 = min(last_x, (rect.right - 1) // size), min(last_y, (rect.bottom - 1) // size)
+        return [(rx, ry) for ry in range(y0, y1 + 1) for rx in range(x0, x1 + 1)]
+
+    def _build(self, key):
+        """
+        Reads and builds one region. Runs on the prefetch thread, so it
+        must not touch the level itself.
+        """
+        region = StreamRegion(key)
+        tiles = self.region_tiles
+        col0, row0 = key[0] * tiles, key[1] * tiles
+        col1, row1 = col0 + tiles, row0 + tiles
+        for entity in self.data.entities_in(col0, row0, col1, row1).tolist():
+            if entity[KIND] != TILE_ENEMY:
+                add_entity(region, entity, self.block_size, self.order_at(entity[COL], entity[ROW]))
+        region.nbytes = OBJECT_BYTES * len(region.objects)
+        return region
+
+    def _attach(self, region, tick):
+        """
+        Adds a built region to the level (main thread only).
+        :param tick: Ticks simulated so far; fire animations are set to match
+        """
+        for obj, order in region.objects:
+            if isinstance(obj, Coin) and order in self._collected:
+                continue
+            if isinstance(obj, Fire):
+                obj.on()  # CSV levels play with every fire switched on
+                obj.skip_to(tick)
+            self.add(obj, order)
+        self.regions[region.key] = region
+        self.loads += 1
+
+    def _evict(self, key):
+        """
+        Removes a region from the level, remembering which of its coins were collected.
+        """
+        region = self.regions.pop(key)
+        for obj, order in region.objects:
+            if isinstance(obj, Coin):
+                if obj in self.coins:
+                    self.coins.remove(obj)
+                else:
+                    self._collected.add(order)
+            else:
+                self.remove(obj)
+        self.evictions += 1
+
+    @property
+    def resident_bytes(self):
+        """
+        Estimated memory held by the attached regions.
+        """
+        return sum(region.nbytes for region in self.regions.values())
+
+    def _prefetch(self, keys):
+        """
+        Queues background builds of the regions that are neither attached nor pending.
+        """
+        for key in keys:
+            if key not in self.regions and key not in self._pending:
+                self._pending[key] = self._executor.submit(self._build, key)
+
+    def focus(self, rect, tick=0):
+        """
+        Makes sure every region within the margin around rect is loaded,
+        prefetches the next ring of regions and evicts far regions while
+        over the memory budget.
+        :param tick: Ticks simulated so far
+        """
+        super().focus(rect, tick)
+        self._clock += 1
+        needed = rect.inflate(self.margin[0] * 2, self.margin[1] * 2)
+        for key in self._region_keys(needed):
+            region = self.regions.get(key)
+            if region is None:
+                future = self._pending.pop(key, None)
+                if future is not None:
+                    region = future.result()
+                    self.prefetched += 1
+                else:
+                    region = self._build(key)
+                self._attach(region, tick)
+            region.last_used = self._clock
+
+        # Queue the surrounding ring; drop prefetches that are out of range again
+        ring = set(self._region_keys(needed.inflate(self.region_size * 2, self.region_size * 2)))
+        for key, future in list(self._pending.items()):
+            if key not in ring and (future.cancel() or future.done()):
+                del self._pending[key]
+        self._prefetch(ring)
+
+        if self.resident_bytes > self.memory_budget:
+            far = sorted((region.last_used, key) for key, region in self.regions.items()
+                         if region.last_used != self._clock)
+            for _, key in far:
+                self._evict(key)
+                if self.resident_bytes <= self.memory_budget:
+                    break
+
+    def visible(self, rect):
+        """
+        Returns the terrain and the objects of the attached regions in rect
+        like Level.visible. Regions in view that are not loaded yet are only
+        queued for prefetching: attaching them here would make the
+        simulation depend on the camera.
+        """
+        self._prefetch(self._region_keys(rect))
+        return super().visible(rect)
+
+    def close(self):
+        """
+        Stops the prefetch thread and unmaps the level file.
+        """
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._pending.clear()
+        self.tilemap = None
+        self.data.close()
+
+    def stats(self):
+        """
+        Returns region and memory counters.
+        """
+        return {"regions": len(self.regions), "pending": len(self._pending),
+                "resident_bytes": self.resident_bytes, "loads": self.loads,
+                "prefetched": self.prefetched, "evictions": self.evictions}
+
+def load_level_stream(filename, block_size=96):
+    """
+    Opens a CSV or compiled level in streaming mode and returns player,
+    level like load_level_csv. Only the regions around the player start are loaded.
+    """
+    level = StreamingLevel(filename, block_size)
+    if level.player_start is not None:
+        player = Player(*level.player_start, 50, 50)
+    else:
+        player = Player(100, 100, 50, 50)
+    level.focus(player.rect)
+    return player, level
@@ -0,0 +1,224 @@
+# terrain.py
+
+from collections import OrderedDict
+import numpy as np
+import pygame
+from objects import Block
+from utils import collide_solid_rect
+from level_compiler import TILE_BLOCK
+from config import TERRAIN_CHUNK_TILES
+
+class TerrainSolid:
+    """
+    A merged, axis-aligned collision rectangle covering a run of solid tiles
+    in one row (see merge_runs).
+    Terrain tiles are fully opaque, so the rect itself is the collision shape
+    and no per-tile mask is needed. `order` is the grid position of its
+    top-left tile, which is its place in the level (collision) order.
+    """
+    name = "terrain"
+    mask = None
+
+    def __init__(self, rect, order):
+        self.rect = rect
+        self.order = order
+
+    def collide(self, sprite, dx=0, dy=0):
+        """
+        Pixel-accurate test of a masked sprite against this solid rectangle.
+        :param dx: Test as if the sprite were moved right by dx
+        :param dy: Test as if the sprite were moved down by dy
+        :return: Overlap point or None, like pygame.sprite.collide_mask
+        """
+        return collide_solid_rect(self.rect, sprite, dx, dy)
+
+def merge_runs(cells):
+    """
+    Merges solid tiles into horizontal runs, one row high.
+    Runs never span rows: a taller rectangle would put its top or bottom
+    edge where a per-tile block has none, and the collision code snaps the
+    player to the edge of whatever it overlaps. A run inside one row has
+    the same edges and level order as the tiles it covers, so colliding
+    with it is the same as colliding with the first of them.
+    :param cells: Set of (col, row) tile coordinates
+    :return: List of (col, row, cols, 1) rectangles in tile units, in level order
+    """
+    rows = {}
+    for col, row in cells:
+        rows.setdefault(row, []).append(col)
+
+    merged = []
+    for row in sorted(rows):
+        cols = sorted(rows[row])
+        start = prev = cols[0]
+        for col in cols[1:]:
+            if col != prev + 1:
+                merged.append((start, row, prev - start + 1, 1))
+                start = col
+            prev = col
+        merged.append((start, row, prev - start + 1, 1))
+    return merged
+
+class TileMap:
+    """
+    Static terrain as a 2D array of tile kinds (one byte per tile, see
+    level_compiler.TILE_*) plus the shared block tile surface.
+    Nothing is kept per tile: drawing blits one surface per visible
+    SURFACE_TILES x SURFACE_TILES area with the shared tile baked in at
+    its solid positions (built on first sight, the SURFACE_CACHE most
+    recently drawn kept), and collision queries merge the solid tiles of
+    each chunk_tiles x chunk_tiles chunk they touch into TerrainSolid rects
+    on first use (cached until trim()). The array can be a view into a
+    memory-mapped compiled level, so even levels with millions of tiles
+    only keep the pages in use resident.
+    """
+    SOLID = TILE_BLOCK
+    CHUNK_CACHE = 1024  # chunks of merged solids kept between trim() calls
+    SURFACE_TILES = 8  # width/height in tiles of a baked draw surface
+    SURFACE_CACHE = 32  # baked surfaces kept (a 1920x1080 view shows up to 12)
+    SURFACE_KEY = (255, 0, 255)  # colorkey of the empty tiles; the block tile has no such pixel
+
+    def __init__(self, tiles, tile_size=96, chunk_tiles=TERRAIN_CHUNK_TILES):
+        """
+        :param tiles: 2D uint8 array (rows x cols) of tile kinds; only
+                      TILE_BLOCK tiles are drawn and solid
+        :param tile_size: Tile width/height in pixels
+        :param chunk_tiles: Width/height in tiles of the areas solids are merged in
+        """
+        self.tiles = tiles
+        self.tile_size = tile_size
+        self.chunk_tiles = chunk_tiles
+        self.rows, self.cols = tiles.shape
+        self.rect = pygame.Rect(0, 0, self.cols * tile_size, self.rows * tile_size)
+        self.chunk_size = chunk_tiles * tile_size
+        self.tile_image = Block(0, 0, tile_size).image  # shared with every Block of this size
+        self._chunks = {}  # (chunk col, chunk row) -> list of TerrainSolid in level order
+        self.surface_size = self.SURFACE_TILES * tile_size
+        self._surfaces = OrderedDict()  # (col, row) in surface_size units -> (image, x, y) or None, oldest first
+
+    @property
+    def nbytes(self):
+        return self.tiles.nbytes
+
+    def solid_count(self):
+        """
+        Number of solid tiles.
+        """
+        return int(np.count_nonzero(self.tiles == self.SOLID))
+
+    def solid_at(self, x, y):
+        """
+        True if the world point (x, y) is inside a solid tile.
+        """
+        col, row = int(x // self.tile_size), int(y // self.tile_size)
+        return 0 <= row < self.rows and 0 <= col < self.cols and self.tiles[row, col] == self.SOLID
+
+    def _cell_range(self, rect, size):
+        """
+        Returns the inclusive range (col0, row0, col1, row1) of size x size
+        pixel cells rect covers, clipped to the map.
+        """
+        right, bottom = self.rect.width - 1, self.rect.height - 1
+        return (max(rect.left, 0) // size, max(rect.top, 0) // size,
+                min(rect.right - 1, right) // size, min(rect.bottom - 1, bottom) // size)
+
+    def any_solid(self, rect):
+        """
+        True if rect overlaps any solid tile.
+        """
+        col0, row0, col1, row1 = self._cell_range(rect, self.tile_size)
+        if col0 > col1 or row0 > row1:
+            return False
+        return bool((self.tiles[row0:row1 + 1, col0:col1 + 1] == self.SOLID).any())
+
+    def query(self, rect, after=-1):
+        """
+        Returns the merged solids overlapping rect, in level order.
+        :param rect: pygame.Rect area to search
+        :param after: Only solids with a level order greater than this
+        """
+        cx0, cy0, cx1, cy1 = self._cell_range(rect, self.chunk_size)
+        chunks = self._chunks
+        found = []
+        for cy in range(cy0, cy1 + 1):
+            for cx in range(cx0, cx1 + 1):
+                solids = chunks.get((cx, cy))
+                if solids is None:
+                    solids = self._merge_chunk(cx, cy)
+                for solid in solids:
+                    if solid.order > after and rect.colliderect(solid.rect):
+                        found.append(solid)
+        # Each chunk's solids are in level order already
+        if len(found) > 1 and (cx0 != cx1 or cy0 != cy1):
+            found.sort(key=lambda solid: solid.order)
+        return found
+
+    def _merge_chunk(self, cx, cy):
+        """
+        Merges the solid tiles of one chunk into TerrainSolid rects and caches them.
+        """
+        chunk, size = self.chunk_tiles, self.tile_size
+        col0, row0 = cx * chunk, cy * chunk
+        rows, cols = np.nonzero(self.tiles[row0:row0 + chunk, col0:col0 + chunk] == self.SOLID)
+        solids = []
+        if len(rows):
+            cells = set(zip((cols + col0).tolist(), (rows + row0).tolist()))
+            solids = [TerrainSolid(pygame.Rect(col * size, row * size, width * size, height * size),
+                                   row * self.cols + col)
+                      for col, row, width, height in merge_runs(cells)]
+        self._chunks[(cx, cy)] = solids
+        return solids
+
+    def trim(self):
+        """
+        Drops the cached solids once more than CHUNK_CACHE chunks are held;
+        call between ticks, never between queries whose results get merged.
+        """
+        if len(self._chunks) > self.CHUNK_CACHE:
+            self._chunks.clear()
+
+    def _surface(self, sx, sy):
+        """
+        Returns one area's solid tiles baked into a surface cropped to them,
+        as (image, world x, world y), or None if the area has no solid tile.
+        """
+        surfaces = self._surfaces
+        key = (sx, sy)
+        if key in surfaces:
+            surfaces.move_to_end(key)
+            return surfaces[key]
+        area, size = self.SURFACE_TILES, self.tile_size
+        col0, row0 = sx * area, sy * area
+        rows, cols = np.nonzero(self.tiles[row0:row0 + area, col0:col0 + area] == self.SOLID)
+        baked = None
+        if len(rows):
+            top, left = int(rows.min()), int(cols.min())
+            image = pygame.Surface(((int(cols.max()) - left + 1) * size, (int(rows.max()) - top + 1) * size))
+            # The tile is opaque, so a run-length encoded colorkey skips the
+            # empty tiles far faster than blending a per-pixel alpha surface
+            image.fill(self.SURFACE_KEY)
+            image.set_colorkey(self.SURFACE_KEY, pygame.RLEACCEL)
+            tile = self.tile_image
+            image.blits([(tile, ((col - left) * size, (row - top) * size))
+                         for row, col in zip(rows.tolist(), cols.tolist())], doreturn=False)
+            baked = (image, (col0 + left) * size, (row0 + top) * size)
+        surfaces[key] = baked
+        if len(surfaces) > self.SURFACE_CACHE:
+            surfaces.popitem(last=False)
+        return baked
+
+    def draw(self, win, offset_x, offset_y):
+        """
+        Blits the baked surfaces of the areas visible in win, offset by camera.
+        """
+        width, height = win.get_size()
+        sx0, sy0, sx1, sy1 = self._cell_range(pygame.Rect(offset_x, offset_y, width, height),
+                                              self.surface_size)
+        blits = []
+        for sy in range(sy0, sy1 + 1):
+            for sx in range(sx0, sx1 + 1):
+                baked = self._surface(sx, sy)
+                if baked is not None:
+                    image, x, y = baked
+                    blits.append((image, (x - offset_x, y - offset_y)))
+        win.blits(blits, doreturn=False)
@@ -0,0 +1,19 @@
+# conftest.py
+
+import os
+import sys
+
+# The game modules are flat scripts that load assets relative to the
+# platformer directory, and the tests need no window or audio device.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pytest
+from headless import init_headless
+
+@pytest.fixture(scope="session", autouse=True)
+def headless_display():
+    init_headless()
@@ -0,0 +1,29 @@
+# scripted.py
+
+import pygame
+from config import WIDTH, HEIGHT
+from game import Controls
+
+def scripted_controls(tick):
+    """
+    Inputs of the scripted run: right for two periods of 120 ticks, left
+    for one, jumping every 45 ticks.
+    """
+    return Controls(left=(tick // 120) % 3 == 2, right=(tick // 120) % 3 != 2, jump=tick % 45 == 0)
+
+def checksums(world, ticks, render=False):
+    """
+    Per-tick checksums of a scripted run, then closes the level; with
+    render, the level is also asked for the camera view every tick like
+    the renderer does.
+    """
+    result = []
+    for tick in range(ticks):
+        world.step(scripted_controls(tick))
+        if render:
+            rect = world.player.rect
+            world.level.visible(pygame.Rect(rect.centerx - WIDTH // 2, rect.centery - HEIGHT // 2,
+                                            WIDTH, HEIGHT))
+        result.append(world.checksum())
+    world.level.close()
+    return result
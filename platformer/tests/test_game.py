@@ -0,0 +1,96 @@
+# test_game.py
+
+import numpy as np
+import pytest
+from game import World, Controls, collides
+from level import Level
+from objects import Block, Fire
+from collectibles import Coin
+from player import Player
+from level_compiler import TILE_BLOCK
+from terrain import TileMap
+
+def test_fire_hurts_on_first_touch():
+    level = Level(96)
+    level.add(Block(0, 96, 96))
+    fire = Fire(20, 32, 16, 32)
+    fire.on()
+    level.add(fire)
+    player = Player(10, 46, 50, 50)
+    world = World(player, level)
+    world.step(Controls())
+    assert player.health == Player.MAX_HEALTH - 1  # at simulated time 0
+
+def test_checksum_covers_enemies_and_coins():
+    level = Level(96)
+    level.add(Block(0, 96, 96))
+    level.add_enemy(960, 0, 50, 50, 960, 1920, 3)
+    coin = Coin(480, 0, 32)
+    level.add(coin)
+    world = World(Player(10, 46, 50, 50), level)
+    world.step(Controls())
+    start = world.checksum()
+    level.enemies.x[0] += 1
+    moved = world.checksum()
+    assert moved != start
+    level.remove(coin)
+    assert world.checksum() != moved
+
+def solid_row(level, kind, row, cols=4, size=96):
+    """
+    Puts a row of solid objects of the given kind at tile row `row`, cols tiles wide.
+    """
+    if kind == "block":
+        for col in range(cols):
+            level.add(Block(col * size, row * size, size))
+    elif kind == "tiles":
+        tiles = np.zeros((row + 2, cols), dtype=np.uint8)
+        tiles[row] = TILE_BLOCK
+        level.set_tilemap(TileMap(tiles, size))
+    else:
+        level.add_enemy(0, row * size, cols * size, size, 0, cols * size, 0)
+
+@pytest.mark.parametrize("kind", ["block", "tiles", "enemy"])
+@pytest.mark.parametrize("speed", [400, 2000])
+def test_fast_fall_lands_on_top(kind, speed):
+    level = Level(96)
+    solid_row(level, kind, 3)
+    player = Player(100, 0, 50, 50)
+    player.y_vel = speed
+    World(player, level).step(Controls())
+    assert player.rect.bottom == 3 * 96
+    assert player.y_vel == 0 and player.jump_count == 0
+
+@pytest.mark.parametrize("kind", ["block", "tiles", "enemy"])
+@pytest.mark.parametrize("speed", [400, 2000])
+def test_fast_rise_stops_under_ceiling(kind, speed):
+    level = Level(96)
+    row = 2
+    start = (row + 1) * 96 + speed - 200  # the rise ends well above the ceiling row
+    solid_row(level, kind, row)
+    player = Player(100, start, 50, 50)
+    player.y_vel = -speed
+    World(player, level).step(Controls())
+    assert player.rect.top == (row + 1) * 96
+    assert player.y_vel > 0
+
+def test_jump_hits_low_ceiling():
+    level = Level(96)
+    ceiling = [Block(col * 96, 2 * 96, 96) for col in range(4)]  # one free tile above the floor
+    for col, block in enumerate(ceiling):
+        level.add(Block(col * 96, 4 * 96, 96))
+        level.add(block)
+    player = Player(100, 4 * 96 - Player.SIZE, Player.SIZE, Player.SIZE)
+    world = World(player, level)
+    world.step(Controls())
+    assert player.rect.bottom == 4 * 96
+    world.step(Controls(jump=True))
+    tops = []
+    for _ in range(20):
+        tops.append(player.rect.top)
+        assert not any(collides(player, block) for block in ceiling)
+        world.step(Controls())
+    # Collision is mask-accurate and the sprite's top rows are empty, so the
+    # rect may reach a little into the ceiling tile, but never through it
+    assert 2 * 96 < min(tops) < 3 * 96
+    assert player.rect.bottom == 4 * 96
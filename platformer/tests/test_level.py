@@ -0,0 +1,68 @@
+# test_level.py
+
+import pygame
+from collectibles import Coin, CoinStore
+from enemy import Enemy
+from level import Level
+from level_compiler import compile_level
+from level_loader import load_level_csv, load_level_compiled
+from objects import Block, Fire, Flag
+
+def test_coin_store_collect():
+    coins = CoinStore(96)
+    row = [Coin(x, 100, 24) for x in range(0, 960, 48)]
+    for order, coin in enumerate(row):
+        coins.add(coin, order)
+    assert len(coins) == 20
+
+    picked = coins.collect(pygame.Rect(90, 90, 60, 40))
+    assert picked == [row[2], row[3]]
+    assert row[2] not in coins and row[4] in coins
+    assert coins.collected == 2 and len(coins) == 18
+    assert coins.collect(pygame.Rect(90, 90, 60, 40)) == []
+    assert coins.query(pygame.Rect(0, 0, 960, 200), after=15) == row[16:]
+
+    coins.remove(row[0])
+    assert coins.collect(pygame.Rect(0, 0, 960, 200)) == row[1:2] + row[4:]
+    assert coins.collected == 19 and len(coins) == 0
+
+def test_enemies_join_the_swarm():
+    level = Level(96)
+    level.add(Enemy(400, 0, 40, 40, 300, 600, 2))
+    assert len(level.enemies) == 1 and not level.objects
+    view = level.enemies.view(0)
+    assert view.rect == pygame.Rect(400, 0, 40, 40) and view.x_vel == 2
+    assert not isinstance(view, Enemy) and not hasattr(view, "move")
+
+def test_registries_follow_add_and_remove():
+    level = Level(96)
+    block, fire, flag = Block(0, 0, 96), Fire(100, 0, 16, 32), Flag(200, 0, 48)
+    coin = Coin(300, 0, 24)
+    for obj in (block, fire, flag, coin):
+        level.add(obj)
+    index = level.add_enemy(400, 0, 40, 40, 300, 600, 2)
+
+    assert list(level.solids) == [block]
+    assert list(level.hazards) == list(level.animated) == [fire]
+    assert list(level.goals) == [flag]
+    assert coin in level.coins and coin not in level.objects
+    assert level.is_hazard(fire) and level.is_hazard(level.enemies.view(index))
+    assert level.query(pygame.Rect(0, 0, 1000, 100)) == [block, fire, flag, coin, level.enemies.view(index)]
+
+    level.remove(fire)
+    level.remove(coin)
+    assert not level.hazards and not level.animated
+    assert len(level.coins) == 0
+    assert list(level.objects) == [block, flag]
+
+def test_objects_added_after_loading_sort_last(tmp_path):
+    compiled = compile_level("levels/demo_level.csv", str(tmp_path / "demo.lvl"))
+    for loader, filename in ((load_level_csv, "levels/demo_level.csv"), (load_level_compiled, compiled)):
+        _, level = loader(filename)
+        tilemap = level.tilemap
+        loaded = max(level.grid.order_of(obj) for obj in level.objects)
+        block = Block(0, 0, 96)
+        level.add(block)
+        assert level.grid.order_of(block) >= tilemap.rows * tilemap.cols > loaded
+        # Overlapping the level's objects, so it must come last in collision order
+        assert level.query(level.tilemap.rect)[-1] is block
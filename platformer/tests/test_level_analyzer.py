@@ -0,0 +1,64 @@
+# test_level_analyzer.py
+
+import pytest
+from level_analyzer import analyze_level, check_enemy_cell
+
+def write_rows(path, rows):
+    path.write_text("\n".join(rows) + "\n")
+    return str(path)
+
+def test_jump_after_walking_off_a_ledge(tmp_path):
+    # A ceiling stops every jump from the ledge; the flag platform is only
+    # reached by walking off and jumping in mid-air
+    source = write_rows(tmp_path / "ledge.csv", [
+        ",,,,,,,,",
+        ",,,,,,,,",
+        ",,,,,,,,",
+        ",,,,,,G,,",
+        ",B,B,B,,,,,",
+        ",,P,,,,B,B,",
+        ",B,B,B,,,,,",
+        ",,,,,,,,",
+    ])
+    report = analyze_level(source)
+    assert report["goal_reachable"]
+    assert report["errors"] == [] and report["warnings"] == []
+
+def test_unreachable_goal_is_a_warning(tmp_path):
+    source = write_rows(tmp_path / "sky.csv", [
+        ",,,,G,,,",
+        ",,,,,,,",
+        ",,,,,,,",
+        ",,,,,,,",
+        ",,,,,,,",
+        ",,,,,,,",
+        ",,P,,,,,",
+        "B,B,B,B,B,B,B,B",
+    ])
+    report = analyze_level(source)
+    assert not report["goal_reachable"]
+    assert report["errors"] == []
+    assert report["warnings"] == ["goal flag (row 0, col 4) cannot be reached"]
+
+@pytest.mark.parametrize("cell, error", [
+    ("100E300E2E40", "needs leftErightEspeedEwidthEheight"),
+    ("E", "needs leftErightEspeedEwidthEheight"),
+    ("100E300E2E40Ex", "not an integer"),
+    ("100E3.5E2E40E40", "not an integer"),
+])
+def test_malformed_enemy_cells_are_errors(cell, error):
+    errors, warnings = [], []
+    check_enemy_cell(cell, errors, warnings, "row 1, col 2")
+    assert len(errors) == 1 and error in errors[0] and errors[0].startswith("row 1, col 2: ")
+    assert warnings == []
+
+def test_enemy_cell_extra_fields_are_a_warning():
+    errors, warnings = [], []
+    check_enemy_cell("100E300E2E40E40E9", errors, warnings, "row 1, col 2")
+    assert errors == []
+    assert len(warnings) == 1 and "extra fields" in warnings[0]
+
+def test_malformed_enemy_cell_in_report(tmp_path):
+    source = write_rows(tmp_path / "enemy.csv", [",,,,", ",P,,1E2,G", "B,B,B,B,B"])
+    report = analyze_level(source)
+    assert report["errors"] == ["row 1, col 3: enemy cell '1E2' needs leftErightEspeedEwidthEheight"]
@@ -0,0 +1,61 @@
+# test_level_compiler.py
+
+import csv
+import pytest
+from level_compiler import (compile_level, ensure_compiled, CompiledLevel, CELL_KINDS, TILE_EMPTY, TILE_BLOCK,
+                            TILE_ENEMY, TILE_PLAYER, ENTITY_FIELDS)
+from levelgen import generate_level, write_level_csv
+from level_loader import load_level, load_level_csv
+
+def test_compile_round_trip(tmp_path):
+    source = str(tmp_path / "level.csv")
+    grid = generate_level(60, 10, "dense", 4)
+    grid[3] = grid[3][:20]  # ragged row: the missing cells are empty
+    write_level_csv(source, grid)
+    level = CompiledLevel(compile_level(source, str(tmp_path / "level.lvl")))
+    try:
+        assert (level.rows, level.cols) == (10, 60)
+        entities = []
+        for row, cells in enumerate(grid):
+            cells = cells + [""] * (level.cols - len(cells))
+            for col, cell in enumerate(cells):
+                if cell == "P":
+                    assert level.player == (col, row)
+                if "E" in cell:
+                    kind = TILE_ENEMY
+                    entities.append([kind, col, row] + [int(value) for value in cell.split("E")])
+                else:
+                    kind = CELL_KINDS.get(cell, TILE_EMPTY)
+                    if kind not in (TILE_EMPTY, TILE_BLOCK, TILE_PLAYER):
+                        entities.append([kind, col, row] + [0] * (ENTITY_FIELDS - 3))
+                assert level.tile(col, row) == kind
+        assert level.entities.tolist() == entities
+        assert level.tile(-1, 0) == level.tile(0, level.rows) == TILE_EMPTY
+
+        found = level.entities_in(10, 2, 30, 6).tolist()
+        assert found == [entity for entity in entities if 10 <= entity[1] < 30 and 2 <= entity[2] < 6]
+        assert sorted(level.block_cells()) == sorted(
+            (col, row) for row, cells in enumerate(grid) for col, cell in enumerate(cells) if cell == "B")
+    finally:
+        level.close()
+
+def test_ensure_compiled_tracks_source(tmp_path):
+    source = tmp_path / "level.csv"
+    source.write_text("B,B\nP,C\n")
+    first = ensure_compiled(str(source))
+    assert ensure_compiled(str(source)) == first
+    with open(source, "w", newline="") as f:
+        csv.writer(f).writerows([["B", "B", "B"], ["P", "", "G"]])
+    level = CompiledLevel(ensure_compiled(str(source)))
+    try:
+        assert level.cols == 3
+    finally:
+        level.close()
+
+@pytest.mark.parametrize("loader", [load_level, load_level_csv])
+def test_malformed_enemy_cell_is_a_level_error(tmp_path, loader):
+    source = str(tmp_path / "enemy.csv")
+    with open(source, "w", newline="") as f:
+        csv.writer(f).writerows([["", "P", "", "100E300Ex"], ["B", "B", "B", "B"]])
+    with pytest.raises(ValueError, match=r"enemy\.csv: row 0, col 3: enemy cell '100E300Ex' needs"):
+        loader(source)
@@ -0,0 +1,63 @@
+# test_replay.py
+
+import pytest
+from game import World, Controls
+from replay import (Replay, ReplayPlayer, encode_controls, decode_controls, play_headless,
+                    LEFT, RIGHT, JUMP)
+
+LEVEL = "levels/demo_level.csv"
+
+def test_controls_round_trip():
+    for bits in range(8):
+        controls = decode_controls(bits)
+        assert encode_controls(controls) == bits
+    assert decode_controls(LEFT | JUMP).left and decode_controls(LEFT | JUMP).jump
+    assert not decode_controls(RIGHT).left
+
+def record(level_file, ticks, stream=False):
+    world = World.load(level_file, stream=stream)
+    replay = Replay(level_file, world.fps, stream=stream)
+    for tick in range(ticks):
+        controls = Controls(right=True, jump=tick % 45 == 0)
+        world.step(controls)
+        replay.record(controls, world)
+    world.level.close()
+    return replay
+
+def test_save_load_round_trip(tmp_path):
+    replay = record(LEVEL, 120, stream=True)
+    filename = tmp_path / "run.replay"
+    replay.save(filename)
+    loaded = Replay.load(filename)
+    assert loaded.level_file == LEVEL
+    assert loaded.fps == replay.fps
+    assert loaded.stream
+    assert loaded.level_sha1 == replay.level_sha1
+    assert loaded.inputs == replay.inputs
+    assert loaded.checksums == replay.checksums
+
+def test_truncated_file(tmp_path):
+    replay = record(LEVEL, 10)
+    filename = tmp_path / "run.replay"
+    replay.save(filename)
+    data = filename.read_bytes()
+    filename.write_bytes(data[:-4])
+    with pytest.raises(ValueError):
+        Replay.load(filename)
+
+@pytest.mark.parametrize("level_file", [None, LEVEL])
+def test_playback_matches(level_file):
+    player, _, _ = play_headless(record(level_file, 300), level_file)
+    assert player.diverged_at is None
+    assert player.tick == 300
+
+def test_playback_detects_divergence():
+    replay = record(LEVEL, 100)
+    replay.checksums[50] ^= 1
+    player = ReplayPlayer(replay)
+    world = World.load(LEVEL)
+    while not player.finished:
+        world.step(player.next_controls())
+        player.verify(world)
+    world.level.close()
+    assert player.diverged_at == 50
@@ -0,0 +1,51 @@
+# test_spatial.py
+
+import pygame
+from spatial import SpatialHash
+
+class Box:
+    mask = None
+
+    def __init__(self, x, y, width=10, height=10):
+        self.rect = pygame.Rect(x, y, width, height)
+
+def test_query_in_insertion_order():
+    grid = SpatialHash(32)
+    # Inserted right to left, spanning several cells
+    boxes = [Box(x, 5, 40) for x in range(300, -1, -50)]
+    for box in boxes:
+        grid.insert(box)
+    assert grid.query(pygame.Rect(0, 0, 400, 20)) == boxes
+    assert grid.query(pygame.Rect(100, 0, 60, 20)) == [box for box in boxes if 60 < box.rect.x < 160]
+    assert grid.query(pygame.Rect(0, 0, 400, 20), after=boxes[2]) == boxes[3:]
+    assert grid.query(pygame.Rect(0, 100, 400, 20)) == []
+
+def test_reserved_and_fixed_orders():
+    grid = SpatialHash(32)
+    late, early = Box(0, 0), Box(20, 0)
+    grid.insert(late, order=10)
+    grid.insert(early, order=3)
+    assert grid.query(pygame.Rect(0, 0, 64, 64)) == [early, late]
+    outside = Box(5, 5)
+    outside.order = grid.reserve()
+    assert grid.order_of(outside) == 0
+    assert grid.merge([late], [outside, early], [late]) == [outside, early, late]
+
+def test_move_and_remove():
+    grid = SpatialHash(32)
+    first, second = Box(0, 0), Box(200, 0)
+    grid.insert(first)
+    grid.insert(second)
+    grid.insert(first)  # already indexed: ignored
+    assert len(grid) == 2
+
+    first.rect.x = 210
+    grid.move(first)
+    assert grid.query(pygame.Rect(0, 0, 50, 50)) == []
+    assert grid.query(pygame.Rect(190, 0, 50, 50)) == [first, second]
+
+    grid.remove(second)
+    grid.remove(second)  # unknown: ignored
+    assert second not in grid
+    assert grid.query(pygame.Rect(190, 0, 50, 50)) == [first]
+    assert list(grid) == [first]
@@ -0,0 +1,62 @@
+# test_sprite_cache.py
+
+import os
+import pygame
+from assets import ASSETS
+from sprite_cache import SpriteCache
+
+def make_frames():
+    frames = {}
+    for name, color in (("idle", (255, 0, 0, 255)), ("run", (0, 0, 255, 128))):
+        surfaces = []
+        for width in (8, 13):
+            surface = pygame.Surface((width, 6), pygame.SRCALPHA)
+            pygame.draw.rect(surface, color, (1, 1, width - 3, 3))
+            surfaces.append(surface.convert_alpha())
+        frames[name] = surfaces
+    return frames
+
+def pixels(frames):
+    return {name: [(surface.get_size(), pygame.image.tobytes(surface, "RGBA")) for surface in surfaces]
+            for name, surfaces in frames.items()}
+
+def test_disk_round_trip(tmp_path):
+    source = tmp_path / "sheet.png"
+    source.write_bytes(b"sheet")
+    cache = SpriteCache(str(tmp_path / "cache"), enabled=True)
+    built = []
+    builder = lambda: built.append(1) or make_frames()
+    key = ("sheet", 32, 32, True)
+
+    first = cache.get(key, [str(source)], builder)
+    second = SpriteCache(cache.directory, enabled=True)
+    loaded = second.get(key, [str(source)], builder)
+    assert len(built) == 1 and second.hits == 1
+    assert pixels(loaded) == pixels(first)
+    for surfaces, originals in zip(loaded.values(), first.values()):
+        for surface, original in zip(surfaces, originals):
+            mask, expected = ASSETS.mask(surface), ASSETS.mask(original)
+            assert mask.count() == expected.count() > 0
+            assert mask.overlap_area(expected, (0, 0)) == expected.count()
+
+    # Prefetched entries convert to the same frames
+    third = SpriteCache(cache.directory, enabled=True)
+    assert third.prefetch(key, [str(source)])
+    assert pixels(third.get(key, [str(source)], builder)) == pixels(first)
+    assert len(built) == 1
+
+def test_stale_entries_rebuild(tmp_path):
+    source = tmp_path / "sheet.png"
+    source.write_bytes(b"sheet")
+    cache = SpriteCache(str(tmp_path / "cache"), enabled=True)
+    built = []
+    builder = lambda: built.append(1) or make_frames()
+    cache.get("key", [str(source)], builder)
+
+    source.write_bytes(b"changed sheet")
+    cache.get("key", [str(source)], builder)
+    cache.get("other key", [str(source)], builder)
+    assert len(built) == 3 and cache.misses == 3
+
+    cache.clear()
+    assert not [name for name in os.listdir(cache.directory) if name.endswith(".sprites")]
@@ -0,0 +1,60 @@
+# test_streaming.py
+
+import pygame
+import pytest
+from config import WIDTH, HEIGHT
+from game import World
+from levelgen import generate_level, write_level_csv
+from objects import Fire
+from player import Player
+from scripted import checksums
+from streaming import StreamingLevel
+
+def small_regions(filename, **kwargs):
+    """
+    Streams with small regions and a tiny memory budget, so regions are
+    attached, evicted and attached again all the time.
+    """
+    level = StreamingLevel(filename, region_tiles=4, memory_budget=4096, **kwargs)
+    player = Player(*level.player_start, 50, 50)
+    level.focus(player.rect)
+    return World(player, level)
+
+@pytest.mark.parametrize("cols, density, seed", [(400, "normal", 2), (800, "dense", 3), (800, "normal", 4)])
+def test_stream_matches_full_load(tmp_path, cols, density, seed):
+    filename = str(tmp_path / "level.csv")
+    write_level_csv(filename, generate_level(cols, 24, density, seed))
+    ticks = 1200
+    full = checksums(World.from_csv(filename), ticks)
+    assert checksums(World.from_csv(filename, stream=True), ticks) == full
+    assert checksums(World.from_csv(filename, stream=True), ticks, render=True) == full
+    assert checksums(small_regions(filename), ticks) == full
+
+def test_render_does_not_attach(tmp_path):
+    filename = str(tmp_path / "level.csv")
+    write_level_csv(filename, generate_level(200, 12, "dense", 1))
+    world = small_regions(filename, margin=(0, 0))
+    level = world.level
+    regions = dict(level.regions)
+    level.visible(pygame.Rect(level.cols * level.block_size - WIDTH, 0, WIDTH, HEIGHT))
+    assert level.regions == regions
+    level.close()
+
+def test_all_enemies_up_front(tmp_path):
+    filename = str(tmp_path / "level.csv")
+    write_level_csv(filename, generate_level(300, 12, "dense", 6))
+    full = World.from_csv(filename)
+    streamed = small_regions(filename)
+    assert len(streamed.level.enemies) == len(full.level.enemies) > 0
+    full.level.close()
+    streamed.level.close()
+
+def test_fire_skip_to():
+    loop = Fire(0, 0, 16, 32)
+    loop.on()
+    for loops in range(40):
+        skipped = Fire(0, 0, 16, 32)
+        skipped.on()
+        skipped.skip_to(loops)
+        assert (skipped.image, skipped.animation_count) == (loop.image, loop.animation_count)
+        loop.loop()
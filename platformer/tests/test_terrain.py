@@ -0,0 +1,111 @@
+# test_terrain.py
+
+import random
+import numpy as np
+import pygame
+import pytest
+from game import World
+from objects import Block, Fire
+from level_compiler import TILE_BLOCK
+from level_loader import load_level_csv
+from levelgen import generate_level, write_level_csv
+from scripted import checksums
+from terrain import TileMap, merge_runs
+
+def test_merge_runs_rows():
+    # A 2x2 square and a pillar: no run may span rows
+    cells = {(0, 0), (1, 0), (0, 1), (1, 1), (4, 0), (4, 1), (4, 2), (6, 2)}
+    assert merge_runs(cells) == [(0, 0, 2, 1), (4, 0, 1, 1), (0, 1, 2, 1), (4, 1, 1, 1),
+                                 (4, 2, 1, 1), (6, 2, 1, 1)]
+
+def test_merge_runs_covers_cells():
+    rng = random.Random(1)
+    cells = {(rng.randrange(40), rng.randrange(12)) for _ in range(250)}
+    runs = merge_runs(cells)
+    covered = [(col + index, row) for col, row, cols, rows in runs for index in range(cols)]
+    assert all(rows == 1 for _, _, _, rows in runs)
+    assert sorted(covered) == sorted(cells) and len(covered) == len(cells)
+    assert runs == sorted(runs, key=lambda run: (run[1], run[0]))
+
+def random_tiles(seed, rows=20, cols=50):
+    rng = np.random.default_rng(seed)
+    tiles = np.where(rng.random((rows, cols)) < 0.35, TILE_BLOCK, 0).astype(np.uint8)
+    tiles[4:10, 7] = TILE_BLOCK     # pillar
+    tiles[12:14, 20:30] = TILE_BLOCK  # two-row ceiling slab
+    return tiles
+
+@pytest.mark.parametrize("chunk_tiles", [4, 16])
+def test_query_matches_per_tile_blocks(chunk_tiles):
+    """
+    The merged solids a query returns are exactly the runs holding the
+    overlapped tiles, in the level order of those tiles, with the tiles'
+    top and bottom edges. Objects sit in empty cells, so `after` is the
+    order of one of those (or -1).
+    """
+    size = 96
+    tiles = random_tiles(2)
+    tilemap = TileMap(tiles, size, chunk_tiles)
+    empty = np.flatnonzero(tiles.ravel() != TILE_BLOCK).tolist()
+    rng = random.Random(3)
+    for _ in range(300):
+        rect = pygame.Rect(rng.randrange(-100, tilemap.rect.width), rng.randrange(-100, tilemap.rect.height),
+                           rng.randrange(1, 400), rng.randrange(1, 400))
+        after = rng.choice([-1, rng.choice(empty)])
+        found = tilemap.query(rect, after)
+
+        expected = []
+        for row, col in zip(*np.nonzero(tiles == TILE_BLOCK)):
+            block = pygame.Rect(col * size, row * size, size, size)
+            if row * tilemap.cols + col <= after or not rect.colliderect(block):
+                continue
+            solid = next(solid for solid in found if solid.rect.contains(block))
+            assert (solid.rect.top, solid.rect.bottom) == (block.top, block.bottom)
+            if solid not in expected:
+                expected.append(solid)
+        assert found == expected
+
+def test_draw_matches_per_tile_blits():
+    size = 96
+    tiles = random_tiles(4, 30, 60)
+    tilemap = TileMap(tiles, size)
+    window = pygame.Surface((1024, 768))
+    expected = pygame.Surface((1024, 768))
+    rng = random.Random(6)
+    for _ in range(40):
+        offset_x, offset_y = rng.randrange(-200, tilemap.rect.width), rng.randrange(-200, tilemap.rect.height)
+        window.fill((30, 60, 90))
+        tilemap.draw(window, offset_x, offset_y)
+        expected.fill((30, 60, 90))
+        for row, col in zip(*np.nonzero(tiles == TILE_BLOCK)):
+            expected.blit(tilemap.tile_image, (int(col) * size - offset_x, int(row) * size - offset_y))
+        assert pygame.image.tobytes(window, "RGB") == pygame.image.tobytes(expected, "RGB")
+        assert len(tilemap._surfaces) <= TileMap.SURFACE_CACHE
+
+def per_tile_reference(filename):
+    """
+    Loads a level, then replaces its tile map by one Block per solid tile
+    with the level order of its grid position.
+    """
+    player, level = load_level_csv(filename)
+    tilemap = level.tilemap
+    level.set_tilemap(None)
+    size = tilemap.tile_size
+    for row, col in zip(*np.nonzero(tilemap.tiles == TILE_BLOCK)):
+        level.add(Block(int(col) * size, int(row) * size, size), int(row) * tilemap.cols + int(col))
+    return player, level
+
+def fires_on(player, level):
+    """
+    World with every fire of the level switched on, like World.from_csv.
+    """
+    for hazard in level.hazards:
+        if isinstance(hazard, Fire):
+            hazard.on()
+    return World(player, level)
+
+@pytest.mark.parametrize("seed", [2, 5])
+def test_simulation_matches_per_tile_blocks(tmp_path, seed):
+    filename = str(tmp_path / "dense.csv")
+    write_level_csv(filename, generate_level(160, 14, "dense", seed))
+    expected = checksums(fires_on(*per_tile_reference(filename)), 1500)
+    assert checksums(fires_on(*load_level_csv(filename)), 1500) == expected
@@ -0,0 +1,41 @@
+# test_vector_env.py
+
+import numpy as np
+from vector_env import VectorEnv, random_bot, OBS_FIELDS, TICK
+
+LEVELS = ["levels/demo_level.csv", "levels/test_level.csv"]
+
+def bot_actions(num_envs, ticks):
+    policy = random_bot(num_envs, seed=1, jump_chance=0.2, turn_chance=0.05)
+    return np.array([policy(None) for _ in range(ticks)])
+
+def run(env, actions, batch):
+    results = [env.step_many(actions[first:first + batch]) for first in range(0, len(actions), batch)]
+    env.close()
+    return [np.concatenate(arrays) for arrays in zip(*results)]
+
+def test_levels_load_on_reset():
+    env = VectorEnv(LEVELS, 2, jobs=1)
+    assert all(level_env.world is None for level_env in env._envs)
+    observations = env.reset()
+    assert observations.shape == (2, len(OBS_FIELDS)) and not observations[:, TICK].any()
+    env.close()
+
+def test_step_many_matches_single_steps():
+    actions = bot_actions(4, 90)
+    env = VectorEnv(LEVELS, 4, jobs=1, max_ticks=40)
+    env.reset()
+    steps = [env.step(row) for row in actions]
+    env.close()
+    batched = run(VectorEnv(LEVELS, 4, jobs=1, max_ticks=40), actions, 32)
+    for single, many in zip(zip(*steps), batched):
+        assert np.array_equal(np.stack(single), many)
+
+def test_workers_match_in_process():
+    actions = bot_actions(4, 60)
+    local = run(VectorEnv(LEVELS, 4, jobs=1, max_ticks=40), actions, 25)
+    env = VectorEnv(LEVELS, 4, jobs=2, max_ticks=40)
+    remote = run(env, actions, 25)
+    assert env.steps == actions.size
+    for expected, result in zip(local, remote):
+        assert np.array_equal(expected, result)
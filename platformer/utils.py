@@ -3,6 +3,10 @@
 import pygame
 from os import listdir
 from os.path import isfile, join
+from assets import ASSETS
+from sprite_cache import SPRITE_CACHE
+
+TERRAIN_PATH = join("assets", "Terrain", "Terrain.png")
 
 def flip(sprites):
     """
@@ -12,6 +16,35 @@ def flip(sprites):
     """
     return [pygame.transform.flip(sprite, True, False) for sprite in sprites]
 
+_filled_masks = {}  # size -> filled Mask, shared by collide_solid_rect
+
+def collide_solid_rect(rect, sprite, dx=0, dy=0):
+    """
+    Pixel-accurate test of a masked sprite against a fully solid rectangle.
+    Only the sprite's mask is sampled, so the solid needs no mask of its own.
+    :param rect: pygame.Rect of the solid shape
+    :param sprite: Sprite with rect and mask (e.g. the Player)
+    :param dx: Test as if the sprite were moved right by dx
+    :param dy: Test as if the sprite were moved down by dy
+    :return: Overlap point or None, like pygame.sprite.collide_mask
+    """
+    sprite_rect = sprite.rect.move(dx, dy)
+    clip = rect.clip(sprite_rect)
+    if not clip:
+        return None
+    filled = _filled_masks.get(clip.size)
+    if filled is None:
+        filled = _filled_masks[clip.size] = pygame.mask.Mask(clip.size, fill=True)
+    return sprite.mask.overlap(filled, (clip.x - sprite_rect.x, clip.y - sprite_rect.y))
+
+def get_mask(surface):
+    """
+    Returns the precomputed collision mask for a sprite frame.
+    :param surface: Surface returned by load_sprite_sheets or get_block
+    :return: pygame.mask.Mask of the surface
+    """
+    return ASSETS.mask(surface)
+
 def load_sprite_sheets(dir1, dir2, width, height, direction=False):
     """
     Loads and splits a spritesheet into individual sprites.
@@ -21,14 +54,57 @@ def load_sprite_sheets(dir1, dir2, width, height, direction=False):
     :param width: Width of each sprite frame
     :param height: Height of each sprite frame
     :param direction: If True, generate left/right animations
-    :return: Dictionary of lists of sprites
+    :return: Dictionary of lists of sprites (shared, do not modify)
+    """
+    key = ("sprite_sheets", dir1, dir2, width, height, direction)
+    return ASSETS.get(key, lambda: _load_sprite_sheets(dir1, dir2, width, height, direction))
+
+def _sheet_entry(dir1, dir2, width, height, direction):
+    """
+    Returns the SPRITE_CACHE key and source files of a sprite sheet folder.
     """
     path = join("assets", dir1, dir2)
     images = [f for f in listdir(path) if isfile(join(path, f))]
+    key = ("sprite_sheets", path, tuple(images), width, height, direction)
+    return key, [join(path, image) for image in images]
+
+def _load_sprite_sheets(dir1, dir2, width, height, direction):
+    """
+    Implementation of load_sprite_sheets behind the in-memory cache.
+    Processed frames come from the on-disk SPRITE_CACHE when it is current.
+    """
+    key, sources = _sheet_entry(dir1, dir2, width, height, direction)
+    path, images = key[1], key[2]
+    return SPRITE_CACHE.get(key, sources, lambda: _slice_sprite_sheets(path, images, width, height, direction))
+
+def _prefetch(asset_key, key, sources):
+    """
+    Worker-thread half of an asset loader: reads its SPRITE_CACHE entry, or
+    decodes its source images if the entry has to be rebuilt, without
+    converting anything. Skipped if the asset is already in memory.
+    """
+    if asset_key in ASSETS:
+        return
+    if not SPRITE_CACHE.prefetch(key, sources):
+        for source in sources:
+            ASSETS.decode(source)
+
+def prefetch_sprite_sheets(dir1, dir2, width, height, direction=False):
+    """
+    Reads the files behind load_sprite_sheets() with the same arguments on
+    a worker thread; the load itself then only converts the frames.
+    """
+    key, sources = _sheet_entry(dir1, dir2, width, height, direction)
+    _prefetch(("sprite_sheets", dir1, dir2, width, height, direction), key, sources)
+
+def _slice_sprite_sheets(path, images, width, height, direction):
+    """
+    Decodes, slices, scales and flips the sprite sheets (no caching).
+    """
     all_sprites = {}
 
     for image in images:
-        sprite_sheet = pygame.image.load(join(path, image)).convert_alpha()
+        sprite_sheet = ASSETS.image(join(path, image))
 
         sprites = []
         for i in range(sprite_sheet.get_width() // width):
@@ -43,18 +119,55 @@ def load_sprite_sheets(dir1, dir2, width, height, direction=False):
         else:
             all_sprites[image.replace(".png", "")] = sprites
 
+    # Build every frame's mask now so animations only swap surface and mask
+    for sprites in all_sprites.values():
+        for sprite in sprites:
+            ASSETS.mask(sprite)
+
     return all_sprites
 
 def get_block(size):
     """
     Loads and returns a terrain block sprite of a given size.
     :param size: Size of the block (square)
-    :return: Scaled block surface
-    """
-    from os.path import join
-    path = join("assets", "Terrain", "Terrain.png")
-    image = pygame.image.load(path).convert_alpha()
-    surface = pygame.Surface((size, size), pygame.SRCALPHA, 32)
-    rect = pygame.Rect(96, 128, size, size)
-    surface.blit(image, (0, 0), rect)
-    return pygame.transform.scale2x(surface)
+    :return: Scaled block surface (shared, do not modify)
+    """
+    return ASSETS.get(("block", size), lambda: _load_block(size))
+
+def prefetch_block(size):
+    """
+    Reads the files behind get_block() on a worker thread.
+    """
+    _prefetch(("block", size), ("block", TERRAIN_PATH, size), [TERRAIN_PATH])
+
+def _load_block(size):
+    """
+    Implementation of get_block behind the in-memory cache.
+    """
+    path = TERRAIN_PATH
+
+    def build():
+        image = ASSETS.image(path)
+        surface = pygame.Surface((size, size), pygame.SRCALPHA, 32)
+        rect = pygame.Rect(96, 128, size, size)
+        surface.blit(image, (0, 0), rect)
+        return {"block": [pygame.transform.scale2x(surface)]}
+    return SPRITE_CACHE.get(("block", path, size), [path], build)["block"][0]
+
+def get_scaled_image(path, size):
+    """
+    Loads an image and scales it to a square of the given size.
+    :param path: Path of the image file
+    :param size: Target width/height in pixels
+    :return: Scaled surface (shared, do not modify)
+    """
+    def build():
+        return {"scaled": [pygame.transform.scale(ASSETS.image(path), (size, size))]}
+    return ASSETS.get(("scaled", path, size),
+                      lambda: SPRITE_CACHE.get(("scaled", path, size), [path], build)["scaled"][0])
+
+def prefetch_scaled_image(path, size):
+    """
+    Reads the files behind get_scaled_image() on a worker thread.
+    """
+    _prefetch(("scaled", path, size), ("scaled", path, size), [path])
@@ -0,0 +1,355 @@
+# vector_env.py
+
+import os
+import sys
+import time
+import argparse
+import traceback
+import multiprocessing
+import numpy as np
+from headless import init_headless
+from level_loader import find_levels
+from config import SIM_RATE
+from game import World
+from replay import LEFT, RIGHT, JUMP, decode_controls
+
+# Observation columns (int32, one row per environment)
+X = 0
+Y = 1
+HEALTH = 2
+SCORE = 3
+TICK = 4
+OBS_FIELDS = ("x", "y", "health", "score", "tick")
+
+# Reward per coin collected, per health point lost and for reaching the flag
+COIN_REWARD = 1.0
+DAMAGE_REWARD = -0.5
+WIN_REWARD = 10.0
+
+# Controls for every combination of the replay input bits (see replay.py)
+ACTION_CONTROLS = [decode_controls(bits) for bits in range(8)]
+
+class LevelEnv:
+    """
+    One headless game instance driven one tick at a time.
+    An action is a byte of replay input bits (LEFT | RIGHT | JUMP). The
+    level is loaded by reset(), or by the first step. When an episode ends
+    (flag reached, player dead or max_ticks) the step that ended it returns
+    done and the final observation; the next step loads the level again and
+    plays the action on the new episode.
+    """
+    def __init__(self, level_file, fps=SIM_RATE, max_ticks=None):
+        """
+        :param level_file: CSV level (None = built-in level)
+        :param fps: Simulation ticks per second
+        :param max_ticks: Optional episode length limit in ticks
+        """
+        self.level_file = level_file
+        self.fps = fps
+        self.max_ticks = max_ticks
+        self.world = None
+        self.finished = True
+
+    def reset(self):
+        """
+        Starts a new episode and returns its first observation.
+        """
+        if self.world is not None:
+            self.world.level.close()
+        self.world = World.load(self.level_file, self.fps)
+        self.finished = False
+        return self.observe()
+
+    def observe(self):
+        """
+        Observation row of the current state, see OBS_FIELDS.
+        """
+        world = self.world
+        player = world.player
+        return (player.rect.x, player.rect.y, player.health, world.score, world.ticks)
+
+    def step(self, action):
+        """
+        Advances the episode by one tick.
+        :param action: Replay input bits held/pressed this tick
+        :return: Tuple (observation, reward, done, episode summary dict or None)
+        """
+        if self.finished:
+            self.reset()
+        world = self.world
+        player = world.player
+        health, score = player.health, world.score
+        world.step(ACTION_CONTROLS[action & 7])
+        reward = (COIN_REWARD * (world.score - score) + DAMAGE_REWARD * (health - player.health)
+                  + (WIN_REWARD if world.won else 0.0))
+        timeout = self.max_ticks is not None and world.ticks >= self.max_ticks
+        self.finished = world.done or timeout
+        episode = None
+        if self.finished:
+            episode = {"level": self.level_file, "ticks": world.ticks, "score": world.score,
+                       "health": player.health, "won": world.won, "dead": player.health <= 0,
+                       "timeout": timeout and not world.done}
+        return self.observe(), reward, self.finished, episode
+
+    def close(self):
+        if self.world is not None:
+            self.world.level.close()
+
+def step_envs(envs, actions):
+    """
+    Steps a group of environments through several ticks.
+    :param actions: Array (ticks x len(envs)) of replay input bytes
+    :return: Tuple (observations (ticks x len(envs) x len(OBS_FIELDS)),
+             rewards (ticks x len(envs)), dones (ticks x len(envs)),
+             finished episode summaries)
+    """
+    ticks = len(actions)
+    observations = np.empty((ticks, len(envs), len(OBS_FIELDS)), dtype=np.int32)
+    rewards = np.empty((ticks, len(envs)), dtype=np.float32)
+    dones = np.empty((ticks, len(envs)), dtype=bool)
+    episodes = []
+    for tick, row in enumerate(actions.tolist()):
+        for index, (env, action) in enumerate(zip(envs, row)):
+            observations[tick, index], rewards[tick, index], dones[tick, index], episode = env.step(action)
+            if episode is not None:
+                episodes.append(episode)
+    return observations, rewards, dones, episodes
+
+def reset_envs(envs):
+    """
+    Resets a group of environments and returns their observations.
+    """
+    return np.array([env.reset() for env in envs], dtype=np.int32).reshape(len(envs), len(OBS_FIELDS))
+
+def _worker(conn, level_files, fps, max_ticks):
+    """
+    Worker process: owns the environments of one slice and serves
+    ("step", actions (ticks x envs)), ("reset", None) and ("close", None)
+    requests.
+    Replies are (True, result), or (False, traceback) if a request failed.
+    """
+    envs = []
+    try:
+        init_headless()
+        envs = [LevelEnv(level_file, fps, max_ticks) for level_file in level_files]
+        conn.send((True, None))
+        while True:
+            command, data = conn.recv()
+            if command == "close":
+                break
+            try:
+                result = step_envs(envs, data) if command == "step" else reset_envs(envs)
+            except Exception:
+                conn.send((False, traceback.format_exc()))
+            else:
+                conn.send((True, result))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    except Exception:
+        conn.send((False, traceback.format_exc()))
+    finally:
+        for env in envs:
+            env.close()
+        conn.close()
+
+class VectorEnv:
+    """
+    Many independent headless game instances stepped in lockstep.
+    The environments are split into contiguous slices, one per worker
+    process, which keep their Worlds for the whole run; step() and
+    step_many() send every worker its slice of the actions and gather the
+    results in environment order. Each call costs one pipe round trip per
+    worker, so step_many() with a few dozen ticks at a time is what makes
+    the workers pay off. Levels are loaded by reset(); episodes restart on
+    their own (see LevelEnv), and the summaries of finished ones are
+    collected in `episodes`.
+    """
+    def __init__(self, level_files, num_envs=None, jobs=None, fps=SIM_RATE, max_ticks=None):
+        """
+        :param level_files: Levels to play; environment i plays level_files[i % len(level_files)]
+        :param num_envs: Number of environments (None = one per level)
+        :param jobs: Worker processes (None = one per CPU, 1 = in this process)
+        :param fps: Simulation ticks per second
+        :param max_ticks: Optional episode length limit in ticks
+        """
+        level_files = list(level_files)
+        self.num_envs = num_envs or len(level_files)
+        self.level_files = [level_files[index % len(level_files)] for index in range(self.num_envs)]
+        self.jobs = max(1, min(jobs or os.cpu_count() or 1, self.num_envs))
+        self.episodes = []
+        self.steps = 0      # environment steps, summed over all environments
+        self.elapsed = 0.0  # seconds spent in step()
+        self._envs = None
+        self._workers = []  # (process, connection, slice)
+        if self.jobs == 1:
+            init_headless()
+            self._envs = [LevelEnv(level_file, fps, max_ticks) for level_file in self.level_files]
+            return
+
+        # Spawned, not forked: the parent may already have SDL running
+        context = multiprocessing.get_context("spawn")
+        bounds = np.linspace(0, self.num_envs, self.jobs + 1).astype(int).tolist()
+        for start, stop in zip(bounds, bounds[1:]):
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, daemon=True,
+                                      args=(child, self.level_files[start:stop], fps, max_ticks))
+            process.start()
+            child.close()
+            self._workers.append((process, parent, slice(start, stop)))
+        try:
+            self._gather()
+        except Exception:
+            self.close()
+            raise
+
+    def _gather(self):
+        """
+        Receives one reply from every worker, then raises the first error
+        (after reading all replies, so the workers stay in step).
+        """
+        results = []
+        error = None
+        for process, conn, _ in self._workers:
+            try:
+                ok, result = conn.recv()
+            except EOFError:
+                ok, result = False, "exited"
+            if not ok and error is None:
+                error = RuntimeError(f"environment worker {process.pid} failed:\n{result}")
+            results.append(result)
+        if error is not None:
+            raise error
+        return results
+
+    def reset(self):
+        """
+        Starts a new episode in every environment.
+        :return: Observations, int32 array (num_envs x len(OBS_FIELDS))
+        """
+        if self._envs is not None:
+            return reset_envs(self._envs)
+        for _, conn, _ in self._workers:
+            conn.send(("reset", None))
+        return np.concatenate(self._gather())
+
+    def step(self, actions):
+        """
+        Advances every environment by one tick.
+        :param actions: num_envs replay input bytes (LEFT | RIGHT | JUMP)
+        :return: Tuple (observations int32 (num_envs x len(OBS_FIELDS)),
+                 rewards float32 (num_envs), dones bool (num_envs))
+        """
+        actions = np.asarray(actions, dtype=np.uint8)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f"expected {self.num_envs} actions, got shape {actions.shape}")
+        observations, rewards, dones = self.step_many(actions[np.newaxis])
+        return observations[0], rewards[0], dones[0]
+
+    def step_many(self, actions):
+        """
+        Advances every environment by several ticks with one round trip to
+        each worker. The actions are fixed up front, so a policy can only
+        see the observations of the batch once it has been played.
+        :param actions: Replay input bytes, array (ticks x num_envs)
+        :return: Tuple (observations int32 (ticks x num_envs x len(OBS_FIELDS)),
+                 rewards float32 (ticks x num_envs), dones bool (ticks x num_envs))
+        """
+        actions = np.asarray(actions, dtype=np.uint8)
+        if actions.ndim != 2 or actions.shape[1] != self.num_envs:
+            raise ValueError(f"expected ticks x {self.num_envs} actions, got shape {actions.shape}")
+        start = time.perf_counter()
+        if self._envs is not None:
+            observations, rewards, dones, episodes = step_envs(self._envs, actions)
+        else:
+            for _, conn, part in self._workers:
+                conn.send(("step", actions[:, part]))
+            results = self._gather()
+            observations = np.concatenate([result[0] for result in results], axis=1)
+            rewards = np.concatenate([result[1] for result in results], axis=1)
+            dones = np.concatenate([result[2] for result in results], axis=1)
+            episodes = [episode for result in results for episode in result[3]]
+        self.elapsed += time.perf_counter() - start
+        self.steps += actions.size
+        self.episodes += episodes
+        return observations, rewards, dones
+
+    @property
+    def steps_per_second(self):
+        """
+        Aggregate environment steps per second of time spent in step().
+        """
+        return self.steps / self.elapsed if self.elapsed > 0 else 0.0
+
+    def close(self):
+        """
+        Closes every environment and stops the worker processes.
+        """
+        if self._envs is not None:
+            for env in self._envs:
+                env.close()
+            self._envs = []
+        for process, conn, _ in self._workers:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+        for process, _, _ in self._workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._workers = []
+
+def random_bot(num_envs, seed=0, jump_chance=0.05, turn_chance=0.01):
+    """
+    Simple playtest policy: every bot runs in one direction, turns around
+    now and then and jumps at random.
+    :return: Callable(observations) -> actions for VectorEnv.step
+    """
+    rng = np.random.default_rng(seed)
+    direction = np.full(num_envs, RIGHT, dtype=np.uint8)
+
+    def policy(observations):
+        turn = rng.random(num_envs) < turn_chance
+        direction[turn] ^= LEFT | RIGHT
+        jump = rng.random(num_envs) < jump_chance
+        return direction | np.where(jump, JUMP, 0).astype(np.uint8)
+    return policy
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play levels with bots in many headless environments at once.")
+    parser.add_argument("paths", nargs="+", help="CSV level files or directories")
+    parser.add_argument("--envs", type=int, default=8, help="number of environments")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--ticks", type=int, default=3000, help="lockstep ticks to run")
+    parser.add_argument("--batch", type=int, default=32,
+                        help="ticks per round trip to the workers; the bots choose a batch "
+                             "of actions from the observations before it")
+    parser.add_argument("--max-ticks", type=int, default=3600, help="episode length limit (0 = none)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    files = find_levels(args.paths)
+    if not files:
+        parser.error("no levels found")
+    env = VectorEnv(files, args.envs, args.jobs, max_ticks=args.max_ticks or None)
+    try:
+        policy = random_bot(env.num_envs, args.seed)
+        observations = env.reset()
+        for first in range(0, args.ticks, args.batch):
+            ticks = min(args.batch, args.ticks - first)
+            actions = np.array([policy(observations) for _ in range(ticks)])
+            observations = env.step_many(actions)[0][-1]
+    finally:
+        env.close()
+
+    episodes = env.episodes
+    won = sum(1 for episode in episodes if episode["won"])
+    dead = sum(1 for episode in episodes if episode["dead"])
+    timeout = sum(1 for episode in episodes if episode["timeout"])
+    print(f"{env.num_envs} environments on {env.jobs} processes, {len(files)} levels")
+    print(f"{len(episodes)} episodes finished: {won} won, {dead} died, {timeout} timed out")
+    print(f"{env.steps} steps in {env.elapsed:.2f} s, {env.steps_per_second:.0f} steps/s")
+
+if __name__ == "__main__":
+    sys.exit(main())